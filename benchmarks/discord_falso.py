@@ -0,0 +1,732 @@
+"""Substituto local da API do Discord (REST e gateway) para testes de carga de ponta a ponta.
+
+O servidor atende as rotas REST usadas pelo bot, mantém a conexão de gateway
+do cliente do discord.py e injeta interações (comandos slash, autocompletar,
+botões e modais) como eventos INTERACTION_CREATE. Conta as chamadas REST por
+rota e simula os limites de taxa por bucket, respondendo 429 como o Discord.
+
+O cliente é apontado para o servidor trocando ``discord.http.Route.BASE`` e
+``DiscordWebSocket.DEFAULT_GATEWAY`` pelos endereços de ``DiscordFalso``.
+"""
+
+import asyncio
+import itertools
+import json
+import re
+import time
+import zlib
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from aiohttp import WSMsgType, web
+
+EPOCA_DISCORD = 1420070400000
+ID_GUILDA = 1400000000000000001
+ID_APLICACAO = 1400000000000000002
+ID_CARGO_BOT = 1400000000000000003
+# Prazo do Discord para a primeira resposta de uma interação
+PRAZO_INTERACAO = 3.0
+
+# Limites de taxa simulados por rota: (requisições, janela em segundos). Cada
+# canal ou guilda (parâmetro principal da rota) tem o próprio bucket, como no
+# Discord. São aproximações dos limites observados na API real.
+LIMITES_ROTAS: Dict[str, Tuple[int, float]] = {
+    "POST /channels/{channel_id}/messages": (5, 5.0),
+    "PATCH /channels/{channel_id}/messages/{message_id}": (5, 5.0),
+    "DELETE /channels/{channel_id}/messages/{message_id}": (5, 5.0),
+    "DELETE /channels/{channel_id}": (5, 5.0),
+    "PUT /channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me": (1, 0.25),
+    "POST /guilds/{guild_id}/channels": (5, 10.0),
+    "PATCH /guilds/{guild_id}/members/{user_id}": (10, 10.0),
+    "PUT /guilds/{guild_id}/members/{user_id}/roles/{role_id}": (10, 10.0),
+    "DELETE /guilds/{guild_id}/members/{user_id}/roles/{role_id}": (10, 10.0),
+}
+# Rotas que compartilham o bucket de outra
+BUCKETS_COMPARTILHADOS = {
+    "DELETE /guilds/{guild_id}/members/{user_id}/roles/{role_id}":
+        "PUT /guilds/{guild_id}/members/{user_id}/roles/{role_id}",
+}
+_PARAMETROS_PRINCIPAIS = ("channel_id", "guild_id", "webhook_token")
+
+_sequencia = itertools.count()
+
+
+def snowflake() -> int:
+    """Gera um snowflake com o instante atual, como os IDs criados pelo Discord"""
+    return ((int(time.time() * 1000) - EPOCA_DISCORD) << 22) | (next(_sequencia) & 0x3FFFFF)
+
+
+def _agora_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _erro(status: int, mensagem: str, codigo: int = 0) -> Tuple[int, Dict[str, Any]]:
+    return status, {"message": mensagem, "code": codigo}
+
+
+def _json(dados: Any, status: int = 200, headers: Optional[Dict[str, str]] = None) -> web.Response:
+    # O discord.py só decodifica respostas com content-type exatamente "application/json"
+    return web.Response(body=json.dumps(dados), status=status, headers={**(headers or {}), "Content-Type": "application/json"})
+
+
+def percentil(amostras: List[float], q: float) -> float:
+    ordenadas = sorted(amostras)
+    if not ordenadas:
+        return 0.0
+    return ordenadas[min(len(ordenadas) - 1, max(0, round(q * (len(ordenadas) - 1))))]
+
+
+class _Bucket:
+    """Janela fixa de requisições de um bucket de limite de taxa"""
+
+    __slots__ = ("nome", "limite", "janela", "restantes", "reinicio")
+
+    def __init__(self, nome: str, limite: int, janela: float):
+        self.nome = nome
+        self.limite = limite
+        self.janela = janela
+        self.restantes = limite
+        self.reinicio = 0.0
+
+    def consumir(self) -> bool:
+        agora = time.monotonic()
+        if agora >= self.reinicio:
+            self.restantes = self.limite
+            self.reinicio = agora + self.janela
+        if not self.restantes:
+            return False
+        self.restantes -= 1
+        return True
+
+    def cabecalhos(self) -> Dict[str, str]:
+        espera = max(self.reinicio - time.monotonic(), 0.0)
+        return {
+            "X-RateLimit-Limit": str(self.limite),
+            "X-RateLimit-Remaining": str(self.restantes),
+            "X-RateLimit-Reset": f"{time.time() + espera:.3f}",
+            "X-RateLimit-Reset-After": f"{espera:.3f}",
+            "X-RateLimit-Bucket": self.nome,
+            "Via": "1.1 google",
+        }
+
+
+class RegistroInteracao:
+    """Tempos e respostas de uma interação injetada"""
+
+    __slots__ = ("nome", "usuario", "canal_id", "mensagem_id", "enviada", "reconhecida", "ultima_resposta",
+                 "tipo_resposta", "respostas", "expirada", "mensagem_original")
+
+    def __init__(self, nome: str, usuario: int, canal_id: int, mensagem_id: Optional[int]):
+        self.nome = nome
+        self.usuario = usuario
+        self.canal_id = canal_id
+        self.mensagem_id = mensagem_id
+        self.enviada = time.perf_counter()
+        self.reconhecida: Optional[float] = None
+        self.ultima_resposta: Optional[float] = None
+        self.tipo_resposta: Optional[int] = None
+        self.respostas = 0
+        self.expirada = False
+        self.mensagem_original: Optional[int] = None
+
+    def responder(self):
+        self.respostas += 1
+        self.ultima_resposta = time.perf_counter()
+
+
+class DiscordFalso:
+    """Servidor aiohttp que imita a API REST e o gateway do Discord para um único bot e guilda.
+
+    ``canais`` e ``categorias`` mapeiam ID para nome e ``cargos`` mapeia ID
+    para nome; todos são criados na guilda enviada no GUILD_CREATE.
+    """
+
+    def __init__(self, canais: Dict[int, str], categorias: Dict[int, str], cargos: Dict[int, str],
+                 limites: Optional[Dict[str, Tuple[int, float]]] = None, host: str = "127.0.0.1"):
+        self.canais = dict(canais)
+        self._atributos_canais: Dict[int, Dict[str, Any]] = {}
+        self.categorias = dict(categorias)
+        self.cargos = dict(cargos)
+        self.limites = LIMITES_ROTAS if limites is None else limites
+        self.host = host
+        self.url = ""
+
+        self.usuario_bot = {"id": str(ID_APLICACAO), "username": "detran-bot", "discriminator": "0",
+                            "global_name": None, "avatar": None, "bot": True}
+        self.membros: Dict[int, Dict[str, Any]] = {}
+        self.comandos: Dict[str, Dict[str, Any]] = {}
+        self.mensagens: Dict[int, Dict[str, Any]] = {}
+        self.ultima_mensagem_canal: Dict[int, int] = {}
+        self.interacoes: Dict[str, RegistroInteracao] = {}
+
+        self.chamadas: Counter = Counter()
+        self.limites_atingidos: Counter = Counter()
+        self.nao_tratadas: Counter = Counter()
+        self.comandos_sincronizados = asyncio.Event()
+        self.pronto = asyncio.Event()
+
+        self._buckets: Dict[Tuple[str, str], _Bucket] = {}
+        self._modais: Dict[int, Dict[str, Any]] = {}
+        self._ws: Optional[web.WebSocketResponse] = None
+        self._seq = 0
+        self._runner: Optional[web.AppRunner] = None
+        self._ultima_chamada = time.monotonic()
+        self._rotas = [
+            (metodo, modelo, re.compile("^" + re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", modelo) + "$"), funcao)
+            for metodo, modelo, funcao in self._tabela_rotas()
+        ]
+
+    def _tabela_rotas(self):
+        return [
+            ("GET", "/gateway", self._gateway_url),
+            ("GET", "/gateway/bot", self._gateway_url),
+            ("GET", "/users/@me", self._usuario_atual),
+            ("GET", "/oauth2/applications/@me", self._aplicacao),
+            ("GET", "/applications/{application_id}/commands", self._listar_comandos),
+            ("PUT", "/applications/{application_id}/commands", self._sincronizar_comandos),
+            ("PUT", "/applications/{application_id}/guilds/{guild_id}/commands", self._sincronizar_comandos),
+            ("POST", "/interactions/{interaction_id}/{webhook_token}/callback", self._callback_interacao),
+            ("POST", "/webhooks/{application_id}/{webhook_token}", self._followup),
+            ("GET", "/webhooks/{application_id}/{webhook_token}/messages/{message_id}", self._mensagem_webhook),
+            ("PATCH", "/webhooks/{application_id}/{webhook_token}/messages/{message_id}", self._mensagem_webhook),
+            ("DELETE", "/webhooks/{application_id}/{webhook_token}/messages/{message_id}", self._mensagem_webhook),
+            ("POST", "/channels/{channel_id}/messages", self._criar_mensagem),
+            ("GET", "/channels/{channel_id}/messages/{message_id}", self._mensagem_canal),
+            ("PATCH", "/channels/{channel_id}/messages/{message_id}", self._mensagem_canal),
+            ("DELETE", "/channels/{channel_id}/messages/{message_id}", self._mensagem_canal),
+            ("PUT", "/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me", self._reacao),
+            ("DELETE", "/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me", self._reacao),
+            ("PATCH", "/channels/{channel_id}", self._editar_canal),
+            ("DELETE", "/channels/{channel_id}", self._apagar_canal),
+            ("POST", "/guilds/{guild_id}/channels", self._criar_canal),
+            ("GET", "/guilds/{guild_id}/members/{user_id}", self._membro),
+            ("PATCH", "/guilds/{guild_id}/members/{user_id}", self._editar_membro),
+            ("PUT", "/guilds/{guild_id}/members/{user_id}/roles/{role_id}", self._cargo_membro),
+            ("DELETE", "/guilds/{guild_id}/members/{user_id}/roles/{role_id}", self._cargo_membro),
+        ]
+
+    # Ciclo de vida
+
+    async def iniciar(self, porta: int = 0) -> str:
+        """Inicia o servidor e retorna a URL base (http://host:porta)"""
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_get("/gateway", self._conexao_gateway)
+        app.router.add_route("*", "/api/v{versao:\\d+}/{caminho:.*}", self._rest)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, porta)
+        await site.start()
+        porta = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{self.host}:{porta}"
+        return self.url
+
+    async def parar(self):
+        if self._ws is not None:
+            await self._ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    @property
+    def url_gateway(self) -> str:
+        return self.url.replace("http://", "ws://", 1) + "/gateway"
+
+    # Membros e payloads
+
+    def adicionar_membro(self, usuario_id: int, cargos: Optional[Iterable[int]] = None) -> Dict[str, Any]:
+        """Cria um membro da guilda, ou substitui os cargos de um existente se ``cargos`` for informado"""
+        membro = self.membros.get(usuario_id)
+        if membro is None:
+            membro = self.membros[usuario_id] = {
+                "user": {"id": str(usuario_id), "username": f"usuario{usuario_id}", "discriminator": "0",
+                         "global_name": None, "avatar": None},
+                "nick": None, "roles": [], "joined_at": _agora_iso(), "deaf": False, "mute": False,
+                "flags": 0, "pending": False,
+            }
+        if cargos is not None:
+            membro["roles"] = [str(cargo) for cargo in cargos]
+        return membro
+
+    def _canal(self, canal_id: int, nome: str, tipo: int = 0, categoria: Optional[int] = None) -> Dict[str, Any]:
+        return {"id": str(canal_id), "type": tipo, "name": nome, "guild_id": str(ID_GUILDA), "position": 0,
+                "permission_overwrites": [], "parent_id": str(categoria) if categoria else None, "nsfw": False}
+
+    def _guilda(self) -> Dict[str, Any]:
+        cargos = [{"id": str(ID_GUILDA), "name": "@everyone", "permissions": "1024", "position": 0,
+                   "color": 0, "hoist": False, "managed": False, "mentionable": False}]
+        cargos.append({"id": str(ID_CARGO_BOT), "name": "Bot", "permissions": "8", "position": 1,
+                       "color": 0, "hoist": False, "managed": True, "mentionable": False})
+        cargos.extend({"id": str(cargo_id), "name": nome, "permissions": "0", "position": posicao + 2,
+                       "color": 0, "hoist": False, "managed": False, "mentionable": False}
+                      for posicao, (cargo_id, nome) in enumerate(self.cargos.items()))
+        canais = [self._canal(canal_id, nome, tipo=4) for canal_id, nome in self.categorias.items()]
+        canais.extend(self._canal(canal_id, nome) for canal_id, nome in self.canais.items())
+        membro_bot = {"user": self.usuario_bot, "nick": None, "roles": [str(ID_CARGO_BOT)],
+                      "joined_at": _agora_iso(), "deaf": False, "mute": False, "flags": 0}
+        membros = [membro_bot, *self.membros.values()]
+        return {
+            "id": str(ID_GUILDA), "name": "Detran (teste de carga)", "icon": None, "owner_id": "1",
+            "roles": cargos, "emojis": [], "stickers": [], "features": [], "channels": canais, "threads": [],
+            "members": membros, "member_count": len(membros), "presences": [], "voice_states": [],
+            "large": False, "unavailable": False, "joined_at": _agora_iso(), "preferred_locale": "pt-BR",
+            "verification_level": 0, "default_message_notifications": 0, "explicit_content_filter": 0,
+            "mfa_level": 0, "premium_tier": 0, "nsfw_level": 0, "afk_timeout": 300, "system_channel_id": None,
+        }
+
+    def _nova_mensagem(self, canal_id: int, corpo: Dict[str, Any], mensagem_id: Optional[int] = None,
+                       webhook_id: Optional[int] = None) -> Dict[str, Any]:
+        mensagem_id = mensagem_id or snowflake()
+        mensagem = {
+            "id": str(mensagem_id), "channel_id": str(canal_id), "author": self.usuario_bot,
+            "content": corpo.get("content") or "", "timestamp": _agora_iso(), "edited_timestamp": None,
+            "tts": False, "mention_everyone": False, "mentions": [], "mention_roles": [],
+            "attachments": [
+                {"id": str(anexo.get("id", indice)), "filename": anexo.get("filename", "arquivo"), "size": 0,
+                 "url": f"{self.url}/anexos/{indice}", "proxy_url": f"{self.url}/anexos/{indice}"}
+                for indice, anexo in enumerate(corpo.get("attachments") or [])
+            ],
+            "embeds": corpo.get("embeds") or [], "pinned": False, "type": 0, "flags": corpo.get("flags") or 0,
+            "components": corpo.get("components") or [],
+        }
+        if webhook_id:
+            mensagem["webhook_id"] = str(webhook_id)
+        self.mensagens[mensagem_id] = mensagem
+        self.ultima_mensagem_canal[canal_id] = mensagem_id
+        return mensagem
+
+    def _editar_mensagem(self, mensagem_id: int, corpo: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        mensagem = self.mensagens.get(mensagem_id)
+        if mensagem is None:
+            return None
+        for campo in ("content", "embeds", "components", "flags"):
+            if campo in corpo:
+                mensagem[campo] = corpo[campo] if corpo[campo] is not None else mensagem[campo]
+        mensagem["edited_timestamp"] = _agora_iso()
+        return mensagem
+
+    # REST
+
+    async def _rest(self, request: web.Request) -> web.Response:
+        caminho = "/" + request.match_info["caminho"]
+        self._ultima_chamada = time.monotonic()
+        for metodo, modelo, padrao, funcao in self._rotas:
+            if metodo != request.method:
+                continue
+            encontrado = padrao.match(caminho)
+            if encontrado:
+                break
+        else:
+            chave = f"{request.method} {caminho}"
+            self.chamadas[chave] += 1
+            self.nao_tratadas[chave] += 1
+            return _json({"message": "404: Not Found", "code": 0}, status=404)
+
+        chave = f"{metodo} {modelo}"
+        self.chamadas[chave] += 1
+        parametros = encontrado.groupdict()
+        cabecalhos: Dict[str, str] = {}
+        limite = self.limites.get(chave)
+        if limite is not None:
+            bucket = self._bucket(chave, parametros, limite)
+            if not bucket.consumir():
+                self.limites_atingidos[chave] += 1
+                espera = max(bucket.reinicio - time.monotonic(), 0.001)
+                cabecalhos = bucket.cabecalhos()
+                cabecalhos["Retry-After"] = f"{espera:.3f}"
+                cabecalhos["X-RateLimit-Scope"] = "user"
+                return _json(
+                    {"message": "You are being rate limited.", "retry_after": espera, "global": False},
+                    status=429, headers=cabecalhos,
+                )
+            cabecalhos = bucket.cabecalhos()
+
+        status, dados = await funcao(parametros, await self._corpo(request), request)
+        if status == 204:
+            return web.Response(status=204, headers=cabecalhos)
+        return _json(dados, status=status, headers=cabecalhos)
+
+    def _bucket(self, chave: str, parametros: Dict[str, str], limite: Tuple[int, float]) -> _Bucket:
+        nome = BUCKETS_COMPARTILHADOS.get(chave, chave)
+        principal = next((parametros[p] for p in _PARAMETROS_PRINCIPAIS if p in parametros), "")
+        bucket = self._buckets.get((nome, principal))
+        if bucket is None:
+            bucket = self._buckets[(nome, principal)] = _Bucket(format(zlib.crc32(nome.encode()), "x"), *limite)
+        return bucket
+
+    @staticmethod
+    async def _corpo(request: web.Request) -> Dict[str, Any]:
+        if not request.can_read_body:
+            return {}
+        if request.content_type.startswith("multipart/"):
+            formulario = await request.post()
+            return json.loads(formulario.get("payload_json") or "{}")
+        try:
+            return await request.json()
+        except json.JSONDecodeError:
+            return {}
+
+    async def _gateway_url(self, parametros, corpo, request):
+        return 200, {"url": self.url_gateway, "shards": 1, "session_start_limit": {
+            "total": 1000, "remaining": 1000, "reset_after": 0, "max_concurrency": 1}}
+
+    async def _usuario_atual(self, parametros, corpo, request):
+        return 200, self.usuario_bot
+
+    async def _aplicacao(self, parametros, corpo, request):
+        return 200, {
+            "id": str(ID_APLICACAO), "name": "detran-bot", "description": "", "icon": None,
+            "bot_public": False, "bot_require_code_grant": False, "owner": {**self.usuario_bot, "bot": False},
+            "verify_key": "0" * 64, "flags": 0, "team": None,
+        }
+
+    async def _listar_comandos(self, parametros, corpo, request):
+        return 200, list(self.comandos.values())
+
+    async def _sincronizar_comandos(self, parametros, corpo, request):
+        self.comandos = {
+            comando["name"]: {**comando, "id": str(snowflake()), "application_id": str(ID_APLICACAO),
+                              "version": str(snowflake())}
+            for comando in corpo
+        }
+        self.comandos_sincronizados.set()
+        return 200, list(self.comandos.values())
+
+    async def _callback_interacao(self, parametros, corpo, request):
+        registro = self.interacoes.get(parametros["webhook_token"])
+        if registro is None:
+            return _erro(404, "Unknown interaction", 10062)
+        if registro.tipo_resposta is not None:
+            return _erro(400, "Interaction has already been acknowledged.", 40060)
+        agora = time.perf_counter()
+        if agora - registro.enviada > PRAZO_INTERACAO:
+            registro.expirada = True
+            return _erro(404, "Unknown interaction", 10062)
+
+        tipo = corpo["type"]
+        dados = corpo.get("data") or {}
+        registro.tipo_resposta = tipo
+        registro.reconhecida = agora
+        if tipo not in (5, 6):
+            registro.responder()
+
+        resposta: Dict[str, Any] = {"interaction": {"id": parametros["interaction_id"], "type": 2},
+                                    "resource": {"type": tipo}}
+        if tipo in (4, 5):
+            if tipo == 5:
+                dados = {"flags": (dados.get("flags") or 0) | 128}
+            mensagem = self._nova_mensagem(registro.canal_id, dados, webhook_id=ID_APLICACAO)
+            registro.mensagem_original = int(mensagem["id"])
+            resposta["interaction"].update({
+                "response_message_id": mensagem["id"],
+                "response_message_loading": tipo == 5,
+                "response_message_ephemeral": bool(mensagem["flags"] & 64),
+            })
+            resposta["resource"]["message"] = mensagem
+        elif tipo == 7 and registro.mensagem_id:
+            mensagem = self._editar_mensagem(registro.mensagem_id, dados)
+            if mensagem is not None:
+                resposta["resource"]["message"] = mensagem
+        elif tipo == 9:
+            self._modais[registro.usuario] = dados
+        return 200, resposta
+
+    async def _followup(self, parametros, corpo, request):
+        registro = self.interacoes.get(parametros["webhook_token"])
+        if registro is None:
+            return _erro(404, "Unknown Webhook", 10015)
+        registro.responder()
+        return 200, self._nova_mensagem(registro.canal_id, corpo, webhook_id=ID_APLICACAO)
+
+    async def _mensagem_webhook(self, parametros, corpo, request):
+        registro = self.interacoes.get(parametros["webhook_token"])
+        if registro is None:
+            return _erro(404, "Unknown Webhook", 10015)
+        if parametros["message_id"] == "@original":
+            mensagem_id = registro.mensagem_original or registro.mensagem_id
+        else:
+            mensagem_id = int(parametros["message_id"])
+        if request.method == "PATCH":
+            registro.responder()
+            mensagem = self._editar_mensagem(mensagem_id or 0, corpo)
+        elif request.method == "DELETE":
+            return (204, None) if self.mensagens.pop(mensagem_id or 0, None) else _erro(404, "Unknown Message", 10008)
+        else:
+            mensagem = self.mensagens.get(mensagem_id or 0)
+        return (200, mensagem) if mensagem is not None else _erro(404, "Unknown Message", 10008)
+
+    async def _criar_mensagem(self, parametros, corpo, request):
+        canal_id = int(parametros["channel_id"])
+        if canal_id not in self.canais:
+            return _erro(404, "Unknown Channel", 10003)
+        return 200, self._nova_mensagem(canal_id, corpo)
+
+    async def _mensagem_canal(self, parametros, corpo, request):
+        mensagem_id = int(parametros["message_id"])
+        mensagem = self.mensagens.get(mensagem_id)
+        if mensagem is None or mensagem["channel_id"] != parametros["channel_id"]:
+            return _erro(404, "Unknown Message", 10008)
+        if request.method == "PATCH":
+            mensagem = self._editar_mensagem(mensagem_id, corpo)
+        elif request.method == "DELETE":
+            del self.mensagens[mensagem_id]
+            return 204, None
+        return 200, mensagem
+
+    async def _reacao(self, parametros, corpo, request):
+        if int(parametros["message_id"]) not in self.mensagens:
+            return _erro(404, "Unknown Message", 10008)
+        return 204, None
+
+    async def _criar_canal(self, parametros, corpo, request):
+        canal_id = snowflake()
+        self.canais[canal_id] = corpo.get("name", "canal")
+        canal = self._canal(canal_id, self.canais[canal_id], corpo.get("type", 0),
+                            int(corpo["parent_id"]) if corpo.get("parent_id") else None)
+        canal["permission_overwrites"] = corpo.get("permission_overwrites") or []
+        self._atributos_canais[canal_id] = {k: canal[k] for k in ("parent_id", "permission_overwrites")}
+        return 201, canal
+
+    async def _editar_canal(self, parametros, corpo, request):
+        canal_id = int(parametros["channel_id"])
+        if canal_id not in self.canais:
+            return _erro(404, "Unknown Channel", 10003)
+        self.canais[canal_id] = corpo.get("name", self.canais[canal_id])
+        atributos = self._atributos_canais.setdefault(canal_id, {})
+        if "permission_overwrites" in corpo:
+            atributos["permission_overwrites"] = corpo["permission_overwrites"]
+        return 200, {**self._canal(canal_id, self.canais[canal_id]), **atributos}
+
+    async def _apagar_canal(self, parametros, corpo, request):
+        canal_id = int(parametros["channel_id"])
+        nome = self.canais.pop(canal_id, None)
+        if nome is None:
+            return _erro(404, "Unknown Channel", 10003)
+        return 200, self._canal(canal_id, nome)
+
+    async def _membro(self, parametros, corpo, request):
+        membro = self.membros.get(int(parametros["user_id"]))
+        return (200, membro) if membro is not None else _erro(404, "Unknown Member", 10007)
+
+    async def _editar_membro(self, parametros, corpo, request):
+        membro = self.membros.get(int(parametros["user_id"]))
+        if membro is None:
+            return _erro(404, "Unknown Member", 10007)
+        if "nick" in corpo:
+            membro["nick"] = corpo["nick"]
+        if "roles" in corpo:
+            membro["roles"] = [str(cargo) for cargo in corpo["roles"]]
+        return 200, membro
+
+    async def _cargo_membro(self, parametros, corpo, request):
+        membro = self.membros.get(int(parametros["user_id"]))
+        if membro is None:
+            return _erro(404, "Unknown Member", 10007)
+        cargo = parametros["role_id"]
+        if request.method == "PUT" and cargo not in membro["roles"]:
+            membro["roles"].append(cargo)
+        elif request.method == "DELETE" and cargo in membro["roles"]:
+            membro["roles"].remove(cargo)
+        return 204, None
+
+    # Gateway
+
+    async def _conexao_gateway(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+        self._ws = ws
+        await self._enviar_gateway(10, {"heartbeat_interval": 41250})
+        async for mensagem in ws:
+            if mensagem.type != WSMsgType.TEXT:
+                continue
+            dados = json.loads(mensagem.data)
+            if dados["op"] == 1:
+                await self._enviar_gateway(11, None)
+            elif dados["op"] == 2:
+                await self._enviar_evento("READY", {
+                    "v": 10, "user": self.usuario_bot, "guilds": [{"id": str(ID_GUILDA), "unavailable": True}],
+                    "session_id": "sessao-falsa", "resume_gateway_url": self.url_gateway,
+                    "application": {"id": str(ID_APLICACAO), "flags": 0},
+                })
+                await self._enviar_evento("GUILD_CREATE", self._guilda())
+                self.pronto.set()
+            elif dados["op"] == 6:
+                # Sem suporte a RESUME: o cliente faz um novo IDENTIFY
+                await self._enviar_gateway(9, False)
+        if self._ws is ws:
+            self._ws = None
+        return ws
+
+    async def _enviar_gateway(self, op: int, dados: Any, evento: Optional[str] = None):
+        if self._ws is None:
+            raise RuntimeError("Nenhum cliente conectado ao gateway")
+        seq = None
+        if evento is not None:
+            self._seq += 1
+            seq = self._seq
+        await self._ws.send_str(json.dumps({"op": op, "d": dados, "s": seq, "t": evento}))
+
+    async def _enviar_evento(self, evento: str, dados: Any):
+        await self._enviar_gateway(0, dados, evento)
+
+    async def entrar_membro(self, usuario_id: int, cargos: Optional[Iterable[int]] = None):
+        """Simula a entrada de um membro na guilda (evento GUILD_MEMBER_ADD)"""
+        membro = self.adicionar_membro(usuario_id, cargos)
+        await self._enviar_evento("GUILD_MEMBER_ADD", {**membro, "guild_id": str(ID_GUILDA)})
+
+    # Interações
+
+    async def enviar_interacao(self, evento: Dict[str, Any], espera_modal: float = 5.0) -> str:
+        """Injeta uma interação descrita por um evento de replay e retorna o token dela.
+
+        ``evento["tipo"]`` é ``comando``, ``autocompletar``, ``botao`` ou
+        ``modal``; ``usuario`` e ``cargos`` identificam o autor. Um modal usa
+        o último modal aberto para o mesmo usuário, aguardando até
+        ``espera_modal`` segundos por ele.
+        """
+        usuario = int(evento["usuario"])
+        membro = self.adicionar_membro(usuario, evento.get("cargos"))
+        canal_id = int(evento.get("canal") or next(iter(self.canais)))
+        interacao_id = snowflake()
+        token = f"token-{interacao_id}"
+        tipo = evento["tipo"]
+        payload: Dict[str, Any] = {
+            "id": str(interacao_id), "application_id": str(ID_APLICACAO), "token": token, "version": 1,
+            "guild_id": str(ID_GUILDA), "channel_id": str(canal_id),
+            "channel": self._canal(canal_id, self.canais.get(canal_id, "canal")),
+            "member": {**membro, "permissions": "1024"}, "app_permissions": "8", "locale": "pt-BR",
+            "guild_locale": "pt-BR", "entitlements": [], "authorizing_integration_owners": {"0": str(ID_GUILDA)},
+            "context": 0, "attachment_size_limit": 8 * 1024 * 1024,
+        }
+        mensagem_id = None
+
+        if tipo in ("comando", "autocompletar"):
+            nome = evento["nome"]
+            payload["type"] = 2 if tipo == "comando" else 4
+            payload["data"] = self._dados_comando(nome, evento.get("opcoes") or {}, evento.get("foco"))
+            if tipo == "autocompletar":
+                nome = f"{nome}:autocompletar"
+        elif tipo == "botao":
+            custom_id = evento["custom_id"]
+            nome = custom_id.split(":")[0]
+            mensagem_id = self.ultima_mensagem_canal.get(canal_id)
+            mensagem = self.mensagens.get(mensagem_id) if mensagem_id else None
+            if mensagem is None:
+                mensagem = self._nova_mensagem(canal_id, {})
+                mensagem_id = int(mensagem["id"])
+            payload["type"] = 3
+            payload["data"] = {"custom_id": custom_id, "component_type": 2}
+            payload["message"] = mensagem
+        elif tipo == "modal":
+            modal = await self._aguardar_modal(usuario, espera_modal)
+            nome = f"modal:{modal.get('title', modal['custom_id'])}"
+            payload["type"] = 5
+            payload["data"] = {"custom_id": modal["custom_id"],
+                               "components": _preencher_modal(modal.get("components", []), evento.get("campos", {}))}
+        else:
+            raise ValueError(f"Tipo de interação desconhecido: {tipo}")
+
+        self.interacoes[token] = RegistroInteracao(nome, usuario, canal_id, mensagem_id)
+        await self._enviar_evento("INTERACTION_CREATE", payload)
+        return token
+
+    def _dados_comando(self, nome: str, opcoes: Dict[str, Any], foco: Optional[str]) -> Dict[str, Any]:
+        comando = self.comandos.get(nome)
+        if comando is None:
+            raise ValueError(f"Comando não sincronizado: {nome}")
+        tipos = {opcao["name"]: opcao["type"] for opcao in comando.get("options", [])}
+        dados: Dict[str, Any] = {"id": comando["id"], "name": nome, "type": 1, "guild_id": str(ID_GUILDA),
+                                 "options": []}
+        resolvidos: Dict[str, Dict[str, Any]] = {}
+        for opcao, valor in opcoes.items():
+            tipo = tipos.get(opcao, 3)
+            item = {"name": opcao, "type": tipo, "value": valor}
+            if tipo in (6, 9):
+                membro = self.adicionar_membro(int(valor))
+                item["value"] = str(valor)
+                resolvidos.setdefault("users", {})[str(valor)] = membro["user"]
+                resolvidos.setdefault("members", {})[str(valor)] = {
+                    chave: v for chave, v in membro.items() if chave != "user"
+                }
+            elif tipo == 7:
+                item["value"] = str(valor)
+                resolvidos.setdefault("channels", {})[str(valor)] = {
+                    **self._canal(int(valor), self.canais.get(int(valor), "canal")), "permissions": "8"}
+            if opcao == foco:
+                item["focused"] = True
+            dados["options"].append(item)
+        if resolvidos:
+            dados["resolved"] = resolvidos
+        return dados
+
+    async def _aguardar_modal(self, usuario: int, espera: float) -> Dict[str, Any]:
+        limite = time.monotonic() + espera
+        while usuario not in self._modais:
+            if time.monotonic() >= limite:
+                raise TimeoutError(f"Nenhum modal aberto para o usuário {usuario}")
+            await asyncio.sleep(0.01)
+        return self._modais.pop(usuario)
+
+    async def aguardar_respostas(self, espera: float) -> int:
+        """Aguarda até todas as interações terem resposta (não só o adiamento); retorna quantas ficaram sem"""
+        limite = time.monotonic() + espera
+        while True:
+            pendentes = sum(1 for registro in self.interacoes.values()
+                            if not registro.respostas and not registro.expirada)
+            if not pendentes or time.monotonic() >= limite:
+                return pendentes
+            await asyncio.sleep(0.05)
+
+    async def aguardar_ociosidade(self, intervalo: float = 0.5, espera: float = 30.0):
+        """Aguarda o bot passar ``intervalo`` segundos sem chamar a API REST"""
+        limite = time.monotonic() + espera
+        while time.monotonic() - self._ultima_chamada < intervalo and time.monotonic() < limite:
+            await asyncio.sleep(intervalo / 5)
+
+    def relatorio(self) -> Dict[str, Any]:
+        """Chamadas REST por rota, limites atingidos e latência das interações por nome"""
+        por_nome: Dict[str, List[RegistroInteracao]] = {}
+        for registro in self.interacoes.values():
+            por_nome.setdefault(registro.nome, []).append(registro)
+        interacoes = {}
+        for nome, registros in sorted(por_nome.items()):
+            reconhecimento = [r.reconhecida - r.enviada for r in registros if r.reconhecida is not None]
+            conclusao = [r.ultima_resposta - r.enviada for r in registros if r.ultima_resposta is not None]
+            interacoes[nome] = {
+                "interacoes": len(registros),
+                "adiadas": sum(1 for r in registros if r.tipo_resposta in (5, 6)),
+                "expiradas": sum(1 for r in registros if r.expirada),
+                "sem_resposta": sum(1 for r in registros if not r.respostas and not r.expirada),
+                "reconhecimento_p50_ms": percentil(reconhecimento, 0.50) * 1000,
+                "reconhecimento_p95_ms": percentil(reconhecimento, 0.95) * 1000,
+                "reconhecimento_p99_ms": percentil(reconhecimento, 0.99) * 1000,
+                "conclusao_p95_ms": percentil(conclusao, 0.95) * 1000,
+            }
+        return {
+            "rest": {"total": sum(self.chamadas.values()), "por_rota": dict(self.chamadas.most_common())},
+            "limites_atingidos": {"total": sum(self.limites_atingidos.values()),
+                                  "por_rota": dict(self.limites_atingidos.most_common())},
+            "rotas_nao_tratadas": dict(self.nao_tratadas),
+            "interacoes": interacoes,
+        }
+
+
+def _preencher_modal(componentes: List[Dict[str, Any]], campos: Any) -> List[Dict[str, Any]]:
+    """Monta os componentes de envio do modal com os valores dos campos.
+
+    ``campos`` é um dicionário pelo rótulo do campo ou uma lista na ordem dos
+    campos; campos não informados vão vazios.
+    """
+    valores = iter(campos) if isinstance(campos, list) else None
+
+    def preencher(componente: Dict[str, Any], rotulo: Optional[str] = None) -> Dict[str, Any]:
+        if componente.get("type") == 4:
+            rotulo = componente.get("label") or rotulo
+            valor = next(valores, "") if valores is not None else campos.get(rotulo, "")
+            return {"type": 4, "custom_id": componente["custom_id"], "value": str(valor)}
+        if "component" in componente:  # Label (tipo 18) envolve um único componente
+            return {"type": componente["type"],
+                    "component": preencher(componente["component"], componente.get("label"))}
+        return {"type": componente.get("type", 1),
+                "components": [preencher(filho) for filho in componente.get("components", [])]}
+
+    return [preencher(componente) for componente in componentes]
@@ -0,0 +1,200 @@
+"""Benchmark de vazão dos fluxos de comando do bot do Detran.
+
+Executa os comandos contra um banco temporário, com interações falsas (sem
+conexão com o Discord), simulando vários agentes ao mesmo tempo. Para cada
+operação mede vazão, percentis de latência e instruções SQL por operação, e
+grava o resultado em JSON para comparar entre commits.
+
+Uso:
+    python benchmarks/fluxos.py --agentes 8 --rodadas 50
+    python benchmarks/fluxos.py --comparar benchmarks/resultados/anterior.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Dict, List
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASTA_RESULTADOS = os.path.join(RAIZ, "benchmarks", "resultados")
+
+
+class RespostaFalsa:
+    """Imita ``interaction.response`` guardando apenas se a interação foi respondida"""
+
+    def __init__(self):
+        self._respondida = False
+
+    def is_done(self) -> bool:
+        return self._respondida
+
+    async def send_message(self, *args, **kwargs):
+        self._respondida = True
+
+    async def defer(self, **kwargs):
+        self._respondida = True
+
+    async def edit_message(self, **kwargs):
+        self._respondida = True
+
+    async def send_modal(self, modal):
+        self._respondida = True
+
+
+class FollowupFalso:
+    async def send(self, *args, **kwargs):
+        pass
+
+
+def criar_interacao(usuario: SimpleNamespace):
+    import discord
+
+    return SimpleNamespace(
+        user=usuario,
+        response=RespostaFalsa(),
+        followup=FollowupFalso(),
+        extras={},
+        created_at=discord.utils.utcnow(),
+        guild=None,
+        channel=None,
+        channel_id=0,
+        command=None,
+    )
+
+
+def percentil(amostras: List[float], q: float) -> float:
+    ordenadas = sorted(amostras)
+    if not ordenadas:
+        return 0.0
+    indice = min(len(ordenadas) - 1, max(0, round(q * (len(ordenadas) - 1))))
+    return ordenadas[indice]
+
+
+async def agente(bot, indice: int, rodadas: int, multas_por_rodada: int, latencias: Dict[str, List[float]]):
+    """Um agente: registra jogadores, emite CNH, registra veículo, multa e consulta relatórios"""
+    from config import ROLE_GERENCIA
+
+    usuario = SimpleNamespace(
+        id=900000 + indice, roles=[SimpleNamespace(id=ROLE_GERENCIA)],
+        mention=f"<@{900000 + indice}>", display_name=f"agente{indice}",
+    )
+    hoje = datetime.now().strftime("%d/%m/%Y")
+
+    async def executar(nome: str, comando, *args):
+        inicio = time.perf_counter()
+        await comando.callback(criar_interacao(usuario), *args)
+        latencias.setdefault(nome, []).append(time.perf_counter() - inicio)
+
+    for rodada in range(rodadas):
+        rg = f"B{indice}-{rodada}"
+        placa = f"B{indice:03d}{rodada:04d}"
+        await executar("registrar_jogador", bot.registrar_jogador, rg, f"Jogador {rg}")
+        await executar("cnh_emitir", bot.cnh_emitir, rg, "B")
+        await executar("veiculo_registrar", bot.veiculo_registrar, rg, placa, "Modelo", "preto", 2020, f"CH{placa}")
+        for _ in range(multas_por_rodada):
+            await executar("multar", bot.multar, rg, "avancar_sinal_vermelho", placa)
+        await executar("multa_consultar", bot.multa_consultar, rg)
+        await executar("relatorio_multas_agente", bot.relatorio_multas_agente, usuario)
+        await executar("relatorio_multas_dia", bot.relatorio_multas_dia, hoje)
+        await executar("relatorio_cnhs_suspensas", bot.relatorio_cnhs_suspensas)
+
+
+async def executar_benchmark(agentes: int, rodadas: int, multas_por_rodada: int) -> Dict:
+    import bot
+    import metricas
+
+    latencias: Dict[str, List[float]] = {}
+    inicio = time.perf_counter()
+    await asyncio.gather(*(agente(bot, i, rodadas, multas_por_rodada, latencias) for i in range(agentes)))
+    duracao = time.perf_counter() - inicio
+
+    operacoes = {}
+    for nome, amostras in latencias.items():
+        consultas = metricas.consultas_handlers.histogramas.get(nome)
+        operacoes[nome] = {
+            "operacoes": len(amostras),
+            "p50_ms": percentil(amostras, 0.50) * 1000,
+            "p95_ms": percentil(amostras, 0.95) * 1000,
+            "p99_ms": percentil(amostras, 0.99) * 1000,
+            "max_ms": max(amostras) * 1000,
+            "consultas_por_operacao": consultas.soma / consultas.total if consultas and consultas.total else 0.0,
+        }
+    total = sum(len(amostras) for amostras in latencias.values())
+    bot.db.fechar()
+    return {
+        "total": {"operacoes": total, "duracao_s": duracao, "operacoes_por_segundo": total / duracao},
+        "operacoes": operacoes,
+    }
+
+
+def commit_atual() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecido"
+
+
+def imprimir(resultado: Dict, anterior: Dict = None):
+    total = resultado["total"]
+    print(f"\n{total['operacoes']} operações em {total['duracao_s']:.2f} s "
+          f"({total['operacoes_por_segundo']:.0f} ops/s)")
+    if anterior:
+        variacao = total["operacoes_por_segundo"] / anterior["total"]["operacoes_por_segundo"] - 1
+        print(f"Comparado a {anterior['commit']}: {variacao:+.1%} ops/s")
+    print(f"\n{'operação':<26}{'n':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'consultas':>11}")
+    for nome, op in resultado["operacoes"].items():
+        linha = (f"{nome:<26}{op['operacoes']:>7}{op['p50_ms']:>9.2f}{op['p95_ms']:>9.2f}"
+                 f"{op['p99_ms']:>9.2f}{op['consultas_por_operacao']:>11.1f}")
+        op_anterior = (anterior or {}).get("operacoes", {}).get(nome)
+        if op_anterior and op_anterior["p95_ms"]:
+            linha += f"   p95 {op['p95_ms'] / op_anterior['p95_ms'] - 1:+.0%}"
+        print(linha)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--agentes", type=int, default=8, help="agentes simulados em paralelo")
+    parser.add_argument("--rodadas", type=int, default=50, help="rodadas por agente")
+    parser.add_argument("--multas", type=int, default=3, help="multas aplicadas por rodada")
+    parser.add_argument("--saida", help="arquivo JSON de resultado (padrão: benchmarks/resultados/)")
+    parser.add_argument("--comparar", help="resultado JSON anterior para comparação")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="detran-bench-") as pasta:
+        # O bot abre o banco na importação: o caminho precisa estar definido antes
+        os.environ["DETRAN_DB_PATH"] = os.path.join(pasta, "detran.db")
+        os.environ.setdefault("METRICAS_PORTA", "0")
+        sys.path.insert(0, os.path.join(RAIZ, "detran_bot"))
+        resultado = asyncio.run(executar_benchmark(args.agentes, args.rodadas, args.multas))
+
+    commit = commit_atual()
+    resultado = {
+        "commit": commit,
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "parametros": {"agentes": args.agentes, "rodadas": args.rodadas, "multas": args.multas},
+        **resultado,
+    }
+    anterior = None
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            anterior = json.load(arquivo)
+    imprimir(resultado, anterior)
+
+    saida = args.saida or os.path.join(PASTA_RESULTADOS, f"{datetime.now():%Y%m%d-%H%M%S}-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as arquivo:
+        json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+    print(f"\nResultado salvo em {saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""Verificação das migrações do banco a partir do formato original (datas em texto).
+
+Monta um banco com o esquema e os formatos de data gravados pela versão
+original do bot, preenche-o com dados determinísticos, abre-o com o
+DetranDatabase atual (que aplica as migrações pendentes) e confere:
+
+- versão final do esquema e reabertura sem migrações pendentes;
+- contagem e IDs das linhas de cada tabela;
+- cada data convertida para o epoch UTC esperado (INTEGER);
+- tabelas de resumo iguais aos totais calculados a partir das multas, e
+  iguais ao resultado de reconstruir_resumos();
+- colunas iguais às de um banco criado do zero, integrity_check e
+  foreign_key_check.
+
+Termina com código 1 se alguma verificação falhar.
+
+Uso:
+    python benchmarks/migracoes.py
+    python benchmarks/migracoes.py --jogadores 2000 --multas 50000 --semente 7
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Set, Tuple
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Esquema criado pela versão original do bot, antes de qualquer migração
+ESQUEMA_ORIGINAL = [
+    '''CREATE TABLE players (
+           rg_game TEXT PRIMARY KEY,
+           nome_rp TEXT NOT NULL,
+           cnh_status TEXT DEFAULT 'inativo',
+           pontos_cnh INTEGER DEFAULT 0,
+           telefone TEXT
+       )''',
+    '''CREATE TABLE cnhs (
+           id INTEGER PRIMARY KEY AUTOINCREMENT,
+           jogador_id TEXT NOT NULL,
+           numero_registro TEXT UNIQUE NOT NULL,
+           data_emissao TEXT NOT NULL,
+           data_validade TEXT NOT NULL,
+           categoria TEXT NOT NULL,
+           FOREIGN KEY (jogador_id) REFERENCES players(rg_game)
+       )''',
+    '''CREATE TABLE veiculos (
+           id INTEGER PRIMARY KEY AUTOINCREMENT,
+           proprietario_id TEXT NOT NULL,
+           placa TEXT UNIQUE NOT NULL,
+           modelo TEXT,
+           cor TEXT,
+           ano INTEGER,
+           chassi TEXT UNIQUE,
+           crlv_status TEXT DEFAULT 'ativo',
+           FOREIGN KEY (proprietario_id) REFERENCES players(rg_game)
+       )''',
+    '''CREATE TABLE multas (
+           id INTEGER PRIMARY KEY AUTOINCREMENT,
+           jogador_id TEXT NOT NULL,
+           veiculo_id INTEGER,
+           agente_id TEXT NOT NULL,
+           tipo_infracao TEXT NOT NULL,
+           valor REAL NOT NULL,
+           pontos INTEGER NOT NULL,
+           data_ocorrencia TEXT NOT NULL,
+           status TEXT DEFAULT 'pendente',
+           FOREIGN KEY (jogador_id) REFERENCES players(rg_game),
+           FOREIGN KEY (veiculo_id) REFERENCES veiculos(id)
+       )''',
+    '''CREATE TABLE pagamentos (
+           id INTEGER PRIMARY KEY AUTOINCREMENT,
+           jogador_id TEXT NOT NULL,
+           referencia_id INTEGER NOT NULL,
+           tipo_pagamento TEXT NOT NULL,
+           valor_pago REAL NOT NULL,
+           data_pagamento TEXT NOT NULL,
+           FOREIGN KEY (jogador_id) REFERENCES players(rg_game)
+       )''',
+    '''CREATE TABLE tickets (
+           id INTEGER PRIMARY KEY AUTOINCREMENT,
+           autor_id TEXT NOT NULL,
+           descricao TEXT NOT NULL,
+           status TEXT DEFAULT 'aberto',
+           data_criacao TEXT NOT NULL
+       )''',
+    '''CREATE TABLE sugestoes (
+           id INTEGER PRIMARY KEY AUTOINCREMENT,
+           autor_id TEXT NOT NULL,
+           sugestao TEXT NOT NULL,
+           data_criacao TEXT NOT NULL
+       )''',
+]
+
+# Formatos de data gravados pela versão original
+FORMATO_DIA = "%Y-%m-%d"
+FORMATO_DATA_HORA = "%Y-%m-%d %H:%M:%S"
+
+# Colunas de data convertidas para epoch, com o formato original de cada uma
+COLUNAS_DATA = {
+    "cnhs": {"data_emissao": FORMATO_DIA, "data_validade": FORMATO_DIA},
+    "multas": {"data_ocorrencia": FORMATO_DATA_HORA},
+    "tickets": {"data_criacao": FORMATO_DATA_HORA},
+    "sugestoes": {"data_criacao": FORMATO_DATA_HORA},
+}
+
+INFRACOES = ("avancar_sinal_vermelho", "excesso_velocidade", "estacionamento_irregular", "direcao_perigosa")
+STATUS_MULTA = ("pendente", "paga", "recorrida")
+
+
+def epochs_locais(texto: str, formato: str) -> Set[int]:
+    """Epochs UTC aceitos para uma data em texto no horário local.
+
+    Fora das mudanças de horário de verão há um único valor; na hora repetida
+    (ou inexistente) da mudança, as duas interpretações são válidas.
+    """
+    data = datetime.strptime(texto, formato)
+    return {int(data.timestamp()), int(data.replace(fold=1).timestamp())}
+
+
+def criar_banco_original(caminho: str, jogadores: int, multas: int, semente: int) -> Dict[str, List[tuple]]:
+    """Cria o banco no formato original e retorna as linhas gravadas em cada tabela"""
+    aleatorio = random.Random(semente)
+    agora = datetime.now().replace(microsecond=0)
+
+    def data_hora(dias: int = 400) -> datetime:
+        return agora - timedelta(seconds=aleatorio.randint(0, dias * 86400))
+
+    linhas: Dict[str, List[tuple]] = defaultdict(list)
+    rgs = [f"RG{i:06d}" for i in range(jogadores)]
+    for rg in rgs:
+        linhas["players"].append((rg, f"Jogador {rg}", aleatorio.choice(("inativo", "ativa", "suspensa")),
+                                  aleatorio.randint(0, 40), None))
+    for i, rg in enumerate(rgs[: jogadores // 2], start=1):
+        emissao = data_hora()
+        linhas["cnhs"].append((i, rg, f"CNH{rg}B{emissao:%Y%m%d}", emissao.strftime(FORMATO_DIA),
+                               (emissao + timedelta(days=15)).strftime(FORMATO_DIA), "B"))
+    for i, rg in enumerate(rgs[: jogadores // 3], start=1):
+        linhas["veiculos"].append((i, rg, f"PLC{i:04d}", "Modelo", "preto", 2020, f"CH{i:06d}", "ativo"))
+    for i in range(1, multas + 1):
+        veiculo = aleatorio.choice(linhas["veiculos"])
+        linhas["multas"].append((
+            i, veiculo[1], veiculo[0], f"agente{aleatorio.randint(1, 12)}", aleatorio.choice(INFRACOES),
+            float(aleatorio.choice((150, 293.47, 500, 880.41, 1000))), aleatorio.choice((3, 4, 5, 7)),
+            data_hora().strftime(FORMATO_DATA_HORA), aleatorio.choice(STATUS_MULTA),
+        ))
+    for i, multa in enumerate((m for m in linhas["multas"] if m[8] == "paga"), start=1):
+        linhas["pagamentos"].append((i, multa[1], multa[0], "multa", multa[5], data_hora().strftime(FORMATO_DATA_HORA)))
+    for i in range(1, jogadores // 4 + 1):
+        linhas["tickets"].append((i, str(900000 + i), f"Ticket {i}", aleatorio.choice(("aberto", "fechado")),
+                                  data_hora().strftime(FORMATO_DATA_HORA)))
+        linhas["sugestoes"].append((i, str(900000 + i), f"Sugestão {i}", data_hora().strftime(FORMATO_DATA_HORA)))
+
+    conn = sqlite3.connect(caminho)
+    with conn:
+        for instrucao in ESQUEMA_ORIGINAL:
+            conn.execute(instrucao)
+        for tabela, valores in linhas.items():
+            marcadores = ", ".join("?" * len(valores[0]))
+            conn.executemany(f"INSERT INTO {tabela} VALUES ({marcadores})", valores)
+    conn.close()
+    return linhas
+
+
+def resumos_esperados(multas: List[tuple]) -> Dict[str, Dict[Any, tuple]]:
+    """Totais das tabelas de resumo calculados diretamente das multas originais"""
+    agente: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0, 0, 0, 0])
+    agente_infracao: Dict[Tuple[str, str], int] = defaultdict(int)
+    dia: Dict[Tuple[str, str], List[float]] = defaultdict(lambda: [0, 0.0])
+    for _, _, _, agente_id, infracao, valor, _, data, status in multas:
+        totais = agente[agente_id]
+        totais[0] += 1
+        totais[1] += valor
+        totais[2 + STATUS_MULTA.index(status)] += 1
+        agente_infracao[(agente_id, infracao)] += 1
+        dia[(data[:10], infracao)][0] += 1
+        dia[(data[:10], infracao)][1] += valor
+    return {
+        "resumo_multas_agente": {k: (v[0], round(v[1], 2), v[2], v[3], v[4]) for k, v in agente.items()},
+        "resumo_multas_agente_infracao": {k: (v,) for k, v in agente_infracao.items()},
+        "resumo_multas_dia": {k: (v[0], round(v[1], 2)) for k, v in dia.items()},
+    }
+
+
+def ler_resumos(conn: sqlite3.Connection) -> Dict[str, Dict[Any, tuple]]:
+    return {
+        "resumo_multas_agente": {
+            linha[0]: (linha[1], round(linha[2], 2), *linha[3:])
+            for linha in conn.execute(
+                "SELECT agente_id, total, valor_total, pendentes, pagas, recorridas FROM resumo_multas_agente")
+        },
+        "resumo_multas_agente_infracao": {
+            (linha[0], linha[1]): (linha[2],)
+            for linha in conn.execute(
+                "SELECT agente_id, tipo_infracao, quantidade FROM resumo_multas_agente_infracao")
+        },
+        "resumo_multas_dia": {
+            (linha[0], linha[1]): (linha[2], round(linha[3], 2))
+            for linha in conn.execute("SELECT dia, tipo_infracao, quantidade, valor_total FROM resumo_multas_dia")
+        },
+    }
+
+
+def colunas(conn: sqlite3.Connection, tabela: str) -> List[tuple]:
+    """(nome, tipo, not null, padrão, pk) de cada coluna da tabela"""
+    return [tuple(linha[1:]) for linha in conn.execute(f"PRAGMA table_info({tabela})")]
+
+
+def verificar(jogadores: int, multas: int, semente: int) -> List[str]:
+    """Executa as verificações e retorna a lista de falhas (vazia se tudo conferir)"""
+    from database import DetranDatabase, MIGRACOES
+
+    falhas: List[str] = []
+
+    def conferir(condicao: bool, mensagem: str):
+        if not condicao:
+            falhas.append(mensagem)
+
+    with tempfile.TemporaryDirectory(prefix="detran-migracoes-") as pasta:
+        caminho = os.path.join(pasta, "original.db")
+        originais = criar_banco_original(caminho, jogadores, multas, semente)
+        esperados = resumos_esperados(originais["multas"])
+
+        db = DetranDatabase(caminho)
+        conferir(db.versao_esquema() == MIGRACOES[-1][0],
+                 f"versão do esquema {db.versao_esquema()}, esperada {MIGRACOES[-1][0]}")
+        conferir(db.aplicar_migracoes() == [], "migrações reaplicadas em um banco já migrado")
+        conn = db._conexao()
+
+        for tabela, linhas in originais.items():
+            chave = "rg_game" if tabela == "players" else "id"
+            ids = [linha[0] for linha in conn.execute(f"SELECT {chave} FROM {tabela} ORDER BY {chave}")]
+            conferir(ids == sorted(linha[0] for linha in linhas),
+                     f"{tabela}: {len(ids)} linhas após a migração, {len(linhas)} antes (ou IDs diferentes)")
+
+        for tabela, datas in COLUNAS_DATA.items():
+            nomes = [coluna[0] for coluna in colunas(conn, tabela)]
+            for coluna, formato in datas.items():
+                posicao = nomes.index(coluna)
+                esperadas = {linha[0]: epochs_locais(linha[posicao], formato) for linha in originais[tabela]}
+                convertidas = dict(conn.execute(f"SELECT id, {coluna} FROM {tabela}"))
+                tipos = {tipo for (tipo,) in conn.execute(f"SELECT DISTINCT typeof({coluna}) FROM {tabela}")}
+                conferir(tipos <= {"integer"}, f"{tabela}.{coluna}: tipos {sorted(tipos)} após a migração")
+                erradas = [i for i, valores in esperadas.items() if convertidas.get(i) not in valores]
+                conferir(not erradas, f"{tabela}.{coluna}: {len(erradas)} datas convertidas incorretamente "
+                                      f"(ex.: id {erradas[:3]})")
+
+        resumos = ler_resumos(conn)
+        for tabela, valores in esperados.items():
+            conferir(resumos[tabela] == valores, f"{tabela}: totais diferentes dos calculados a partir das multas")
+        dias = sorted({dia for dia, _ in esperados["resumo_multas_dia"]})
+        relatorio = db.get_relatorio_multas_dia(dias[-1])
+        conferir(relatorio["total"] == sum(v[0] for (d, _), v in esperados["resumo_multas_dia"].items()
+                                          if d == dias[-1]),
+                 f"get_relatorio_multas_dia({dias[-1]}) diferente do esperado")
+        db.reconstruir_resumos()
+        conferir(ler_resumos(conn) == resumos, "reconstruir_resumos() diverge dos resumos migrados")
+
+        conferir(conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok", "integrity_check falhou")
+        conferir(not conn.execute("PRAGMA foreign_key_check").fetchall(), "foreign_key_check encontrou violações")
+
+        novo = DetranDatabase(os.path.join(pasta, "novo.db"))
+        conn_novo = novo._conexao()
+        tabelas = [nome for (nome,) in conn_novo.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name")]
+        for tabela in tabelas:
+            conferir(colunas(conn, tabela) == colunas(conn_novo, tabela),
+                     f"{tabela}: colunas do banco migrado diferem das de um banco novo")
+        indices = "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%' ORDER BY name"
+        conferir([n for (n,) in conn.execute(indices)] == [n for (n,) in conn_novo.execute(indices)],
+                 "índices do banco migrado diferem dos de um banco novo")
+        novo.fechar()
+        db.fechar()
+    return falhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jogadores", type=int, default=500, help="jogadores no banco original")
+    parser.add_argument("--multas", type=int, default=5000, help="multas no banco original")
+    parser.add_argument("--semente", type=int, default=1, help="semente dos dados gerados")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.join(RAIZ, "detran_bot"))
+    falhas = verificar(args.jogadores, args.multas, args.semente)
+    for falha in falhas:
+        print(f"FALHA: {falha}")
+    if falhas:
+        sys.exit(1)
+    print(f"Migrações verificadas: {args.jogadores} jogadores, {args.multas} multas, semente {args.semente}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""Teste de carga de ponta a ponta: reproduz interações gravadas contra o bot completo.
+
+Sobe o substituto local do Discord (discord_falso.py), conecta o bot a ele
+com um banco temporário e injeta as interações de um arquivo JSONL no ritmo
+gravado, multiplicado por ``--velocidade``. Ao final mostra a latência de
+reconhecimento das interações, as chamadas REST por rota e os limites de taxa
+atingidos, e grava o resultado em JSON.
+
+Cada linha do arquivo é um evento com o instante ``t`` (segundos desde o
+início), o ``usuario`` e os ``cargos`` (IDs ou nomes de constantes do
+config, como "ROLE_GERENCIA") e o ``tipo``:
+
+    {"t": 0.0, "usuario": 1001, "cargos": ["ROLE_GERENCIA"], "tipo": "comando",
+     "nome": "multar", "opcoes": {"rg_game": "A1", "tipo_infracao": "avancar_sinal_vermelho"}}
+    {"t": 0.5, "usuario": 1001, "tipo": "autocompletar", "nome": "multar",
+     "opcoes": {"tipo_infracao": "sinal"}, "foco": "tipo_infracao"}
+    {"t": 1.0, "usuario": 1001, "tipo": "botao", "custom_id": "painel_aplicar_multa",
+     "canal": "CANAL_PAINEL_FUNCIONARIOS"}
+    {"t": 1.2, "usuario": 1001, "tipo": "modal", "campos": {"RG do jogador": "A1", ...}}
+    {"t": 2.0, "usuario": 2001, "tipo": "entrada"}
+
+Eventos ``entrada`` simulam a chegada de um membro na guilda (GUILD_MEMBER_ADD).
+
+Uso:
+    python benchmarks/replay.py benchmarks/interacoes_exemplo.jsonl --velocidade 2
+    python benchmarks/replay.py --gerar 20 --rodadas 10 --gravar /tmp/trafego.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASTA_RESULTADOS = os.path.join(RAIZ, "benchmarks", "resultados")
+# Tempo máximo, após o último evento, esperando as interações pendentes
+ESPERA_FINAL = 30.0
+# Tempo máximo esperando a fila de cargos esvaziar (ondas de entradas respeitam o limite de taxa)
+ESPERA_CARGOS = 120.0
+
+
+def carregar_eventos(caminho: str) -> List[Dict[str, Any]]:
+    with open(caminho, encoding="utf-8") as arquivo:
+        eventos = [json.loads(linha) for linha in arquivo if linha.strip()]
+    return sorted(eventos, key=lambda evento: evento.get("t", 0.0))
+
+
+def gerar_eventos(agentes: int, rodadas: int, intervalo: float, entradas: int = 0) -> List[Dict[str, Any]]:
+    """Tráfego sintético: cada agente registra, emite CNH, multa pelo painel e consulta.
+
+    ``entradas`` acrescenta uma onda de novos membros no primeiro segundo.
+    """
+    eventos: List[Dict[str, Any]] = [
+        {"t": round(indice / max(entradas, 1), 3), "usuario": 500000 + indice, "tipo": "entrada"}
+        for indice in range(entradas)
+    ]
+    for agente in range(agentes):
+        usuario = 1000 + agente
+        t = agente * intervalo / max(agentes, 1)
+
+        def evento(tipo: str, **dados):
+            nonlocal t
+            eventos.append({"t": round(t, 3), "usuario": usuario, "cargos": ["ROLE_GERENCIA", "ROLE_REGISTRADO"],
+                            "tipo": tipo, **dados})
+            t += intervalo
+
+        for rodada in range(rodadas):
+            rg = f"R{agente}-{rodada}"
+            placa = f"R{agente:03d}{rodada:04d}"
+            evento("comando", nome="registrar_jogador", opcoes={"rg_game": rg, "nome_rp": f"Jogador {rg}"})
+            evento("comando", nome="cnh_emitir", opcoes={"rg_game": rg, "categoria": "B"})
+            evento("comando", nome="veiculo_registrar", opcoes={
+                "rg_game": rg, "placa": placa, "modelo": "Modelo", "cor": "preto", "ano": 2020, "chassi": f"CH{placa}"})
+            evento("autocompletar", nome="multar", opcoes={"rg_game": rg, "tipo_infracao": "sinal"},
+                   foco="tipo_infracao")
+            evento("comando", nome="multar", opcoes={
+                "rg_game": rg, "tipo_infracao": "avancar_sinal_vermelho", "placa_veiculo": placa})
+            evento("botao", custom_id="painel_aplicar_multa", canal="CANAL_PAINEL_FUNCIONARIOS")
+            evento("modal", campos={"RG do jogador": rg, "Código da infração": "estacionamento_irregular",
+                                    "Placa do veículo": placa})
+            evento("comando", nome="multa_consultar", opcoes={"rg_game": rg})
+            evento("comando", nome="cnh_consultar", opcoes={"rg_game": rg})
+    return sorted(eventos, key=lambda e: e["t"])
+
+
+def resolver_ids(eventos: List[Dict[str, Any]]):
+    """Troca nomes de constantes do config (cargos e canais) pelos IDs"""
+    import config
+
+    def resolver(valor):
+        return getattr(config, valor) if isinstance(valor, str) and not valor.isdigit() else int(valor)
+
+    for evento in eventos:
+        if "cargos" in evento:
+            evento["cargos"] = [resolver(cargo) for cargo in evento["cargos"]]
+        if "canal" in evento:
+            evento["canal"] = resolver(evento["canal"])
+
+
+def criar_discord_falso():
+    import config
+    from discord_falso import DiscordFalso
+
+    canais = {getattr(config, nome): nome.lower() for nome in dir(config) if nome.startswith("CANAL_")}
+    # O primeiro canal é o padrão das interações sem "canal"
+    canais = {config.CANAL_PAINEL_FUNCIONARIOS: "canal_painel_funcionarios", **canais}
+    categorias = {getattr(config, nome): nome.lower() for nome in dir(config) if nome.startswith("CATEGORIA_")}
+    cargos = {getattr(config, nome): nome.lower() for nome in dir(config) if nome.startswith("ROLE_")}
+    return DiscordFalso(canais, categorias, cargos)
+
+
+async def reproduzir(falso, eventos: List[Dict[str, Any]], velocidade: float) -> float:
+    """Injeta os eventos nos instantes gravados e retorna a duração da reprodução"""
+    erros = 0
+
+    async def enviar(evento):
+        nonlocal erros
+        try:
+            if evento["tipo"] == "entrada":
+                await falso.entrar_membro(int(evento["usuario"]), evento.get("cargos"))
+            else:
+                await falso.enviar_interacao(evento)
+        except (ValueError, TimeoutError) as e:
+            erros += 1
+            print(f"Evento ignorado ({e}): {json.dumps(evento, ensure_ascii=False)}")
+
+    inicio = time.perf_counter()
+    tarefas = []
+    for evento in eventos:
+        espera = inicio + evento.get("t", 0.0) / velocidade - time.perf_counter()
+        if espera > 0:
+            await asyncio.sleep(espera)
+        tarefas.append(asyncio.create_task(enviar(evento)))
+    await asyncio.gather(*tarefas)
+    pendentes = await falso.aguardar_respostas(ESPERA_FINAL)
+    if pendentes or erros:
+        print(f"{pendentes} interações sem resposta, {erros} eventos ignorados")
+    return time.perf_counter() - inicio
+
+
+async def executar(eventos: List[Dict[str, Any]], velocidade: float) -> Dict[str, Any]:
+    import discord
+    import yarl
+
+    falso = criar_discord_falso()
+    url = await falso.iniciar()
+    discord.http.Route.BASE = f"{url}/api/v10"
+    discord.gateway.DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(falso.url_gateway)
+
+    import bot
+
+    # Só há uma guilda: não é preciso esperar outros GUILD_CREATE antes do on_ready
+    bot.bot._connection.guild_ready_timeout = 0.1
+    for evento in eventos:
+        if evento["tipo"] != "entrada":
+            falso.adicionar_membro(int(evento["usuario"]), evento.get("cargos"))
+
+    cliente = asyncio.create_task(bot.bot.start("token-falso"))
+    try:
+        pronto = asyncio.ensure_future(asyncio.gather(falso.comandos_sincronizados.wait(), bot.bot.wait_until_ready()))
+        await asyncio.wait((pronto, cliente), timeout=30, return_when=asyncio.FIRST_COMPLETED)
+        if cliente.done():
+            cliente.result()
+        if not pronto.done():
+            pronto.cancel()
+            raise TimeoutError("O bot não ficou pronto em 30 s")
+        # Chamadas feitas na inicialização (sincronização, painéis) não entram na medição
+        await falso.aguardar_ociosidade()
+        if bot._reconciliacao is not None:
+            await bot._reconciliacao
+        falso.chamadas.clear()
+        falso.limites_atingidos.clear()
+        duracao = await reproduzir(falso, eventos, velocidade)
+        try:
+            await asyncio.wait_for(bot.fila_cargos.aguardar(), ESPERA_CARGOS)
+        except asyncio.TimeoutError:
+            print("A fila de cargos não esvaziou a tempo")
+        return {"duracao_s": duracao, "eventos": len(eventos), "cargos": bot.fila_cargos.estatisticas(),
+                **falso.relatorio()}
+    finally:
+        await bot.bot.close()
+        await asyncio.gather(cliente, return_exceptions=True)
+        await falso.parar()
+        bot.db.fechar()
+
+
+def imprimir(resultado: Dict[str, Any]):
+    print(f"\n{resultado['eventos']} eventos em {resultado['duracao_s']:.2f} s "
+          f"({resultado['eventos'] / resultado['duracao_s']:.0f}/s)")
+    print("\nLatência até a primeira resposta (p50/p95/p99) e até a última (conclusão p95):")
+    print(f"{'interação':<34}{'n':>6}{'adiadas':>9}{'expiradas':>11}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'concl. ms':>11}")
+    for nome, dados in resultado["interacoes"].items():
+        print(f"{nome[:33]:<34}{dados['interacoes']:>6}{dados['adiadas']:>9}{dados['expiradas']:>11}"
+              f"{dados['reconhecimento_p50_ms']:>9.1f}{dados['reconhecimento_p95_ms']:>9.1f}"
+              f"{dados['reconhecimento_p99_ms']:>9.1f}{dados['conclusao_p95_ms']:>11.1f}")
+    print(f"\nChamadas REST: {resultado['rest']['total']}")
+    for rota, total in resultado["rest"]["por_rota"].items():
+        print(f"  {total:>7}  {rota}")
+    cargos = resultado["cargos"]
+    print(f"Fila de cargos: {cargos['aplicadas']} aplicadas, {cargos['mescladas']} mescladas, "
+          f"{cargos['novas_tentativas']} novas tentativas, {cargos['falhas']} falhas")
+    print(f"Limites de taxa atingidos (429): {resultado['limites_atingidos']['total']}")
+    for rota, total in resultado["limites_atingidos"]["por_rota"].items():
+        print(f"  {total:>7}  {rota}")
+    for rota, total in resultado["rotas_nao_tratadas"].items():
+        print(f"Rota não simulada ({total}x): {rota}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("arquivo", nargs="?", help="arquivo JSONL com as interações gravadas")
+    parser.add_argument("--velocidade", type=float, default=1.0, help="multiplicador do ritmo gravado")
+    parser.add_argument("--gerar", type=int, metavar="AGENTES", help="gera tráfego sintético com N agentes")
+    parser.add_argument("--entradas", type=int, default=0, help="novos membros entrando no tráfego gerado")
+    parser.add_argument("--rodadas", type=int, default=5, help="rodadas por agente no tráfego gerado")
+    parser.add_argument("--intervalo", type=float, default=0.5, help="segundos entre ações de um agente gerado")
+    parser.add_argument("--gravar", help="grava os eventos gerados neste arquivo JSONL")
+    parser.add_argument("--saida", help="arquivo JSON de resultado (padrão: benchmarks/resultados/)")
+    args = parser.parse_args()
+    if not args.arquivo and not args.gerar:
+        parser.error("informe um arquivo JSONL ou --gerar")
+
+    eventos = gerar_eventos(args.gerar, args.rodadas, args.intervalo, args.entradas) if args.gerar else carregar_eventos(args.arquivo)
+    if args.gravar:
+        with open(args.gravar, "w", encoding="utf-8") as arquivo:
+            arquivo.writelines(json.dumps(evento, ensure_ascii=False) + "\n" for evento in eventos)
+
+    with tempfile.TemporaryDirectory(prefix="detran-replay-") as pasta:
+        # O bot abre o banco na importação: o caminho precisa estar definido antes
+        os.environ["DETRAN_DB_PATH"] = os.path.join(pasta, "detran.db")
+        os.environ.setdefault("METRICAS_PORTA", "0")
+        sys.path.insert(0, os.path.join(RAIZ, "detran_bot"))
+        resolver_ids(eventos)
+        resultado = asyncio.run(executar(eventos, args.velocidade))
+
+    resultado = {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "parametros": {"arquivo": args.arquivo, "gerar": args.gerar, "entradas": args.entradas,
+                       "velocidade": args.velocidade},
+        **resultado,
+    }
+    imprimir(resultado)
+    saida = args.saida or os.path.join(PASTA_RESULTADOS, f"replay-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as arquivo:
+        json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+    print(f"\nResultado salvo em {saida}")
+
+
+if __name__ == "__main__":
+    main()
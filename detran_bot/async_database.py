@@ -0,0 +1,94 @@
+"""Fachada assíncrona para o banco de dados do Detran.
+
+As chamadas ao SQLite são executadas fora do event loop do discord.py, para que
+um commit lento não atrase heartbeats do gateway nem outras interações.
+"""
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from database import DetranDatabase
+from metricas import medir_banco
+
+# Métodos somente leitura, executados no pool de leitores.
+# Qualquer outro método é tratado como escrita e serializado na thread escritora.
+METODOS_LEITURA = frozenset({
+    "get_player",
+    "get_cnhs_jogador",
+    "get_veiculo",
+    "listar_multas_jogador_pagina",
+    "get_totais_multas_jogador",
+    "get_multa",
+    "get_relatorio_multas_agente",
+    "get_relatorio_multas_dia",
+    "listar_cnhs_restritas_pagina",
+    "listar_tickets_pagina",
+    "get_painel",
+    "get_configuracao",
+    "get_vinculo_discord",
+    "estatisticas_cache",
+    "consultas_mais_caras",
+})
+
+
+class AsyncDetranDatabase:
+    """Espelha a API do DetranDatabase com métodos aguardáveis.
+
+    Escritas rodam em uma única thread dedicada e leituras em um pequeno pool
+    de threads; cada thread mantém sua própria conexão (modo WAL permite ler
+    enquanto a escritora confirma transações). O número de chamadas pendentes
+    em cada fila é limitado: quando o limite é atingido o chamador aguarda uma
+    vaga, em vez de acumular trabalho indefinidamente.
+    """
+
+    def __init__(self, db: DetranDatabase, leitores: int = 2,
+                 limite_fila_escrita: int = 64, limite_fila_leitura: int = 128):
+        self.db = db
+        self._escritor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="detran-db-escrita")
+        self._leitores = ThreadPoolExecutor(max_workers=leitores, thread_name_prefix="detran-db-leitura")
+        self._vagas_escrita = asyncio.Semaphore(limite_fila_escrita)
+        self._vagas_leitura = asyncio.Semaphore(limite_fila_leitura)
+
+    @property
+    def db_path(self) -> str:
+        return self.db.db_path
+
+    def _executar_medindo(self, nome: str, funcao, args, kwargs):
+        with medir_banco(nome):
+            return funcao(*args, **kwargs)
+
+    async def _executar(self, nome: str, *args, **kwargs):
+        """Executa um método do banco síncrono na fila adequada"""
+        funcao = getattr(self.db, nome)
+        if nome in METODOS_LEITURA:
+            executor, vagas = self._leitores, self._vagas_leitura
+        else:
+            executor, vagas = self._escritor, self._vagas_escrita
+        async with vagas:
+            loop = asyncio.get_running_loop()
+            # A cópia do contexto leva a medição do handler atual para a thread do banco
+            contexto = contextvars.copy_context()
+            return await loop.run_in_executor(
+                executor, contexto.run, self._executar_medindo, nome, funcao, args, kwargs
+            )
+
+    def __getattr__(self, nome: str):
+        atributo = getattr(self.db, nome)
+        if nome.startswith("_") or not callable(atributo):
+            raise AttributeError(nome)
+
+        @functools.wraps(atributo)
+        async def metodo(*args, **kwargs):
+            return await self._executar(nome, *args, **kwargs)
+
+        # Guardar o método para que as próximas chamadas não passem por __getattr__
+        setattr(self, nome, metodo)
+        return metodo
+
+    def fechar(self):
+        """Aguarda as operações pendentes e fecha as conexões"""
+        self._escritor.shutdown(wait=True)
+        self._leitores.shutdown(wait=True)
+        self.db.fechar()
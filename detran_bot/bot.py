@@ -1,12 +1,27 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
+import asyncio
+import csv
+import hashlib
+import io
+import json
 import os
+import re
+import time
 from datetime import datetime
-import sqlite3
+from urllib.parse import quote, unquote
 from database import DetranDatabase, DB_PATH
+from async_database import AsyncDetranDatabase
 from config import *
-from utils import verificar_permissao, criar_embed, enviar_log
+from utils import verificar_permissao, criar_embed, enviar_log, ler_registros, formatar_data, fila_logs
+from indice_infracoes import indice_infracoes
+from referencias import enviar_referencia
+from interacoes import com_prazo, medido, responder, editar, adiar, estatisticas_interacoes
+from metricas import instrumentar_http, adicionar_coletor, iniciar_servidor_metricas, resumo_handlers
+from permissoes import invalidar_membro, limpar_cache_permissoes
+from fila_cargos import fila_cargos, reconciliar_cargos
+from pool_tickets import pool_tickets
 
 # Configuração dos intents
 intents = discord.Intents.default()
@@ -15,15 +30,66 @@ intents.members = True
 
 # Inicialização do bot
 bot = commands.Bot(command_prefix='!', intents=intents)
-db = DetranDatabase(db_path=DB_PATH)
+db = AsyncDetranDatabase(DetranDatabase(db_path=DB_PATH))
+instrumentar_http(bot.http)
+
+
+async def coletar_estado():
+    """Valores instantâneos exportados junto com os histogramas de métricas."""
+    medidas = []
+    for nome, estatisticas in (await db.estatisticas_cache()).items():
+        for chave in ("itens", "acertos", "falhas"):
+            medidas.append((f"detran_cache_{chave}", {"cache": nome}, estatisticas[chave]))
+    for chave, valor in fila_logs.estatisticas().items():
+        medidas.append((f"detran_logs_{chave}", {}, valor))
+    for chave, valor in fila_cargos.estatisticas().items():
+        medidas.append((f"detran_cargos_{chave}", {}, valor))
+    for chave, valor in pool_tickets.estatisticas().items():
+        medidas.append((f"detran_pool_tickets_{chave}", {}, valor))
+    for handler, contadores in estatisticas_interacoes().items():
+        medidas.append(("detran_interacoes_adiadas", {"handler": handler}, contadores["adiadas"]))
+    return medidas
+
+
+adicionar_coletor(coletar_estado)
+
+
+async def registrar_membro_flow(interaction: discord.Interaction, nome: str, rg: str):
+    """Registra o membro com uma única edição (apelido e cargos) e grava o vínculo no banco."""
+    await adiar(interaction, ephemeral=True)
+    membro = interaction.user
+    # Cargos calculados a partir do cache: troca o inicial pelo de registrado
+    cargos = {cargo.id: cargo for cargo in membro.roles if not cargo.is_default()}
+    cargos.pop(ROLE_INICIAL, None)
+    role_registrado = interaction.guild.get_role(ROLE_REGISTRADO)
+    if role_registrado:
+        cargos[role_registrado.id] = role_registrado
+
+    # O Discord limita apelidos a 32 caracteres
+    edicao, vinculo = await asyncio.gather(
+        membro.edit(nick=f"{nome} | {rg}"[:32], roles=list(cargos.values()), reason="Registro no servidor"),
+        db.vincular_discord(membro.id, rg, nome),
+        return_exceptions=True
+    )
+    if isinstance(vinculo, Exception):
+        print(f"Erro ao gravar vínculo de {membro} ({membro.id}): {vinculo}")
+    if isinstance(edicao, discord.Forbidden):
+        # Sem permissão para o apelido (ex.: dono do servidor): os cargos seguem pela fila
+        fila_cargos.agendar(membro, adicionar=(ROLE_REGISTRADO,), remover=(ROLE_INICIAL,),
+                            motivo="Registro no servidor")
+    elif isinstance(edicao, Exception):
+        raise edicao
+
+    embed = criar_embed("sucesso", "Registro concluído", f"Bem-vindo, {nome}!")
+    await responder(interaction, embed=embed, ephemeral=True)
 
 
 async def registrar_jogador_flow(interaction: discord.Interaction, rg_game: str, nome_rp: str, telefone: str = None):
     if not verificar_permissao(interaction, "registrar"):
         embed = criar_embed("erro", "Sem Permissão", "Você não tem permissão para executar este comando.")
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await responder(interaction, embed=embed, ephemeral=True)
         return
-    if db.registrar_player(rg_game, nome_rp, telefone):
+    if await db.registrar_player(rg_game, nome_rp, telefone):
         embed = criar_embed(
             "sucesso",
             "Jogador Registrado",
@@ -31,104 +97,104 @@ async def registrar_jogador_flow(interaction: discord.Interaction, rg_game: str,
         )
     else:
         embed = criar_embed("erro", "Erro no Registro", f"Jogador com RG {rg_game} já está registrado.")
-    await interaction.response.send_message(embed=embed)
+    await responder(interaction, embed=embed)
 
 
 async def cnh_emitir_flow(interaction: discord.Interaction, rg_game: str, categoria: str, nome_rp: str = None):
     if not verificar_permissao(interaction, "cnh_emitir"):
         embed = criar_embed("erro", "Sem Permissão", "Você não tem permissão para executar este comando.")
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await responder(interaction, embed=embed, ephemeral=True)
         return
-    player = db.get_player(rg_game)
+    player = await db.get_player(rg_game)
     if not player:
         if nome_rp:
-            db.registrar_player(rg_game, nome_rp)
-            player = db.get_player(rg_game)
+            await db.registrar_player(rg_game, nome_rp)
+            player = await db.get_player(rg_game)
         else:
             embed = criar_embed("erro", "Jogador Não Encontrado", f"Jogador com RG {rg_game} não registrado. Informe o nome para registrá-lo.")
-            await interaction.response.send_message(embed=embed)
+            await responder(interaction, embed=embed)
             return
-    numero_registro = db.emitir_cnh(rg_game, categoria)
+    numero_registro = await db.emitir_cnh(rg_game, categoria)
     embed = criar_embed(
         "sucesso",
         "CNH Emitida",
-        f"**Jogador:** {player['nome_rp']}\n**RG:** {rg_game}\n**Categoria:** {categoria}\n**Número:** {numero_registro}",
+        f"**Jogador:** {player.nome_rp}\n**RG:** {rg_game}\n**Categoria:** {categoria}\n**Número:** {numero_registro}",
     )
-    await interaction.response.send_message(embed=embed)
+    await responder(interaction, embed=embed)
 
 
 async def cnh_consultar_flow(interaction: discord.Interaction, rg_game: str):
-    player = db.get_player(rg_game)
+    player = await db.get_player(rg_game)
     if not player:
         embed = criar_embed("erro", "Jogador Não Encontrado", f"Não foi encontrado jogador com RG {rg_game}.")
-        await interaction.response.send_message(embed=embed)
+        await responder(interaction, embed=embed)
         return
-    cnhs = db.get_cnhs_jogador(rg_game)
+    cnhs = await db.get_cnhs_jogador(rg_game)
     embed = discord.Embed(
-        title=f"📋 Consulta CNH - {player['nome_rp']}",
+        title=f"📋 Consulta CNH - {player.nome_rp}",
         color=CORES["info"]
     )
     embed.add_field(name="RG", value=rg_game, inline=True)
-    embed.add_field(name="Status CNH", value=player['cnh_status'].title(), inline=True)
-    embed.add_field(name="Pontos", value=f"{player['pontos_cnh']}/30", inline=True)
+    embed.add_field(name="Status CNH", value=player.cnh_status.title(), inline=True)
+    embed.add_field(name="Pontos", value=f"{player.pontos_cnh}/30", inline=True)
     if cnhs:
-        categorias = ", ".join([cnh['categoria'] for cnh in cnhs])
+        categorias = ", ".join([cnh.categoria for cnh in cnhs])
         embed.add_field(name="Categorias", value=categorias, inline=False)
         for cnh in cnhs:
             embed.add_field(
-                name=f"CNH {cnh['categoria']}",
-                value=f"**Número:** {cnh['numero_registro']}\n**Emissão:** {cnh['data_emissao']}\n**Validade:** {cnh['data_validade']}",
+                name=f"CNH {cnh.categoria}",
+                value=f"**Número:** {cnh.numero_registro}\n**Emissão:** {formatar_data(cnh.data_emissao)}\n**Validade:** {formatar_data(cnh.data_validade)}",
                 inline=True
             )
     else:
         embed.add_field(name="CNHs", value="Nenhuma CNH emitida", inline=False)
-    await interaction.response.send_message(embed=embed)
+    await responder(interaction, embed=embed)
 
 
 async def veiculo_registrar_flow(interaction: discord.Interaction, rg_game: str, placa: str, modelo: str, cor: str, ano: int, chassi: str):
     if not verificar_permissao(interaction, "veiculo_registrar"):
         embed = criar_embed("erro", "Sem Permissão", "Você não tem permissão para executar este comando.")
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await responder(interaction, embed=embed, ephemeral=True)
         return
-    player = db.get_player(rg_game)
+    player = await db.get_player(rg_game)
     if not player:
         embed = criar_embed("erro", "Proprietário Não Encontrado", f"Não foi encontrado jogador com RG {rg_game}.")
-        await interaction.response.send_message(embed=embed)
+        await responder(interaction, embed=embed)
         return
-    if db.registrar_veiculo(rg_game, placa.upper(), modelo, cor, ano, chassi):
+    if await db.registrar_veiculo(rg_game, placa.upper(), modelo, cor, ano, chassi):
         embed = criar_embed(
             "sucesso",
             "Veículo Registrado",
-            f"**Proprietário:** {player['nome_rp']}\n**Placa:** {placa.upper()}\n**Modelo:** {modelo}\n**Cor:** {cor}\n**Ano:**{ano}"
+            f"**Proprietário:** {player.nome_rp}\n**Placa:** {placa.upper()}\n**Modelo:** {modelo}\n**Cor:** {cor}\n**Ano:**{ano}"
         )
     else:
         embed = criar_embed("erro", "Erro no Registro", f"Veículo com placa {placa.upper()} já está registrado.")
-    await interaction.response.send_message(embed=embed)
+    await responder(interaction, embed=embed)
 
 
 async def multar_flow(interaction: discord.Interaction, rg_game: str, tipo_infracao: str, placa_veiculo: str = None):
     if not verificar_permissao(interaction, "multar"):
         embed = criar_embed("erro", "Sem Permissão", "Você não tem permissão para executar este comando.")
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await responder(interaction, embed=embed, ephemeral=True)
         return
-    player = db.get_player(rg_game)
+    player = await db.get_player(rg_game)
     if not player:
         embed = criar_embed("erro", "Jogador Não Encontrado", f"Não foi encontrado jogador com RG {rg_game}.")
-        await interaction.response.send_message(embed=embed)
+        await responder(interaction, embed=embed)
         return
     if placa_veiculo:
-        veiculo = db.get_veiculo(placa_veiculo.upper())
+        veiculo = await db.get_veiculo(placa_veiculo.upper())
         if not veiculo:
             embed = criar_embed("erro", "Veículo Não Encontrado", f"Não foi encontrado veículo com placa {placa_veiculo.upper()}.")
-            await interaction.response.send_message(embed=embed)
+            await responder(interaction, embed=embed)
             return
         placa_veiculo = placa_veiculo.upper()
     infracao = TABELA_INFRACOES.get(tipo_infracao)
     if not infracao:
         embed = criar_embed("erro", "Infração Inválida", "O código de infração informado não existe.")
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await responder(interaction, embed=embed, ephemeral=True)
         return
-    multa_id = db.aplicar_multa(
+    resultado = await db.aplicar_multa(
         rg_game,
         infracao['descricao'],
         infracao['valor'],
@@ -136,18 +202,13 @@ async def multar_flow(interaction: discord.Interaction, rg_game: str, tipo_infra
         str(interaction.user.id),
         placa_veiculo
     )
-    player_atualizado = db.get_player(rg_game)
-    with sqlite3.connect(db.db_path) as conn:
-        cursor = conn.cursor()
-        cursor.execute('SELECT valor FROM multas WHERE id = ?', (multa_id,))
-        valor_aplicado = cursor.fetchone()[0]
-        reincidencia = valor_aplicado > infracao['valor']
+    valor_aplicado = resultado.valor
     valor_desconto = valor_aplicado * 0.85
     embed = discord.Embed(
         title="🚨 Multa Aplicada",
         color=CORES["aviso"]
     )
-    embed.add_field(name="Jogador", value=f"{player['nome_rp']} ({rg_game})", inline=True)
+    embed.add_field(name="Jogador", value=f"{player.nome_rp} ({rg_game})", inline=True)
     embed.add_field(name="Infração", value=infracao['descricao'], inline=False)
     embed.add_field(name="Valor", value=f"R$ {valor_aplicado:.2f}", inline=True)
     embed.add_field(name="Valor com desconto", value=f"R$ {valor_desconto:.2f}", inline=True)
@@ -156,22 +217,123 @@ async def multar_flow(interaction: discord.Interaction, rg_game: str, tipo_infra
     embed.add_field(name="Agente", value=interaction.user.mention, inline=True)
     if placa_veiculo:
         embed.add_field(name="Veículo", value=placa_veiculo, inline=True)
-    if reincidencia:
+    if resultado.reincidencia:
         embed.add_field(name="⚠️ Reincidência", value="Multa aplicada em dobro", inline=False)
-    embed.add_field(name="Pontos Atuais", value=f"{player_atualizado['pontos_cnh']}/30", inline=True)
-    embed.add_field(name="Status CNH", value=player_atualizado['cnh_status'].title(), inline=True)
-    embed.add_field(name="ID da Multa", value=multa_id, inline=True)
-    if player_atualizado['cnh_status'] == 'suspensa':
+    embed.add_field(name="Pontos Atuais", value=f"{resultado.pontos_cnh}/30", inline=True)
+    embed.add_field(name="Status CNH", value=resultado.cnh_status.title(), inline=True)
+    embed.add_field(name="ID da Multa", value=resultado.multa_id, inline=True)
+    if resultado.cnh_status == 'suspensa':
         embed.add_field(name="🚫 CNH Suspensa", value="CNH suspensa automaticamente por excesso de pontos", inline=False)
-    elif player_atualizado['cnh_status'] == 'revogada':
+    elif resultado.cnh_status == 'revogada':
         embed.add_field(name="❌ CNH Revogada", value="CNH revogada automaticamente por excesso de pontos", inline=False)
-    await interaction.response.send_message(embed=embed)
+    await responder(interaction, embed=embed)
 
 
 async def ticket_criar_flow(interaction: discord.Interaction, descricao: str):
-    ticket_id = db.criar_ticket(str(interaction.user.id), descricao)
+    ticket_id = await db.criar_ticket(str(interaction.user.id), descricao)
     embed = criar_embed("sucesso", "Ticket Criado", f"Ticket #{ticket_id} registrado com sucesso.")
-    await interaction.response.send_message(embed=embed, ephemeral=True)
+    await responder(interaction, embed=embed, ephemeral=True)
+
+
+# Listagens paginadas: cada função recebe o filtro e o cursor codificados no
+# custom_id dos botões e devolve o embed da página e a view de navegação.
+def filtro_multas(rg_game: str, status: str = None) -> str:
+    """Filtro da listagem de multas para o custom_id, com o RG percent-encoded."""
+    return f"{quote(rg_game, safe='')}|{status or ''}"
+
+
+async def pagina_multas(filtro: str, cursor: str = "", voltando: bool = False):
+    # filtro: "RG|status", com o RG codificado por filtro_multas (pode conter ":" e "|")
+    rg_game, status, *_ = filtro.split("|")
+    rg_game = unquote(rg_game)
+    status = status or None
+    player = await db.get_player(rg_game)
+    if not player:
+        return criar_embed("erro", "Jogador Não Encontrado", f"Não foi encontrado jogador com RG {rg_game}."), None
+
+    pagina = await db.listar_multas_jogador_pagina(
+        rg_game,
+        status,
+        apos_id=int(cursor) if cursor and not voltando else None,
+        antes_id=int(cursor) if cursor and voltando else None,
+    )
+    if not pagina.itens:
+        status_texto = f" ({status})" if status else ""
+        return criar_embed("info", "Consulta de Multas", f"Nenhuma multa encontrada para {player.nome_rp}{status_texto}."), None
+
+    totais = await db.get_totais_multas_jogador(rg_game, status)
+    embed = discord.Embed(
+        title=f"📋 Multas - {player.nome_rp}",
+        color=CORES["info"]
+    )
+    embed.add_field(name="RG", value=rg_game, inline=True)
+    embed.add_field(name="Total de Multas", value=totais['total'], inline=True)
+    embed.add_field(name="Total Pendente", value=f"R$ {totais['total_pendente']:.2f}", inline=True)
+
+    status_emoji = {"pendente": "🔴", "paga": "🟢", "recorrida": "🟡"}
+    for multa in pagina.itens:
+        data = formatar_data(multa.data_ocorrencia)
+        embed.add_field(
+            name=f"{status_emoji.get(multa.status, '⚪')} Multa #{multa.id}",
+            value=f"**Infração:** {multa.tipo_infracao}\n**Valor:** R$ {multa.valor:.2f}\n**Data:** {data}",
+            inline=True
+        )
+    return embed, criar_view_paginacao("multas", filtro, pagina, pagina.itens[0].id, pagina.itens[-1].id)
+
+
+async def pagina_cnhs_restritas(filtro: str, cursor: str = "", voltando: bool = False):
+    chave = None
+    if cursor:
+        pontos, _, rg_game = cursor.partition("|")
+        chave = (int(pontos), rg_game)
+    pagina = await db.listar_cnhs_restritas_pagina(
+        apos=chave if not voltando else None,
+        antes=chave if voltando else None,
+    )
+    if not pagina.itens:
+        return criar_embed("info", "CNHs Suspensas", "Nenhuma CNH suspensa, revogada ou cassada encontrada."), None
+
+    embed = discord.Embed(
+        title="🚫 Relatório de CNHs com Restrições",
+        color=CORES["aviso"]
+    )
+    status_emoji = {"suspensa": "🟡", "revogada": "🔴", "cassada": "❌"}
+    for cnh in pagina.itens:
+        embed.add_field(
+            name=f"{status_emoji.get(cnh.cnh_status, '⚪')} {cnh.nome_rp}",
+            value=f"**RG:** {cnh.rg_game}\n**Status:** {cnh.cnh_status.title()}\n**Pontos:** {cnh.pontos_cnh}",
+            inline=True
+        )
+    embed.set_footer(text=f"Relatório gerado em {datetime.now().strftime('%d/%m/%Y %H:%M')}")
+    primeiro, ultimo = pagina.itens[0], pagina.itens[-1]
+    return embed, criar_view_paginacao(
+        "cnhs", filtro, pagina,
+        f"{primeiro.pontos_cnh}|{primeiro.rg_game}", f"{ultimo.pontos_cnh}|{ultimo.rg_game}"
+    )
+
+
+async def pagina_tickets(filtro: str, cursor: str = "", voltando: bool = False):
+    pagina = await db.listar_tickets_pagina(
+        filtro or None,
+        apos_id=int(cursor) if cursor and not voltando else None,
+        antes_id=int(cursor) if cursor and voltando else None,
+    )
+    if not pagina.itens:
+        return criar_embed("info", "Tickets", "Nenhum ticket encontrado."), None
+
+    descricao = "\n".join([
+        f"ID {t.id}: {t.descricao[:200]} (Autor: <@{t.autor_id}>)" for t in pagina.itens
+    ])
+    embed = criar_embed("info", "Tickets", descricao)
+    return embed, criar_view_paginacao("tickets", filtro, pagina, pagina.itens[0].id, pagina.itens[-1].id)
+
+
+# Listagem -> (permissão exigida, função que monta a página)
+LISTAGENS_PAGINADAS = {
+    "multas": (None, pagina_multas),
+    "cnhs": ("relatorios", pagina_cnhs_restritas),
+    "tickets": ("ticket_listar", pagina_tickets),
+}
 
 
 class RegistrarJogadorModal(discord.ui.Modal, title="Registrar Jogador"):
@@ -179,6 +341,7 @@ class RegistrarJogadorModal(discord.ui.Modal, title="Registrar Jogador"):
     nome_rp = discord.ui.TextInput(label="Nome RP")
     telefone = discord.ui.TextInput(label="Telefone", required=False)
 
+    @com_prazo()
     async def on_submit(self, interaction: discord.Interaction):
         await registrar_jogador_flow(interaction, self.rg_game.value, self.nome_rp.value, self.telefone.value or None)
 
@@ -188,6 +351,7 @@ class EmitirCNHModal(discord.ui.Modal, title="Emitir CNH"):
     categoria = discord.ui.TextInput(label="Categoria (A, B, C, D, E, Náutica, Aérea)")
     nome_rp = discord.ui.TextInput(label="Nome RP (se não registrado)", required=False)
 
+    @com_prazo()
     async def on_submit(self, interaction: discord.Interaction):
         await cnh_emitir_flow(interaction, self.rg_game.value, self.categoria.value, self.nome_rp.value or None)
 
@@ -195,6 +359,7 @@ class EmitirCNHModal(discord.ui.Modal, title="Emitir CNH"):
 class ConsultarCNHModal(discord.ui.Modal, title="Consultar CNH"):
     rg_game = discord.ui.TextInput(label="RG do jogador")
 
+    @com_prazo()
     async def on_submit(self, interaction: discord.Interaction):
         await cnh_consultar_flow(interaction, self.rg_game.value)
 
@@ -207,12 +372,13 @@ class RegistrarVeiculoModal(discord.ui.Modal, title="Registrar Veículo"):
     ano = discord.ui.TextInput(label="Ano")
     chassi = discord.ui.TextInput(label="Chassi")
 
+    @com_prazo()
     async def on_submit(self, interaction: discord.Interaction):
         try:
             ano_int = int(self.ano.value)
         except ValueError:
             embed = criar_embed("erro", "Ano inválido", "O ano deve ser um número.")
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await responder(interaction, embed=embed, ephemeral=True)
             return
         await veiculo_registrar_flow(
             interaction,
@@ -230,6 +396,7 @@ class AplicarMultaModal(discord.ui.Modal, title="Aplicar Multa"):
     tipo_infracao = discord.ui.TextInput(label="Código da infração")
     placa_veiculo = discord.ui.TextInput(label="Placa do veículo", required=False)
 
+    @com_prazo()
     async def on_submit(self, interaction: discord.Interaction):
         await multar_flow(
             interaction,
@@ -242,6 +409,7 @@ class AplicarMultaModal(discord.ui.Modal, title="Aplicar Multa"):
 class AbrirTicketModal(discord.ui.Modal, title="Abrir Ticket"):
     descricao = discord.ui.TextInput(label="Descreva seu problema", style=discord.TextStyle.long)
 
+    @com_prazo(efemero=True)
     async def on_submit(self, interaction: discord.Interaction):
         await ticket_criar_flow(interaction, self.descricao.value)
 
@@ -256,6 +424,7 @@ class PainelFuncionarios(discord.ui.View):
         style=discord.ButtonStyle.primary,
         custom_id="painel_registrar_jogador"
     )
+    @medido
     async def registrar_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.send_modal(RegistrarJogadorModal())
 
@@ -264,6 +433,7 @@ class PainelFuncionarios(discord.ui.View):
         style=discord.ButtonStyle.secondary,
         custom_id="painel_emitir_cnh"
     )
+    @medido
     async def cnh_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.send_modal(EmitirCNHModal())
 
@@ -272,6 +442,7 @@ class PainelFuncionarios(discord.ui.View):
         style=discord.ButtonStyle.secondary,
         custom_id="painel_consultar_cnh"
     )
+    @medido
     async def cnh_consultar_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.send_modal(ConsultarCNHModal())
 
@@ -280,6 +451,7 @@ class PainelFuncionarios(discord.ui.View):
         style=discord.ButtonStyle.success,
         custom_id="painel_registrar_veiculo"
     )
+    @medido
     async def veiculo_registrar_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.send_modal(RegistrarVeiculoModal())
 
@@ -288,6 +460,7 @@ class PainelFuncionarios(discord.ui.View):
         style=discord.ButtonStyle.danger,
         custom_id="painel_aplicar_multa"
     )
+    @medido
     async def multar_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.send_modal(AplicarMultaModal())
 
@@ -297,6 +470,7 @@ class PainelFuncionarios(discord.ui.View):
         custom_id="painel_ticket",
         row=1
     )
+    @medido
     async def ticket_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.send_modal(AbrirTicketModal())
 
@@ -305,20 +479,9 @@ class RegistroModal(discord.ui.Modal, title="Registro"):
     nome = discord.ui.TextInput(label="Nome no jogo")
     rg = discord.ui.TextInput(label="RG no jogo")
 
+    @com_prazo(efemero=True)
     async def on_submit(self, interaction: discord.Interaction):
-        guild = interaction.guild
-        role_registrado = guild.get_role(ROLE_REGISTRADO)
-        role_inicial = guild.get_role(ROLE_INICIAL)
-        try:
-            await interaction.user.edit(nick=f"{self.nome.value} | {self.rg.value}")
-        except discord.Forbidden:
-            pass
-        if role_registrado:
-            await interaction.user.add_roles(role_registrado)
-        if role_inicial:
-            await interaction.user.remove_roles(role_inicial)
-        embed = criar_embed("sucesso", "Registro concluído", f"Bem-vindo, {self.nome.value}!")
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await registrar_membro_flow(interaction, self.nome.value, self.rg.value)
 
 
 class PainelRegistro(discord.ui.View):
@@ -326,22 +489,40 @@ class PainelRegistro(discord.ui.View):
         super().__init__(timeout=None)
 
     @discord.ui.button(label="Registrar-se", style=discord.ButtonStyle.primary, custom_id="painel_registro")
+    @medido
     async def registrar(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.send_modal(RegistroModal())
 
 
-class TicketView(discord.ui.View):
+class BotaoFecharTicket(discord.ui.DynamicItem[discord.ui.Button], template=r"ticket(?::fechar:(?P<id>\d+)|_fechar_view)"):
+    """Botão Fechar Ticket sem estado: o ID do ticket fica no custom_id."""
     def __init__(self, ticket_id: int):
-        super().__init__(timeout=None)
+        super().__init__(
+            discord.ui.Button(
+                label="Fechar Ticket",
+                style=discord.ButtonStyle.danger,
+                custom_id=f"ticket:fechar:{ticket_id}"
+            )
+        )
         self.ticket_id = ticket_id
 
-    @discord.ui.button(label="Fechar Ticket", style=discord.ButtonStyle.danger, custom_id="ticket_fechar_view")
-    async def fechar(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if db.fechar_ticket(self.ticket_id):
-            await interaction.response.send_message("Ticket fechado.", ephemeral=True)
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        if match["id"]:
+            return cls(int(match["id"]))
+        # Botões antigos (custom_id fixo "ticket_fechar_view"): o ID vem do nome do canal "ticket-<id>"
+        nome = re.fullmatch(r"ticket-(\d+)", getattr(interaction.channel, "name", "") or "")
+        if nome is None:
+            raise ValueError("Ticket não identificado pelo nome do canal")
+        return cls(int(nome[1]))
+
+    @com_prazo(efemero=True)
+    async def callback(self, interaction: discord.Interaction):
+        if await db.fechar_ticket(self.ticket_id):
+            await responder(interaction, "Ticket fechado.", ephemeral=True)
             await interaction.channel.delete()
         else:
-            await interaction.response.send_message("Não foi possível fechar o ticket.", ephemeral=True)
+            await responder(interaction, "Não foi possível fechar o ticket.", ephemeral=True)
 
 
 class PainelTickets(discord.ui.View):
@@ -349,29 +530,21 @@ class PainelTickets(discord.ui.View):
         super().__init__(timeout=None)
 
     @discord.ui.button(label="Abrir Ticket", style=discord.ButtonStyle.primary, custom_id="painel_ticket_abrir")
+    @com_prazo(efemero=True)
     async def abrir_ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
-        ticket_id = db.criar_ticket(str(interaction.user.id), "Ticket aberto via painel")
+        ticket_id = await db.criar_ticket(str(interaction.user.id), "Ticket aberto via painel")
         guild = interaction.guild
-        categoria = guild.get_channel(CATEGORIA_TICKETS)
-        overwrites = {
-            guild.default_role: discord.PermissionOverwrite(view_channel=False),
-            interaction.user: discord.PermissionOverwrite(view_channel=True, send_messages=True)
-        }
-        func = guild.get_role(ROLE_FUNCIONARIOS)
-        ger = guild.get_role(ROLE_GERENCIA)
-        if func:
-            overwrites[func] = discord.PermissionOverwrite(view_channel=True, send_messages=True)
-        if ger:
-            overwrites[ger] = discord.PermissionOverwrite(view_channel=True, send_messages=True)
-        canal = await guild.create_text_channel(f"ticket-{ticket_id}", category=categoria, overwrites=overwrites)
+        canal = await pool_tickets.abrir(guild, interaction.user, ticket_id, guild.get_channel(CATEGORIA_TICKETS))
+        embed = criar_embed("sucesso", "Ticket Criado", f"Seu ticket foi aberto: {canal.mention}")
+        await responder(interaction, embed=embed, ephemeral=True)
         embed_ticket = discord.Embed(
             title=f"Ticket #{ticket_id}",
             description=f"{interaction.user.mention}, descreva seu problema.",
             color=CORES["info"]
         )
-        await canal.send(embed=embed_ticket, view=TicketView(ticket_id))
-        embed = criar_embed("sucesso", "Ticket Criado", f"Seu ticket foi aberto: {canal.mention}")
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        view = discord.ui.View(timeout=None)
+        view.add_item(BotaoFecharTicket(ticket_id))
+        await canal.send(embed=embed_ticket, view=view)
 
 
 
@@ -379,8 +552,9 @@ class PainelTickets(discord.ui.View):
 class SugestaoModal(discord.ui.Modal, title="Enviar Sugestão"):
     sugestao = discord.ui.TextInput(label="Sua sugestão", style=discord.TextStyle.long)
 
+    @com_prazo(efemero=True)
     async def on_submit(self, interaction: discord.Interaction):
-        sugestao_id = db.criar_sugestao(str(interaction.user.id), self.sugestao.value)
+        sugestao_id = await db.criar_sugestao(str(interaction.user.id), self.sugestao.value)
         canal = bot.get_channel(CANAL_SUGESTOES)
         embed = discord.Embed(
             title=f"Sugestão #{sugestao_id}",
@@ -392,7 +566,7 @@ class SugestaoModal(discord.ui.Modal, title="Enviar Sugestão"):
             mensagem = await canal.send(embed=embed)
             await mensagem.add_reaction("✅")
             await mensagem.add_reaction("❌")
-        await interaction.response.send_message(
+        await responder(interaction, 
             embed=criar_embed("sucesso", "Sugestão enviada", f"Sugestão #{sugestao_id} registrada."),
             ephemeral=True
         )
@@ -403,63 +577,189 @@ class PainelSugestao(discord.ui.View):
         super().__init__(timeout=None)
 
     @discord.ui.button(label="Enviar Sugestão", style=discord.ButtonStyle.primary, custom_id="painel_sugestao_enviar")
+    @medido
     async def enviar(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.send_modal(SugestaoModal())
 
+class BotaoPagina(discord.ui.DynamicItem[discord.ui.Button], template=r"pag:(?P<lista>[a-z]+):(?P<direcao>[<>]):(?P<filtro>[^:]*):(?P<cursor>.*)"):
+    """Botão Anterior/Próxima sem estado: a listagem, o filtro e o cursor ficam no custom_id."""
+    def __init__(self, lista: str, direcao: str, filtro: str, cursor: str, desabilitado: bool = False):
+        super().__init__(
+            discord.ui.Button(
+                label="◀ Anterior" if direcao == "<" else "Próxima ▶",
+                style=discord.ButtonStyle.secondary,
+                custom_id=f"pag:{lista}:{direcao}:{filtro}:{cursor}",
+                disabled=desabilitado
+            )
+        )
+        self.lista = lista
+        self.direcao = direcao
+        self.filtro = filtro
+        self.cursor = cursor
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match["lista"], match["direcao"], match["filtro"], match["cursor"])
+
+    @com_prazo(atualizar=True)
+    async def callback(self, interaction: discord.Interaction):
+        permissao, montar_pagina = LISTAGENS_PAGINADAS[self.lista]
+        if permissao and not verificar_permissao(interaction, permissao):
+            embed = criar_embed("erro", "Sem Permissão", "Você não tem permissão para executar este comando.")
+            await responder(interaction, embed=embed, ephemeral=True)
+            return
+        embed, view = await montar_pagina(self.filtro, self.cursor, self.direcao == "<")
+        await editar(interaction, embed=embed, view=view)
+
+
+def criar_view_paginacao(lista: str, filtro: str, pagina, primeiro, ultimo) -> discord.ui.View:
+    """Cria os botões de navegação de uma página, ou None se houver uma única página."""
+    if not (pagina.tem_anterior or pagina.tem_proxima):
+        return None
+    if len(f"pag:{lista}:>:{filtro}:{ultimo}") > 100:  # Limite do custom_id no Discord
+        return None
+    view = discord.ui.View(timeout=None)
+    view.add_item(BotaoPagina(lista, "<", filtro, str(primeiro), desabilitado=not pagina.tem_anterior))
+    view.add_item(BotaoPagina(lista, ">", filtro, str(ultimo), desabilitado=not pagina.tem_proxima))
+    return view
+
+
 @bot.event
 async def on_ready():
     print(f'{bot.user} está online!')
+    # Atualizações de cargos podem ter sido perdidas enquanto o bot estava desconectado
+    limpar_cache_permissoes()
     try:
-        synced = await bot.tree.sync()
-        print(f'Sincronizados {len(synced)} comandos slash')
+        await sincronizar_comandos()
     except Exception as e:
         print(f'Erro ao sincronizar comandos: {e}')
 
+    if METRICAS_PORTA:
+        try:
+            await iniciar_servidor_metricas(METRICAS_HOST, METRICAS_PORTA)
+        except OSError as e:
+            print(f'Erro ao iniciar o endpoint de métricas: {e}')
+
     await enviar_log(bot, "Bot iniciado e online.")
 
     bot.add_view(PainelFuncionarios())
     bot.add_view(PainelRegistro())
     bot.add_view(PainelTickets())
     bot.add_view(PainelSugestao())
+    bot.add_dynamic_items(BotaoPagina, BotaoFecharTicket)
 
-    canal = bot.get_channel(CANAL_PAINEL_FUNCIONARIOS)
-    if canal:
-        embed = discord.Embed(
-            title="Painel de Controle",
-            description="Utilize os botões abaixo para acessar funções rápidas.",
-            color=CORES["info"]
-        )
-        embed.set_footer(text="Detran-SP Bot")
-        embed.set_thumbnail(url=bot.user.display_avatar.url)
-        await canal.send(embed=embed, view=PainelFuncionarios())
+    categoria_tickets = bot.get_channel(CATEGORIA_TICKETS)
+    if isinstance(categoria_tickets, discord.CategoryChannel):
+        pool_tickets.iniciar(categoria_tickets)
 
-    canal_registro = bot.get_channel(CANAL_REGISTRO)
-    if canal_registro:
-        embed = discord.Embed(
-            title="Registro",
-            description="Clique no botão para se registrar.",
-            color=CORES["info"]
-        )
-        await canal_registro.send(embed=embed, view=PainelRegistro())
+    resultados = await asyncio.gather(
+        *(publicar_painel(nome, canal_id, embed, view) for nome, canal_id, embed, view in montar_paineis()),
+        return_exceptions=True
+    )
+    for resultado in resultados:
+        if isinstance(resultado, Exception):
+            print(f'Erro ao publicar painel: {resultado}')
 
-    canal_ticket = bot.get_channel(CANAL_TICKETS)
-    if canal_ticket:
-        embed = discord.Embed(
-            title="Suporte",
-            description="Clique no botão para abrir um ticket.",
-            color=CORES["info"]
-        )
-        await canal_ticket.send(embed=embed, view=PainelTickets())
+    # Em segundo plano: o on_ready pode se repetir após reconexões, mas só uma reconciliação roda por vez
+    global _reconciliacao
+    if _reconciliacao is None or _reconciliacao.done():
+        _reconciliacao = asyncio.create_task(reconciliar_cargos_guilds())
 
 
-    canal_sugestoes = bot.get_channel(CANAL_SUGESTOES)
-    if canal_sugestoes:
-        embed = discord.Embed(
-            title="Sugestões",
-            description="Envie suas sugestões pelo botão abaixo.",
-            color=CORES["info"]
-        )
-        await canal_sugestoes.send(embed=embed, view=PainelSugestao())
+_reconciliacao = None
+
+
+async def reconciliar_cargos_guilds():
+    """Corrige os cargos de entrada/registro perdidos enquanto o bot estava desconectado."""
+    for guild in bot.guilds:
+        if guild.get_role(ROLE_INICIAL) is None:
+            continue
+        try:
+            agendados = await reconciliar_cargos(guild)
+        except (discord.HTTPException, asyncio.TimeoutError) as e:
+            print(f'Erro ao reconciliar cargos em {guild.name}: {e}')
+            continue
+        if agendados:
+            await enviar_log(bot, f"Reconciliação de cargos: {agendados} membros corrigidos em {guild.name}")
+
+
+async def sincronizar_comandos(forcar: bool = False) -> bool:
+    """Sincroniza a árvore de comandos apenas se as definições mudaram desde a última sincronização."""
+    inicio = time.perf_counter()
+    definicoes = [comando.to_dict(bot.tree) for comando in bot.tree.get_commands()]
+    hash_comandos = hashlib.sha256(json.dumps(definicoes, sort_keys=True).encode()).hexdigest()
+
+    if not forcar and await db.get_configuracao("hash_comandos") == hash_comandos:
+        mensagem = f"Comandos slash inalterados ({hash_comandos[:12]}), sincronização ignorada"
+        sincronizou = False
+    else:
+        synced = await bot.tree.sync()
+        await db.salvar_configuracao("hash_comandos", hash_comandos)
+        motivo = "forçada" if forcar else "definições alteradas"
+        mensagem = f"Sincronizados {len(synced)} comandos slash ({motivo}, {hash_comandos[:12]})"
+        sincronizou = True
+
+    mensagem += f" em {(time.perf_counter() - inicio) * 1000:.0f} ms"
+    print(mensagem)
+    await enviar_log(bot, mensagem)
+    return sincronizou
+
+
+def montar_paineis():
+    """Retorna (nome, canal, embed, view) de cada painel publicado pelo bot."""
+    embed_funcionarios = discord.Embed(
+        title="Painel de Controle",
+        description="Utilize os botões abaixo para acessar funções rápidas.",
+        color=CORES["info"]
+    )
+    embed_funcionarios.set_footer(text="Detran-SP Bot")
+    embed_funcionarios.set_thumbnail(url=bot.user.display_avatar.url)
+    embed_registro = discord.Embed(
+        title="Registro",
+        description="Clique no botão para se registrar.",
+        color=CORES["info"]
+    )
+    embed_tickets = discord.Embed(
+        title="Suporte",
+        description="Clique no botão para abrir um ticket.",
+        color=CORES["info"]
+    )
+    embed_sugestoes = discord.Embed(
+        title="Sugestões",
+        description="Envie suas sugestões pelo botão abaixo.",
+        color=CORES["info"]
+    )
+    return [
+        ("funcionarios", CANAL_PAINEL_FUNCIONARIOS, embed_funcionarios, PainelFuncionarios()),
+        ("registro", CANAL_REGISTRO, embed_registro, PainelRegistro()),
+        ("tickets", CANAL_TICKETS, embed_tickets, PainelTickets()),
+        ("sugestoes", CANAL_SUGESTOES, embed_sugestoes, PainelSugestao()),
+    ]
+
+
+async def publicar_painel(nome: str, canal_id: int, embed: discord.Embed, view: discord.ui.View):
+    """Publica o painel apenas se ele não existe; edita a mensagem só se o conteúdo mudou."""
+    canal = bot.get_channel(canal_id)
+    if not canal:
+        return
+    conteudo = json.dumps({"embed": embed.to_dict(), "componentes": view.to_components()}, sort_keys=True)
+    hash_conteudo = hashlib.sha256(conteudo.encode()).hexdigest()
+
+    painel = await db.get_painel(nome)
+    if painel and painel.canal_id == canal_id:
+        try:
+            if painel.hash == hash_conteudo:
+                # Conteúdo igual: só confirma que a mensagem ainda existe
+                await canal.fetch_message(painel.mensagem_id)
+                return
+            await canal.get_partial_message(painel.mensagem_id).edit(embed=embed, view=view)
+            await db.salvar_painel(nome, canal_id, painel.mensagem_id, hash_conteudo)
+            return
+        except discord.NotFound:
+            pass  # Mensagem apagada: publicar novamente
+
+    mensagem = await canal.send(embed=embed, view=view)
+    await db.salvar_painel(nome, canal_id, mensagem.id, hash_conteudo)
 
 
 @bot.event
@@ -474,24 +774,35 @@ async def on_app_command_error(interaction: discord.Interaction, error: app_comm
     ))
     embed = criar_embed("erro", "Erro", "Ocorreu um erro ao executar o comando.")
     try:
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await responder(interaction, embed=embed, ephemeral=True)
     except Exception:
         pass
 
 
 @bot.event
 async def on_member_join(member: discord.Member):
-    """Atribui cargo inicial aos novos membros."""
-    role = member.guild.get_role(ROLE_INICIAL)
-    if role:
-        await member.add_roles(role)
+    """Agenda o cargo inicial dos novos membros na fila de cargos."""
+    fila_cargos.agendar(member, adicionar=(ROLE_INICIAL,), motivo="Cargo inicial de novo membro")
+
+
+@bot.event
+async def on_member_update(before: discord.Member, after: discord.Member):
+    """Descarta as permissões em cache quando os cargos do membro mudam."""
+    if before.roles != after.roles:
+        invalidar_membro(after.id)
+
+
+@bot.event
+async def on_member_remove(member: discord.Member):
+    invalidar_membro(member.id)
 
 # Comando para exibir o painel de controle
 @bot.tree.command(name="painel", description="Exibe o painel de controle do Detran")
+@com_prazo(efemero=True)
 async def painel(interaction: discord.Interaction):
     if not verificar_permissao(interaction, "painel"):
         embed = criar_embed("erro", "Sem Permissão", "Você não tem permissão para executar este comando.")
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await responder(interaction, embed=embed, ephemeral=True)
         return
 
     embed = discord.Embed(
@@ -501,7 +812,7 @@ async def painel(interaction: discord.Interaction):
     )
     embed.set_footer(text="Detran-SP Bot")
     embed.set_thumbnail(url=bot.user.display_avatar.url)
-    await interaction.response.send_message(embed=embed, view=PainelFuncionarios(), ephemeral=True)
+    await responder(interaction, embed=embed, view=PainelFuncionarios(), ephemeral=True)
 
 # Comandos de Registro e CNH
 @bot.tree.command(name="registrar_jogador", description="Registra um novo jogador no sistema do Detran")
@@ -510,34 +821,67 @@ async def painel(interaction: discord.Interaction):
     nome_rp="Nome do jogador no roleplay",
     telefone="Telefone do jogador (opcional)"
 )
+@com_prazo()
 async def registrar_jogador(interaction: discord.Interaction, rg_game: str, nome_rp: str, telefone: str = None):
     await registrar_jogador_flow(interaction, rg_game, nome_rp, telefone)
 
 
+@bot.tree.command(name="importar", description="Importa jogadores ou veículos de um arquivo CSV ou JSON")
+@app_commands.describe(
+    tipo="Tipo de registro contido no arquivo",
+    arquivo="Arquivo CSV ou JSON (jogadores: rg_game, nome_rp, telefone; veículos: rg_game, placa, modelo, cor, ano, chassi)"
+)
+@app_commands.choices(tipo=[
+    app_commands.Choice(name="Jogadores", value="jogadores"),
+    app_commands.Choice(name="Veículos", value="veiculos")
+])
+@com_prazo(efemero=True)
+async def importar(interaction: discord.Interaction, tipo: str, arquivo: discord.Attachment):
+    if not verificar_permissao(interaction, "importar"):
+        embed = criar_embed("erro", "Sem Permissão", "Você não tem permissão para executar este comando.")
+        await responder(interaction, embed=embed, ephemeral=True)
+        return
+
+    await adiar(interaction, ephemeral=True)
+    registros = ler_registros(await arquivo.read(), arquivo.filename)
+    if tipo == "jogadores":
+        resultado = await db.importar_players(registros)
+    else:
+        resultado = await db.importar_veiculos(registros)
+
+    descricao = f"**Arquivo:** {arquivo.filename}\n**Inseridos:** {resultado.inseridos}\n**Conflitos:** {len(resultado.conflitos)}"
+    if resultado.erro_leitura:
+        numero, motivo = resultado.erro_leitura
+        embed = criar_embed(
+            "erro", "Importação Interrompida",
+            f"{descricao}\n\nNão foi possível ler o registro {numero}: {motivo}\n"
+            f"Os registros anteriores foram processados; o registro {numero} e os seguintes não foram importados."
+        )
+    else:
+        embed = criar_embed("sucesso" if not resultado.conflitos else "aviso", "Importação Concluída", descricao)
+    arquivos = []
+    if resultado.conflitos:
+        amostra = "\n".join(f"• Registro {numero}: {motivo}" for numero, motivo in resultado.conflitos[:15])
+        embed.add_field(name="Conflitos", value=amostra[:1024], inline=False)
+        if len(resultado.conflitos) > 15:
+            relatorio = io.StringIO()
+            escritor = csv.writer(relatorio)
+            escritor.writerow(["registro", "motivo"])
+            escritor.writerows(resultado.conflitos)
+            arquivos.append(discord.File(io.BytesIO(relatorio.getvalue().encode("utf-8")), filename="conflitos.csv"))
+    await interaction.followup.send(embed=embed, files=arquivos, ephemeral=True)
+
+
 @bot.tree.command(name="registrar", description="Registre-se no servidor do Detran")
 @app_commands.describe(nome="Seu nome no jogo", rg="Seu RG no jogo")
+@com_prazo(efemero=True)
 async def registrar(interaction: discord.Interaction, nome: str, rg: str):
     if interaction.channel_id != CANAL_REGISTRO:
         embed = criar_embed("erro", "Canal incorreto", "Use este comando no canal de registro.")
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await responder(interaction, embed=embed, ephemeral=True)
         return
 
-    guild = interaction.guild
-    role_registrado = guild.get_role(ROLE_REGISTRADO)
-    role_inicial = guild.get_role(ROLE_INICIAL)
-
-    try:
-        await interaction.user.edit(nick=f"{nome} | {rg}")
-    except discord.Forbidden:
-        pass
-
-    if role_registrado:
-        await interaction.user.add_roles(role_registrado)
-    if role_inicial:
-        await interaction.user.remove_roles(role_inicial)
-
-    embed = criar_embed("sucesso", "Registro concluído", f"Bem-vindo, {nome}!")
-    await interaction.response.send_message(embed=embed, ephemeral=True)
+    await registrar_membro_flow(interaction, nome, rg)
 
 @bot.tree.command(name="cnh_emitir", description="Emite uma nova CNH para um jogador")
 @app_commands.describe(
@@ -554,11 +898,13 @@ async def registrar(interaction: discord.Interaction, nome: str, rg: str):
     app_commands.Choice(name="Náutica", value="Náutica"),
     app_commands.Choice(name="Aérea", value="Aérea")
 ])
+@com_prazo()
 async def cnh_emitir(interaction: discord.Interaction, rg_game: str, categoria: str, nome_rp: str = None):
     await cnh_emitir_flow(interaction, rg_game, categoria, nome_rp)
 
 @bot.tree.command(name="cnh_consultar", description="Consulta o status e detalhes da CNH de um jogador")
 @app_commands.describe(rg_game="RG do jogador no jogo")
+@com_prazo()
 async def cnh_consultar(interaction: discord.Interaction, rg_game: str):
     await cnh_consultar_flow(interaction, rg_game)
 
@@ -567,51 +913,53 @@ async def cnh_consultar(interaction: discord.Interaction, rg_game: str):
     rg_game="RG do jogador no jogo",
     dias="Número de dias de suspensão"
 )
+@com_prazo()
 async def cnh_suspender(interaction: discord.Interaction, rg_game: str, dias: int):
     if not verificar_permissao(interaction, "cnh_suspender"):
         embed = criar_embed("erro", "Sem Permissão", "Você não tem permissão para executar este comando.")
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await responder(interaction, embed=embed, ephemeral=True)
         return
     
-    player = db.get_player(rg_game)
+    player = await db.get_player(rg_game)
     if not player:
         embed = criar_embed("erro", "Jogador Não Encontrado", f"Não foi encontrado jogador com RG {rg_game}.")
-        await interaction.response.send_message(embed=embed)
+        await responder(interaction, embed=embed)
         return
     
-    if db.atualizar_status_cnh(rg_game, "suspensa"):
+    if await db.atualizar_status_cnh(rg_game, "suspensa"):
         embed = criar_embed("sucesso", 
             "CNH Suspensa",
-            f"**Jogador:** {player['nome_rp']}\n**RG:** {rg_game}\n**Período:** {dias} dias"
+            f"**Jogador:** {player.nome_rp}\n**RG:** {rg_game}\n**Período:** {dias} dias"
         )
     else:
         embed = criar_embed("erro", "Erro", "Não foi possível suspender a CNH.")
     
-    await interaction.response.send_message(embed=embed)
+    await responder(interaction, embed=embed)
 
 @bot.tree.command(name="cnh_cassar", description="Cassa a CNH de um jogador")
 @app_commands.describe(rg_game="RG do jogador no jogo")
+@com_prazo()
 async def cnh_cassar(interaction: discord.Interaction, rg_game: str):
     if not verificar_permissao(interaction, "cnh_cassar"):
         embed = criar_embed("erro", "Sem Permissão", "Você não tem permissão para executar este comando.")
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await responder(interaction, embed=embed, ephemeral=True)
         return
     
-    player = db.get_player(rg_game)
+    player = await db.get_player(rg_game)
     if not player:
         embed = criar_embed("erro", "Jogador Não Encontrado", f"Não foi encontrado jogador com RG {rg_game}.")
-        await interaction.response.send_message(embed=embed)
+        await responder(interaction, embed=embed)
         return
     
-    if db.atualizar_status_cnh(rg_game, "cassada"):
+    if await db.atualizar_status_cnh(rg_game, "cassada"):
         embed = criar_embed("sucesso", 
             "CNH Cassada",
-            f"**Jogador:** {player['nome_rp']}\n**RG:** {rg_game}\n**Status:** Cassada definitivamente"
+            f"**Jogador:** {player.nome_rp}\n**RG:** {rg_game}\n**Status:** Cassada definitivamente"
         )
     else:
         embed = criar_embed("erro", "Erro", "Não foi possível cassar a CNH.")
     
-    await interaction.response.send_message(embed=embed)
+    await responder(interaction, embed=embed)
 
 # Comandos de Membros do Detran
 # Comandos de Veículos
@@ -624,88 +972,92 @@ async def cnh_cassar(interaction: discord.Interaction, rg_game: str):
     ano="Ano do veículo",
     chassi="Chassi do veículo"
 )
+@com_prazo()
 async def veiculo_registrar(interaction: discord.Interaction, rg_game: str, placa: str, modelo: str, cor: str, ano: int, chassi: str):
     await veiculo_registrar_flow(interaction, rg_game, placa, modelo, cor, ano, chassi)
 
 @bot.tree.command(name="veiculo_consultar", description="Consulta os detalhes de um veículo")
 @app_commands.describe(placa="Placa do veículo")
+@com_prazo()
 async def veiculo_consultar(interaction: discord.Interaction, placa: str):
-    veiculo = db.get_veiculo(placa.upper())
+    veiculo = await db.get_veiculo(placa.upper())
     if not veiculo:
         embed = criar_embed("erro", "Veículo Não Encontrado", f"Não foi encontrado veículo com placa {placa.upper()}.")
-        await interaction.response.send_message(embed=embed)
+        await responder(interaction, embed=embed)
         return
     
-    proprietario = db.get_player(veiculo['proprietario_id'])
+    proprietario = await db.get_player(veiculo.proprietario_id)
     
     embed = discord.Embed(
         title=f"🚗 Consulta Veículo - {placa.upper()}",
         color=CORES["info"]
     )
-    embed.add_field(name="Placa", value=veiculo['placa'], inline=True)
-    embed.add_field(name="Modelo", value=veiculo['modelo'], inline=True)
-    embed.add_field(name="Cor", value=veiculo['cor'], inline=True)
-    embed.add_field(name="Ano", value=veiculo['ano'], inline=True)
-    embed.add_field(name="Status CRLV", value=veiculo['crlv_status'].title(), inline=True)
-    embed.add_field(name="Chassi", value=veiculo['chassi'], inline=True)
+    embed.add_field(name="Placa", value=veiculo.placa, inline=True)
+    embed.add_field(name="Modelo", value=veiculo.modelo, inline=True)
+    embed.add_field(name="Cor", value=veiculo.cor, inline=True)
+    embed.add_field(name="Ano", value=veiculo.ano, inline=True)
+    embed.add_field(name="Status CRLV", value=veiculo.crlv_status.title(), inline=True)
+    embed.add_field(name="Chassi", value=veiculo.chassi, inline=True)
     
     if proprietario:
         embed.add_field(
             name="Proprietário",
-            value=f"**Nome:** {proprietario['nome_rp']}\n**RG:** {proprietario['rg_game']}",
+            value=f"**Nome:** {proprietario.nome_rp}\n**RG:** {proprietario.rg_game}",
             inline=False
         )
     
-    await interaction.response.send_message(embed=embed)
+    await responder(interaction, embed=embed)
 
 @bot.tree.command(name="veiculo_transferir", description="Transfere a propriedade de um veículo")
 @app_commands.describe(
     placa="Placa do veículo",
     novo_rg="RG do novo proprietário"
 )
+@com_prazo()
 async def veiculo_transferir(interaction: discord.Interaction, placa: str, novo_rg: str):
     if not verificar_permissao(interaction, "veiculo_transferir"):
         embed = criar_embed("erro", "Sem Permissão", "Você não tem permissão para executar este comando.")
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await responder(interaction, embed=embed, ephemeral=True)
         return
     
-    veiculo = db.get_veiculo(placa.upper())
+    veiculo = await db.get_veiculo(placa.upper())
     if not veiculo:
         embed = criar_embed("erro", "Veículo Não Encontrado", f"Não foi encontrado veículo com placa {placa.upper()}.")
-        await interaction.response.send_message(embed=embed)
+        await responder(interaction, embed=embed)
         return
     
-    novo_proprietario = db.get_player(novo_rg)
+    novo_proprietario = await db.get_player(novo_rg)
     if not novo_proprietario:
         embed = criar_embed("erro", "Novo Proprietário Não Encontrado", f"Não foi encontrado jogador com RG {novo_rg}.")
-        await interaction.response.send_message(embed=embed)
+        await responder(interaction, embed=embed)
         return
     
-    if db.transferir_veiculo(placa.upper(), novo_rg):
+    if await db.transferir_veiculo(placa.upper(), novo_rg):
         embed = criar_embed("sucesso", 
             "Transferência Realizada",
-            f"**Veículo:** {placa.upper()}\n**Novo Proprietário:** {novo_proprietario['nome_rp']}\n**RG:** {novo_rg}"
+            f"**Veículo:** {placa.upper()}\n**Novo Proprietário:** {novo_proprietario.nome_rp}\n**RG:** {novo_rg}"
         )
     else:
         embed = criar_embed("erro", "Erro", "Não foi possível realizar a transferência.")
     
-    await interaction.response.send_message(embed=embed)
+    await responder(interaction, embed=embed)
 
 @bot.tree.command(name="veiculo_apreender", description="Marca um veículo como apreendido")
 @app_commands.describe(placa="Placa do veículo")
+@com_prazo()
 async def veiculo_apreender(interaction: discord.Interaction, placa: str):
     if not verificar_permissao(interaction, "veiculo_apreender"):
         embed = criar_embed("erro", "Sem Permissão", "Você não tem permissão para executar este comando.")
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await responder(interaction, embed=embed, ephemeral=True)
         return
     
-    veiculo = db.get_veiculo(placa.upper())
+    veiculo = await db.get_veiculo(placa.upper())
     if not veiculo:
         embed = criar_embed("erro", "Veículo Não Encontrado", f"Não foi encontrado veículo com placa {placa.upper()}.")
-        await interaction.response.send_message(embed=embed)
+        await responder(interaction, embed=embed)
         return
     
-    if db.atualizar_status_veiculo(placa.upper(), "apreendido"):
+    if await db.atualizar_status_veiculo(placa.upper(), "apreendido"):
         embed = criar_embed("sucesso", 
             "Veículo Apreendido",
             f"**Placa:** {placa.upper()}\n**Status:** Apreendido\n**Agente:** {interaction.user.mention}"
@@ -713,23 +1065,24 @@ async def veiculo_apreender(interaction: discord.Interaction, placa: str):
     else:
         embed = criar_embed("erro", "Erro", "Não foi possível apreender o veículo.")
     
-    await interaction.response.send_message(embed=embed)
+    await responder(interaction, embed=embed)
 
 @bot.tree.command(name="veiculo_liberar", description="Libera um veículo apreendido")
 @app_commands.describe(placa="Placa do veículo")
+@com_prazo()
 async def veiculo_liberar(interaction: discord.Interaction, placa: str):
     if not verificar_permissao(interaction, "veiculo_liberar"):
         embed = criar_embed("erro", "Sem Permissão", "Você não tem permissão para executar este comando.")
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await responder(interaction, embed=embed, ephemeral=True)
         return
     
-    veiculo = db.get_veiculo(placa.upper())
+    veiculo = await db.get_veiculo(placa.upper())
     if not veiculo:
         embed = criar_embed("erro", "Veículo Não Encontrado", f"Não foi encontrado veículo com placa {placa.upper()}.")
-        await interaction.response.send_message(embed=embed)
+        await responder(interaction, embed=embed)
         return
     
-    if db.atualizar_status_veiculo(placa.upper(), "ativo"):
+    if await db.atualizar_status_veiculo(placa.upper(), "ativo"):
         embed = criar_embed("sucesso", 
             "Veículo Liberado",
             f"**Placa:** {placa.upper()}\n**Status:** Liberado\n**Agente:** {interaction.user.mention}"
@@ -737,7 +1090,7 @@ async def veiculo_liberar(interaction: discord.Interaction, placa: str):
     else:
         embed = criar_embed("erro", "Erro", "Não foi possível liberar o veículo.")
     
-    await interaction.response.send_message(embed=embed)
+    await responder(interaction, embed=embed)
 
 # Comandos de Multas e Infrações
 @bot.tree.command(name="multar", description="Aplica uma multa a um jogador")
@@ -746,19 +1099,17 @@ async def veiculo_liberar(interaction: discord.Interaction, placa: str):
     tipo_infracao="Tipo de infração",
     placa_veiculo="Placa do veículo (opcional)"
 )
+@com_prazo()
 async def multar(interaction: discord.Interaction, rg_game: str, tipo_infracao: str, placa_veiculo: str = None):
     await multar_flow(interaction, rg_game, tipo_infracao, placa_veiculo)
 
 
 @multar.autocomplete("tipo_infracao")
 async def multar_autocomplete(interaction: discord.Interaction, current: str):
-    resultados = []
-    for codigo, infracao in TABELA_INFRACOES.items():
-        if current.lower() in infracao["descricao"].lower():
-            resultados.append(app_commands.Choice(name=infracao["descricao"], value=codigo))
-        if len(resultados) >= 25:
-            break
-    return resultados
+    return [
+        app_commands.Choice(name=descricao, value=codigo)
+        for codigo, descricao in indice_infracoes.buscar(current, limite=25)
+    ]
 
 @bot.tree.command(name="multa_consultar", description="Lista as multas de um jogador")
 @app_commands.describe(
@@ -770,56 +1121,24 @@ async def multar_autocomplete(interaction: discord.Interaction, current: str):
     app_commands.Choice(name="Pagas", value="paga"),
     app_commands.Choice(name="Em recurso", value="recorrida")
 ])
+@com_prazo()
 async def multa_consultar(interaction: discord.Interaction, rg_game: str, status: str = None):
-    player = db.get_player(rg_game)
-    if not player:
-        embed = criar_embed("erro", "Jogador Não Encontrado", f"Não foi encontrado jogador com RG {rg_game}.")
-        await interaction.response.send_message(embed=embed)
-        return
-    
-    multas = db.get_multas_jogador(rg_game, status)
-    
-    if not multas:
-        status_texto = f" ({status})" if status else ""
-        embed = criar_embed("info", "Consulta de Multas", f"Nenhuma multa encontrada para {player['nome_rp']}{status_texto}.")
-        await interaction.response.send_message(embed=embed)
-        return
-    
-    embed = discord.Embed(
-        title=f"📋 Multas - {player['nome_rp']}",
-        color=CORES["info"]
-    )
-    
-    total_pendente = sum(multa['valor'] for multa in multas if multa['status'] == 'pendente')
-    
-    embed.add_field(name="RG", value=rg_game, inline=True)
-    embed.add_field(name="Total de Multas", value=len(multas), inline=True)
-    embed.add_field(name="Total Pendente", value=f"R$ {total_pendente:.2f}", inline=True)
-    
-    for i, multa in enumerate(multas[:10]):  # Limitar a 10 multas para não exceder limite do embed
-        data = multa['data_ocorrencia'].split(' ')[0]  # Apenas a data
-        status_emoji = {"pendente": "🔴", "paga": "🟢", "recorrida": "🟡"}
-        
-        embed.add_field(
-            name=f"{status_emoji.get(multa['status'], '⚪')} Multa #{multa['id']}",
-            value=f"**Infração:** {multa['tipo_infracao']}\n**Valor:** R$ {multa['valor']:.2f}\n**Data:** {data}",
-            inline=True
-        )
-    
-    if len(multas) > 10:
-        embed.add_field(name="⚠️ Aviso", value=f"Mostrando apenas 10 de {len(multas)} multas.", inline=False)
-    
-    await interaction.response.send_message(embed=embed)
+    embed, view = await pagina_multas(filtro_multas(rg_game, status))
+    if view:
+        await responder(interaction, embed=embed, view=view)
+    else:
+        await responder(interaction, embed=embed)
 
 @bot.tree.command(name="multa_pagar", description="Registra o pagamento de uma multa")
 @app_commands.describe(multa_id="ID da multa")
+@com_prazo()
 async def multa_pagar(interaction: discord.Interaction, multa_id: int):
     if not verificar_permissao(interaction, "multa_pagar"):
         embed = criar_embed("erro", "Sem Permissão", "Você não tem permissão para executar este comando.")
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await responder(interaction, embed=embed, ephemeral=True)
         return
     
-    if db.pagar_multa(multa_id):
+    if await db.pagar_multa(multa_id):
         embed = criar_embed("sucesso", 
             "Multa Paga",
             f"**ID da Multa:** {multa_id}\n**Processado por:** {interaction.user.mention}"
@@ -827,17 +1146,18 @@ async def multa_pagar(interaction: discord.Interaction, multa_id: int):
     else:
         embed = criar_embed("erro", "Erro", f"Não foi possível processar o pagamento da multa #{multa_id}.")
     
-    await interaction.response.send_message(embed=embed)
+    await responder(interaction, embed=embed)
 
 @bot.tree.command(name="multa_recorrer", description="Marca uma multa como em recurso")
 @app_commands.describe(multa_id="ID da multa")
+@com_prazo()
 async def multa_recorrer(interaction: discord.Interaction, multa_id: int):
     if not verificar_permissao(interaction, "multa_recorrer"):
         embed = criar_embed("erro", "Sem Permissão", "Você não tem permissão para executar este comando.")
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await responder(interaction, embed=embed, ephemeral=True)
         return
     
-    if db.recorrer_multa(multa_id):
+    if await db.recorrer_multa(multa_id):
         embed = criar_embed("sucesso", 
             "Recurso Registrado",
             f"**ID da Multa:** {multa_id}\n**Status:** Em recurso\n**Processado por:** {interaction.user.mention}"
@@ -845,114 +1165,44 @@ async def multa_recorrer(interaction: discord.Interaction, multa_id: int):
     else:
         embed = criar_embed("erro", "Erro", f"Não foi possível processar o recurso da multa #{multa_id}.")
     
-    await interaction.response.send_message(embed=embed)
+    await responder(interaction, embed=embed)
 
 # Comandos de Cursos
 # Comandos de Consulta Geral
 @bot.tree.command(name="taxas", description="Exibe a tabela de taxas de serviços")
+@com_prazo()
 async def taxas(interaction: discord.Interaction):
-    embed = discord.Embed(
-        title="💰 Tabela Oficial de Taxas - Detran-SP",
-        color=CORES["detran"]
-    )
-    
-    for codigo, taxa in TABELA_TAXAS.items():
-        embed.add_field(
-            name=taxa['descricao'],
-            value=f"R$ {taxa['valor']:.2f}",
-            inline=True
-        )
-    
-    embed.set_footer(text="Valores em dinheiro virtual do servidor")
-    await interaction.response.send_message(embed=embed)
+    await enviar_referencia(interaction, "taxas")
 
 @bot.tree.command(name="infracoes", description="Exibe a tabela de infrações e multas")
+@com_prazo()
 async def infracoes(interaction: discord.Interaction):
-    embed = discord.Embed(
-        title="🚨 Tabela Oficial de Infrações e Multas",
-        color=CORES["aviso"]
-    )
-    
-    categorias = {"Leves": [], "Médias": [], "Graves": [], "Gravíssimas": []}
-    for infracao in TABELA_INFRACOES.values():
-        valor_desconto = infracao['valor'] * 0.85
-        linha = (
-            f"• {infracao['descricao']}\n"
-            f"  Valor: R$ {infracao['valor']:.2f} (desc: R$ {valor_desconto:.2f})\n"
-            f"  Pontos: {infracao['pontos']} | Pátio: {infracao['patio']}h"
-        )
-        if infracao['pontos'] == 3:
-            categorias["Leves"].append(linha)
-        elif infracao['pontos'] == 4:
-            categorias["Médias"].append(linha)
-        elif infracao['pontos'] == 5:
-            categorias["Graves"].append(linha)
-        else:
-            categorias["Gravíssimas"].append(linha)
-
-    for nome, itens in categorias.items():
-        if itens:
-            embed.add_field(name=nome, value="\n".join(itens), inline=False)
-    
-    embed.add_field(
-        name="⚠️ Observações",
-        value="• Reincidência em 12 meses: multa em dobro\n• 20 pontos: CNH suspensa\n• 30 pontos: CNH revogada",
-        inline=False
-    )
-    embed.set_footer(text="Valores em dinheiro virtual do servidor")
-    await interaction.response.send_message(embed=embed)
+    await enviar_referencia(interaction, "infracoes")
 
 @bot.tree.command(name="pop", description="Exibe um resumo do Protocolo Operacional Padrão")
+@com_prazo()
 async def pop(interaction: discord.Interaction):
-    embed = discord.Embed(
-        title="📋 Protocolo Operacional Padrão (POP)",
-        description=POP_RESUMO,
-        color=CORES["detran"]
-    )
-    embed.set_footer(text="Detran-SP - Cidade Salve RP")
-    await interaction.response.send_message(embed=embed)
+    await enviar_referencia(interaction, "pop")
 
 @bot.tree.command(name="regulamento", description="Exibe um resumo do Regulamento Interno")
+@com_prazo()
 async def regulamento(interaction: discord.Interaction):
-    embed = discord.Embed(
-        title="📜 Regulamento Interno do Detran-SP",
-        description=REGULAMENTO_RESUMO,
-        color=CORES["detran"]
-    )
-    embed.set_footer(text="Detran-SP - Cidade Salve RP")
-    await interaction.response.send_message(embed=embed)
+    await enviar_referencia(interaction, "regulamento")
 
 # Comandos de Operações e Relatórios
 @bot.tree.command(name="relatorio_multas_agente", description="Gera relatório de multas aplicadas por um agente")
 @app_commands.describe(agente="Usuário do Discord (agente)")
+@com_prazo()
 async def relatorio_multas_agente(interaction: discord.Interaction, agente: discord.Member):
     if not verificar_permissao(interaction, "relatorios"):
         embed = criar_embed("erro", "Sem Permissão", "Você não tem permissão para executar este comando.")
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await responder(interaction, embed=embed, ephemeral=True)
         return
     
-    with sqlite3.connect(db.db_path) as conn:
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT COUNT(*) as total, SUM(valor) as valor_total
-            FROM multas 
-            WHERE agente_id = ?
-        ''', (str(agente.id),))
-        
-        resultado = cursor.fetchone()
-        total_multas = resultado['total']
-        valor_total = resultado['valor_total'] or 0
-        
-        cursor.execute('''
-            SELECT tipo_infracao, COUNT(*) as quantidade
-            FROM multas 
-            WHERE agente_id = ?
-            GROUP BY tipo_infracao
-            ORDER BY quantidade DESC
-        ''', (str(agente.id),))
-        
-        infracoes_por_tipo = cursor.fetchall()
+    relatorio = await db.get_relatorio_multas_agente(str(agente.id))
+    total_multas = relatorio['total']
+    valor_total = relatorio['valor_total']
+    infracoes_por_tipo = relatorio['infracoes_por_tipo']
     
     embed = discord.Embed(
         title=f"📊 Relatório de Multas - {agente.display_name}",
@@ -964,58 +1214,73 @@ async def relatorio_multas_agente(interaction: discord.Interaction, agente: disc
     embed.add_field(name="Agente", value=agente.mention, inline=True)
     
     if infracoes_por_tipo:
-        top_infracoes = "\n".join([f"• {row['tipo_infracao']}: {row['quantidade']}" for row in infracoes_por_tipo[:5]])
+        top_infracoes = "\n".join([f"• {row['tipo_infracao']}: {row['quantidade']}" for row in infracoes_por_tipo])
         embed.add_field(name="Top 5 Infrações", value=top_infracoes, inline=False)
     
     embed.set_footer(text=f"Relatório gerado em {datetime.now().strftime('%d/%m/%Y %H:%M')}")
-    await interaction.response.send_message(embed=embed)
+    await responder(interaction, embed=embed)
 
-@bot.tree.command(name="relatorio_cnhs_suspensas", description="Lista todas as CNHs suspensas")
-async def relatorio_cnhs_suspensas(interaction: discord.Interaction):
+@bot.tree.command(name="relatorio_multas_dia", description="Gera relatório das multas aplicadas em um dia")
+@app_commands.describe(data="Data no formato DD/MM/AAAA (padrão: hoje)")
+@com_prazo()
+async def relatorio_multas_dia(interaction: discord.Interaction, data: str = None):
     if not verificar_permissao(interaction, "relatorios"):
         embed = criar_embed("erro", "Sem Permissão", "Você não tem permissão para executar este comando.")
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await responder(interaction, embed=embed, ephemeral=True)
         return
-    
-    with sqlite3.connect(db.db_path) as conn:
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT rg_game, nome_rp, cnh_status, pontos_cnh
-            FROM players 
-            WHERE cnh_status IN ('suspensa', 'revogada', 'cassada')
-            ORDER BY pontos_cnh DESC
-        ''')
-        
-        cnhs_problematicas = cursor.fetchall()
-    
-    if not cnhs_problematicas:
-        embed = criar_embed("info", "CNHs Suspensas", "Nenhuma CNH suspensa, revogada ou cassada encontrada.")
-        await interaction.response.send_message(embed=embed)
+
+    try:
+        dia = datetime.strptime(data, '%d/%m/%Y') if data else datetime.now()
+    except ValueError:
+        embed = criar_embed("erro", "Data inválida", "Informe a data no formato DD/MM/AAAA.")
+        await responder(interaction, embed=embed, ephemeral=True)
         return
-    
+
+    relatorio = await db.get_relatorio_multas_dia(dia.strftime('%Y-%m-%d'))
     embed = discord.Embed(
-        title="🚫 Relatório de CNHs com Restrições",
-        color=CORES["aviso"]
+        title=f"📊 Relatório de Multas - {dia.strftime('%d/%m/%Y')}",
+        color=CORES["info"]
     )
-    
-    for cnh in cnhs_problematicas[:15]:  # Limitar a 15 para não exceder limite
-        status_emoji = {"suspensa": "🟡", "revogada": "🔴", "cassada": "❌"}
-        embed.add_field(
-            name=f"{status_emoji.get(cnh['cnh_status'], '⚪')} {cnh['nome_rp']}",
-            value=f"**RG:** {cnh['rg_game']}\n**Status:** {cnh['cnh_status'].title()}\n**Pontos:** {cnh['pontos_cnh']}",
-            inline=True
-        )
-    
-    if len(cnhs_problematicas) > 15:
-        embed.add_field(name="⚠️ Aviso", value=f"Mostrando apenas 15 de {len(cnhs_problematicas)} CNHs.", inline=False)
+    embed.add_field(name="Total de Multas", value=relatorio['total'], inline=True)
+    embed.add_field(name="Valor Total", value=f"R$ {relatorio['valor_total']:.2f}", inline=True)
+    if relatorio['infracoes_por_tipo']:
+        por_tipo = "\n".join([f"• {row['tipo_infracao']}: {row['quantidade']}" for row in relatorio['infracoes_por_tipo']])
+        embed.add_field(name="Infrações", value=por_tipo[:1024], inline=False)
 
     embed.set_footer(text=f"Relatório gerado em {datetime.now().strftime('%d/%m/%Y %H:%M')}")
-    await interaction.response.send_message(embed=embed)
+    await responder(interaction, embed=embed)
+
+@bot.tree.command(name="relatorio_reconstruir", description="Recalcula os resumos de multas a partir do histórico")
+@com_prazo(efemero=True)
+async def relatorio_reconstruir(interaction: discord.Interaction):
+    if not verificar_permissao(interaction, "relatorios"):
+        embed = criar_embed("erro", "Sem Permissão", "Você não tem permissão para executar este comando.")
+        await responder(interaction, embed=embed, ephemeral=True)
+        return
+
+    await adiar(interaction, ephemeral=True)
+    await db.reconstruir_resumos()
+    embed = criar_embed("sucesso", "Resumos Reconstruídos", "Os resumos de multas foram recalculados a partir do histórico.")
+    await interaction.followup.send(embed=embed, ephemeral=True)
+
+@bot.tree.command(name="relatorio_cnhs_suspensas", description="Lista todas as CNHs suspensas")
+@com_prazo()
+async def relatorio_cnhs_suspensas(interaction: discord.Interaction):
+    if not verificar_permissao(interaction, "relatorios"):
+        embed = criar_embed("erro", "Sem Permissão", "Você não tem permissão para executar este comando.")
+        await responder(interaction, embed=embed, ephemeral=True)
+        return
+    
+    embed, view = await pagina_cnhs_restritas("")
+    if view:
+        await responder(interaction, embed=embed, view=view)
+    else:
+        await responder(interaction, embed=embed)
 
 # Sistema de Tickets
 @bot.tree.command(name="ticket_criar", description="Cria um ticket de suporte")
 @app_commands.describe(descricao="Descreva seu problema")
+@com_prazo(efemero=True)
 async def ticket_criar(interaction: discord.Interaction, descricao: str):
     await ticket_criar_flow(interaction, descricao)
 
@@ -1025,45 +1290,43 @@ async def ticket_criar(interaction: discord.Interaction, descricao: str):
     app_commands.Choice(name="aberto", value="aberto"),
     app_commands.Choice(name="fechado", value="fechado")
 ])
+@com_prazo(efemero=True)
 async def ticket_listar(interaction: discord.Interaction, status: str = "aberto"):
     if not verificar_permissao(interaction, "ticket_listar"):
         embed = criar_embed("erro", "Sem Permissão", "Você não tem permissão para executar este comando.")
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await responder(interaction, embed=embed, ephemeral=True)
         return
 
-    tickets = db.listar_tickets(status)
-    if tickets:
-        descricao = "\n".join([
-            f"ID {t['id']}: {t['descricao']} (Autor: <@{t['autor_id']}>)" for t in tickets
-        ])
+    embed, view = await pagina_tickets(status)
+    if view:
+        await responder(interaction, embed=embed, view=view, ephemeral=True)
     else:
-        descricao = "Nenhum ticket encontrado."
-
-    embed = criar_embed("info", "Tickets", descricao)
-    await interaction.response.send_message(embed=embed, ephemeral=True)
+        await responder(interaction, embed=embed, ephemeral=True)
 
 @bot.tree.command(name="ticket_fechar", description="Fecha um ticket de suporte")
 @app_commands.describe(ticket_id="ID do ticket")
+@com_prazo(efemero=True)
 async def ticket_fechar(interaction: discord.Interaction, ticket_id: int):
     if not verificar_permissao(interaction, "ticket_fechar"):
         embed = criar_embed("erro", "Sem Permissão", "Você não tem permissão para executar este comando.")
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await responder(interaction, embed=embed, ephemeral=True)
         return
 
-    if db.fechar_ticket(ticket_id):
+    if await db.fechar_ticket(ticket_id):
         embed = criar_embed("sucesso", "Ticket Fechado", f"Ticket #{ticket_id} foi fechado.")
     else:
         embed = criar_embed("erro", "Erro", f"Ticket #{ticket_id} não encontrado ou já fechado.")
 
-    await interaction.response.send_message(embed=embed, ephemeral=True)
+    await responder(interaction, embed=embed, ephemeral=True)
 
 
 @bot.tree.command(name="aviso", description="Envia um aviso para o canal de avisos")
 @app_commands.describe(mensagem="Conteúdo do aviso")
+@com_prazo(efemero=True)
 async def aviso(interaction: discord.Interaction, mensagem: str):
     if not verificar_permissao(interaction, "aviso"):
         embed = criar_embed("erro", "Sem Permissão", "Você não tem permissão para executar este comando.")
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await responder(interaction, embed=embed, ephemeral=True)
         return
 
     canal = bot.get_channel(CANAL_AVISOS)
@@ -1073,7 +1336,66 @@ async def aviso(interaction: discord.Interaction, mensagem: str):
         resposta = criar_embed("sucesso", "Aviso enviado", f"Aviso publicado em {canal.mention}.")
     else:
         resposta = criar_embed("erro", "Erro", "Canal de avisos não encontrado.")
-    await interaction.response.send_message(embed=resposta, ephemeral=True)
+    await responder(interaction, embed=resposta, ephemeral=True)
+
+
+@bot.tree.command(name="metricas", description="Exibe a latência dos comandos e o uso do cache")
+@com_prazo(efemero=True)
+async def metricas(interaction: discord.Interaction):
+    # "metricas" não consta em CARGOS_PERMISSOES: apenas a gerência tem acesso
+    if not verificar_permissao(interaction, "metricas"):
+        embed = criar_embed("erro", "Sem Permissão", "Você não tem permissão para executar este comando.")
+        await responder(interaction, embed=embed, ephemeral=True)
+        return
+
+    linhas = [
+        f"`{nome}` {chamadas}× | p50 {p50 * 1000:.0f} ms · p95 {p95 * 1000:.0f} ms · p99 {p99 * 1000:.0f} ms"
+        for nome, chamadas, p50, p95, p99 in resumo_handlers()
+    ]
+    descricao = "\n".join(linhas) or "Nenhuma interação registrada ainda."
+    embed = discord.Embed(title="📈 Métricas", description=descricao[:4096], color=CORES["info"])
+    for nome, estatisticas in (await db.estatisticas_cache()).items():
+        embed.add_field(
+            name=f"Cache {nome}",
+            value=f"{estatisticas['itens']} itens | acerto {estatisticas['taxa_acerto']:.0%}",
+            inline=True
+        )
+    consultas = await db.consultas_mais_caras(3)
+    if consultas:
+        embed.add_field(
+            name="Consultas mais caras",
+            value="\n".join(
+                f"`{c['tempo_total'] * 1000:.0f} ms / {c['chamadas']}×` {' '.join(c['sql'].split())[:80]}"
+                for c in consultas
+            ),
+            inline=False
+        )
+    logs = fila_logs.estatisticas()
+    embed.add_field(
+        name="Logs",
+        value=f"{logs['mensagens_enviadas']} mensagens | {logs['pendentes']} pendentes | {logs['descartadas']} descartadas",
+        inline=True
+    )
+    cargos = fila_cargos.estatisticas()
+    embed.add_field(
+        name="Fila de cargos",
+        value=f"{cargos['aplicadas']} aplicadas | {cargos['pendentes']} pendentes | {cargos['falhas']} falhas",
+        inline=True
+    )
+    await responder(interaction, embed=embed, ephemeral=True)
+
+@bot.tree.command(name="sincronizar_comandos", description="Força a sincronização dos comandos slash com o Discord")
+@com_prazo(efemero=True)
+async def sincronizar_comandos_cmd(interaction: discord.Interaction):
+    if not verificar_permissao(interaction, "sincronizar_comandos"):
+        embed = criar_embed("erro", "Sem Permissão", "Você não tem permissão para executar este comando.")
+        await responder(interaction, embed=embed, ephemeral=True)
+        return
+
+    await adiar(interaction, ephemeral=True)
+    await sincronizar_comandos(forcar=True)
+    embed = criar_embed("sucesso", "Comandos Sincronizados", "A árvore de comandos foi sincronizada com o Discord.")
+    await interaction.followup.send(embed=embed, ephemeral=True)
 
 # Comando para executar o bot
 if __name__ == "__main__":
@@ -1083,4 +1405,5 @@ if __name__ == "__main__":
         print("Edite o arquivo config.py e defina seu token do Discord.")
     else:
         bot.run(DISCORD_TOKEN)
+        db.fechar()
 
@@ -0,0 +1,71 @@
+"""Cache LRU com expiração usado pelo banco de dados do Detran."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class CacheLRU:
+    """Cache limitado por quantidade de itens e por tempo de vida (TTL).
+
+    Seguro para uso entre threads. Para evitar que uma leitura concorrente
+    grave no cache um valor anterior a uma escrita, quem lê deve obter a
+    ``geracao`` antes de consultar o banco e repassá-la a ``guardar``: se
+    houve alguma invalidação nesse intervalo, o valor é descartado.
+    """
+
+    def __init__(self, capacidade: int = 4096, ttl: float = 60.0):
+        self.capacidade = capacidade
+        self.ttl = ttl
+        self.acertos = 0
+        self.falhas = 0
+        self.geracao = 0
+        self._itens: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, chave: Hashable) -> Optional[Any]:
+        """Retorna o valor guardado para a chave, ou None se ausente/expirado"""
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None or item[1] < time.monotonic():
+                if item is not None:
+                    del self._itens[chave]
+                self.falhas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return item[0]
+
+    def guardar(self, chave: Hashable, valor: Any, geracao: int):
+        """Guarda o valor, a menos que o cache tenha sido invalidado desde ``geracao``"""
+        with self._lock:
+            if geracao != self.geracao:
+                return
+            self._itens[chave] = (valor, time.monotonic() + self.ttl)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.capacidade:
+                self._itens.popitem(last=False)
+
+    def invalidar(self, chave: Hashable):
+        """Remove a chave do cache"""
+        with self._lock:
+            self.geracao += 1
+            self._itens.pop(chave, None)
+
+    def limpar(self):
+        """Remove todos os itens do cache"""
+        with self._lock:
+            self.geracao += 1
+            self._itens.clear()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Retorna contadores de acertos e falhas do cache"""
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                "itens": len(self._itens),
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "taxa_acerto": self.acertos / consultas if consultas else 0.0,
+            }
@@ -19,6 +19,11 @@ CANAL_PAINEL_FUNCIONARIOS = 1408158616783163616
 CANAL_REGISTRO = 1403794454413967526
 # Canal onde os logs do sistema serão enviados
 CANAL_LOGS = 1406433637087449128
+# Envio de logs em lote: linhas aguardando envio (excedentes são descartadas),
+# intervalo máximo em segundos até enviar um lote e tamanho máximo de cada mensagem
+LOG_LIMITE_FILA = 1000
+LOG_INTERVALO_ENVIO = 2.0
+LOG_TAMANHO_MENSAGEM = 2000
 """
 Novos canais e categorias utilizados pelo bot.
 """
@@ -27,6 +32,10 @@ Novos canais e categorias utilizados pelo bot.
 CANAL_TICKETS = 1408251485824880742
 # Categoria onde os tickets serão criados
 CATEGORIA_TICKETS = 1408251716398223472
+# Canais de ticket criados com antecedência (ocultos) na categoria de tickets;
+# 0 desativa o pool e cada ticket cria o próprio canal ao ser aberto
+TICKETS_POOL_TAMANHO = 3
+TICKETS_NOME_RESERVA = "ticket-reserva"
 # Canal para painel de sugestões
 CANAL_SUGESTOES = 1408255731395727511
 # Canal onde avisos serão publicados
@@ -38,7 +47,8 @@ CARGOS_PERMISSOES = {
         "painel", "registrar", "cnh_emitir", "cnh_renovar", "cnh_suspender", "cnh_cassar",
         "veiculo_registrar", "veiculo_transferir", "veiculo_apreender", "veiculo_liberar",
         "multar", "multa_pagar", "multa_recorrer", "blitz_iniciar", "blitz_finalizar",
-        "relatorios", "ticket_listar", "ticket_fechar", "aviso"
+        "relatorios", "ticket_listar", "ticket_fechar", "aviso", "importar",
+        "sincronizar_comandos"
     ],
     "Instrutor": [
         "painel", "registrar", "cnh_emitir", "cnh_renovar", "veiculo_registrar", "veiculo_transferir",
@@ -50,6 +60,14 @@ CARGOS_PERMISSOES = {
     ]
 }
 
+# IDs dos cargos do Discord correspondentes a cada entrada de CARGOS_PERMISSOES.
+# Membros sem nenhum desses cargos recorrem a ROLE_FUNCIONARIOS/PERMISSOES_FUNCIONARIOS.
+ROLES_CARGOS = {
+    "Diretor": [],
+    "Instrutor": [],
+    "Agente": [],
+}
+
 # Comandos permitidos para o cargo padrão de funcionários
 PERMISSOES_FUNCIONARIOS = list({
     comando
@@ -326,6 +344,23 @@ TABELA_TAXAS = {
     },
 }
 
+# Segundos, contados da criação da interação, até o bot adiar automaticamente a
+# resposta (o Discord encerra a interação sem resposta após 3 segundos)
+PRAZO_ADIAMENTO_INTERACAO = 2.0
+
+# Fila de atribuição de cargos: trabalhadores simultâneos, tentativas por membro e
+# espera base (segundos, dobrada a cada nova tentativa) após 429 ou erro do Discord
+CARGOS_TRABALHADORES = 3
+CARGOS_TENTATIVAS = 5
+CARGOS_ESPERA_BASE = 1.0
+# Reconciliação de cargos na inicialização: membros por lote e pausa entre lotes
+CARGOS_LOTE_RECONCILIACAO = 50
+CARGOS_PAUSA_LOTES = 5.0
+
+# Endpoint local de métricas no formato do Prometheus (porta 0 desativa)
+METRICAS_HOST = os.environ.get("METRICAS_HOST", "127.0.0.1")
+METRICAS_PORTA = int(os.environ.get("METRICAS_PORTA", "9108"))
+
 # Limites de pontuação da CNH
 LIMITE_SUSPENSAO_CNH = 20
 LIMITE_REVOGACAO_CNH = 30
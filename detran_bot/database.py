@@ -1,18 +1,381 @@
 import sqlite3
 import os.path
-from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from cache import CacheLRU
+from metricas import contar_consulta
+from perfil_sql import PerfilSQL, ConexaoPerfilada
+from modelos import Player, CNH, Veiculo, Multa, Ticket, Painel, VinculoDiscord
+from typing import Optional, List, Dict, Any, Iterable, Iterator, NamedTuple, Tuple, Callable
+
+# Caminho do banco; DETRAN_DB_PATH permite usar outro arquivo (ex.: benchmarks)
+DB_PATH = os.environ.get("DETRAN_DB_PATH") or os.path.join(os.path.dirname(__file__), "detran.db")
+# Perfil de consultas (opcional): registra instruções acima deste tempo, em milissegundos
+LIMITE_CONSULTA_LENTA_MS = os.environ.get("DETRAN_CONSULTA_LENTA_MS")
+
+# Ajustes aplicados a cada conexão aberta pelo banco
+PRAGMAS_CONEXAO = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",  # ~16 MB de cache de páginas
+    "PRAGMA mmap_size = 268435456",  # 256 MB mapeados em memória
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",
+)
+# Quantidade de instruções preparadas mantidas em cache por conexão
+CACHE_INSTRUCOES = 256
+# Datas são gravadas como epoch UTC (segundos, INTEGER)
+SEGUNDOS_DIA = 86400
+
+# Colunas do resumo por agente que contam multas em cada status
+COLUNAS_STATUS_MULTA = {
+    'pendente': 'pendentes',
+    'paga': 'pagas',
+    'recorrida': 'recorridas',
+}
+
+# Recalcula do zero as tabelas de resumo a partir da tabela de multas
+SQL_RECONSTRUIR_RESUMOS = [
+    'DELETE FROM resumo_multas_agente',
+    'DELETE FROM resumo_multas_agente_infracao',
+    'DELETE FROM resumo_multas_dia',
+    '''INSERT INTO resumo_multas_agente (agente_id, total, valor_total, pendentes, pagas, recorridas)
+       SELECT agente_id, COUNT(*), SUM(valor),
+              SUM(status = 'pendente'), SUM(status = 'paga'), SUM(status = 'recorrida')
+       FROM multas GROUP BY agente_id''',
+    '''INSERT INTO resumo_multas_agente_infracao (agente_id, tipo_infracao, quantidade)
+       SELECT agente_id, tipo_infracao, COUNT(*)
+       FROM multas GROUP BY agente_id, tipo_infracao''',
+    '''INSERT INTO resumo_multas_dia (dia, tipo_infracao, quantidade, valor_total)
+       SELECT date(data_ocorrencia, 'unixepoch', 'localtime') AS dia, tipo_infracao, COUNT(*), SUM(valor)
+       FROM multas GROUP BY dia, tipo_infracao''',
+]
+
+# Definições das tabelas com datas em epoch UTC ({tabela} é o nome a criar)
+DEFINICAO_CNHS = '''
+    CREATE TABLE IF NOT EXISTS {tabela} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        jogador_id TEXT NOT NULL,
+        numero_registro TEXT UNIQUE NOT NULL,
+        data_emissao INTEGER NOT NULL,
+        data_validade INTEGER NOT NULL,
+        categoria TEXT NOT NULL,
+        FOREIGN KEY (jogador_id) REFERENCES players(rg_game)
+    )
+'''
+DEFINICAO_MULTAS = '''
+    CREATE TABLE IF NOT EXISTS {tabela} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        jogador_id TEXT NOT NULL,
+        veiculo_id INTEGER,
+        agente_id TEXT NOT NULL,
+        tipo_infracao TEXT NOT NULL,
+        valor REAL NOT NULL,
+        pontos INTEGER NOT NULL,
+        data_ocorrencia INTEGER NOT NULL,
+        status TEXT DEFAULT 'pendente',
+        FOREIGN KEY (jogador_id) REFERENCES players(rg_game),
+        FOREIGN KEY (veiculo_id) REFERENCES veiculos(id)
+    )
+'''
+DEFINICAO_TICKETS = '''
+    CREATE TABLE IF NOT EXISTS {tabela} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        autor_id TEXT NOT NULL,
+        descricao TEXT NOT NULL,
+        status TEXT DEFAULT 'aberto',
+        data_criacao INTEGER NOT NULL
+    )
+'''
+DEFINICAO_SUGESTOES = '''
+    CREATE TABLE IF NOT EXISTS {tabela} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        autor_id TEXT NOT NULL,
+        sugestao TEXT NOT NULL,
+        data_criacao INTEGER NOT NULL
+    )
+'''
+
+
+def _sql_datas_para_epoch(tabela: str, definicao: str, colunas: Tuple[str, ...], colunas_data: Tuple[str, ...]) -> List[str]:
+    """Recria a tabela com as colunas de data em INTEGER, convertendo textos em horário local para epoch UTC"""
+    selecao = ", ".join(
+        f"CASE typeof({c}) WHEN 'integer' THEN {c} ELSE CAST(strftime('%s', {c}, 'utc') AS INTEGER) END"
+        if c in colunas_data else c
+        for c in colunas
+    )
+    return [
+        f'DROP TABLE IF EXISTS {tabela}_nova',
+        definicao.format(tabela=f'{tabela}_nova'),
+        f'INSERT INTO {tabela}_nova ({", ".join(colunas)}) SELECT {selecao} FROM {tabela}',
+        f'DROP TABLE {tabela}',
+        f'ALTER TABLE {tabela}_nova RENAME TO {tabela}',
+    ]
+
+# Migrações do esquema: (versão, descrição, instruções SQL).
+# São aplicadas em ordem e registradas na tabela schema_version; cada instrução
+# deve ser idempotente, pois bancos antigos podem já ter parte das alterações.
+# benchmarks/migracoes.py confere as migrações a partir de um banco no formato original.
+MIGRACOES = [
+    (1, "Índices para as consultas de multas, relatórios, tickets e veículos", [
+        '''CREATE INDEX IF NOT EXISTS idx_multas_reincidencia
+           ON multas (jogador_id, tipo_infracao, data_ocorrencia)''',
+        'CREATE INDEX IF NOT EXISTS idx_multas_agente ON multas (agente_id)',
+        'CREATE INDEX IF NOT EXISTS idx_players_cnh_status ON players (cnh_status)',
+        'CREATE INDEX IF NOT EXISTS idx_tickets_status ON tickets (status)',
+        'CREATE INDEX IF NOT EXISTS idx_veiculos_proprietario ON veiculos (proprietario_id)',
+        'CREATE INDEX IF NOT EXISTS idx_cnhs_jogador ON cnhs (jogador_id)',
+    ]),
+    (2, "Tabelas de resumo de multas por agente, infração e dia", [
+        '''CREATE TABLE IF NOT EXISTS resumo_multas_agente (
+               agente_id TEXT PRIMARY KEY,
+               total INTEGER NOT NULL DEFAULT 0,
+               valor_total REAL NOT NULL DEFAULT 0,
+               pendentes INTEGER NOT NULL DEFAULT 0,
+               pagas INTEGER NOT NULL DEFAULT 0,
+               recorridas INTEGER NOT NULL DEFAULT 0
+           )''',
+        '''CREATE TABLE IF NOT EXISTS resumo_multas_agente_infracao (
+               agente_id TEXT NOT NULL,
+               tipo_infracao TEXT NOT NULL,
+               quantidade INTEGER NOT NULL DEFAULT 0,
+               PRIMARY KEY (agente_id, tipo_infracao)
+           )''',
+        '''CREATE INDEX IF NOT EXISTS idx_resumo_agente_infracao_quantidade
+           ON resumo_multas_agente_infracao (agente_id, quantidade DESC)''',
+        '''CREATE TABLE IF NOT EXISTS resumo_multas_dia (
+               dia TEXT NOT NULL,
+               tipo_infracao TEXT NOT NULL,
+               quantidade INTEGER NOT NULL DEFAULT 0,
+               valor_total REAL NOT NULL DEFAULT 0,
+               PRIMARY KEY (dia, tipo_infracao)
+           )''',
+        # Carga inicial, ainda com as datas em texto (convertidas na migração 4)
+        '''INSERT OR REPLACE INTO resumo_multas_agente (agente_id, total, valor_total, pendentes, pagas, recorridas)
+           SELECT agente_id, COUNT(*), SUM(valor),
+                  SUM(status = 'pendente'), SUM(status = 'paga'), SUM(status = 'recorrida')
+           FROM multas GROUP BY agente_id''',
+        '''INSERT OR REPLACE INTO resumo_multas_agente_infracao (agente_id, tipo_infracao, quantidade)
+           SELECT agente_id, tipo_infracao, COUNT(*)
+           FROM multas GROUP BY agente_id, tipo_infracao''',
+        '''INSERT OR REPLACE INTO resumo_multas_dia (dia, tipo_infracao, quantidade, valor_total)
+           SELECT substr(data_ocorrencia, 1, 10), tipo_infracao, COUNT(*), SUM(valor)
+           FROM multas GROUP BY substr(data_ocorrencia, 1, 10), tipo_infracao''',
+    ]),
+    (3, "Índices para a paginação de multas por jogador", [
+        'CREATE INDEX IF NOT EXISTS idx_multas_jogador ON multas (jogador_id)',
+        'CREATE INDEX IF NOT EXISTS idx_multas_jogador_status ON multas (jogador_id, status)',
+    ]),
+    (4, "Datas armazenadas como epoch UTC (INTEGER) com índices para consultas por período", [
+        *_sql_datas_para_epoch(
+            'multas', DEFINICAO_MULTAS,
+            ('id', 'jogador_id', 'veiculo_id', 'agente_id', 'tipo_infracao', 'valor', 'pontos',
+             'data_ocorrencia', 'status'),
+            ('data_ocorrencia',),
+        ),
+        '''CREATE INDEX IF NOT EXISTS idx_multas_reincidencia
+           ON multas (jogador_id, tipo_infracao, data_ocorrencia)''',
+        'CREATE INDEX IF NOT EXISTS idx_multas_agente ON multas (agente_id)',
+        'CREATE INDEX IF NOT EXISTS idx_multas_jogador ON multas (jogador_id)',
+        'CREATE INDEX IF NOT EXISTS idx_multas_jogador_status ON multas (jogador_id, status)',
+        'CREATE INDEX IF NOT EXISTS idx_multas_data ON multas (data_ocorrencia)',
+        *_sql_datas_para_epoch(
+            'cnhs', DEFINICAO_CNHS,
+            ('id', 'jogador_id', 'numero_registro', 'data_emissao', 'data_validade', 'categoria'),
+            ('data_emissao', 'data_validade'),
+        ),
+        'CREATE INDEX IF NOT EXISTS idx_cnhs_jogador ON cnhs (jogador_id)',
+        'CREATE INDEX IF NOT EXISTS idx_cnhs_validade ON cnhs (data_validade)',
+        *_sql_datas_para_epoch(
+            'tickets', DEFINICAO_TICKETS,
+            ('id', 'autor_id', 'descricao', 'status', 'data_criacao'),
+            ('data_criacao',),
+        ),
+        'CREATE INDEX IF NOT EXISTS idx_tickets_status ON tickets (status)',
+        *_sql_datas_para_epoch(
+            'sugestoes', DEFINICAO_SUGESTOES,
+            ('id', 'autor_id', 'sugestao', 'data_criacao'),
+            ('data_criacao',),
+        ),
+    ]),
+    (5, "Mensagens de painel publicadas pelo bot", [
+        '''CREATE TABLE IF NOT EXISTS paineis (
+               nome TEXT PRIMARY KEY,
+               canal_id INTEGER NOT NULL,
+               mensagem_id INTEGER NOT NULL,
+               hash TEXT NOT NULL
+           )''',
+    ]),
+    (6, "Configurações persistidas pelo bot (chave/valor)", [
+        '''CREATE TABLE IF NOT EXISTS configuracoes (
+               chave TEXT PRIMARY KEY,
+               valor TEXT NOT NULL
+           )''',
+    ]),
+    (7, "Vínculo entre membros do Discord e RG/nome informados no registro", [
+        '''CREATE TABLE IF NOT EXISTS vinculos_discord (
+               discord_id INTEGER PRIMARY KEY,
+               rg_game TEXT NOT NULL,
+               nome TEXT NOT NULL,
+               data_registro INTEGER NOT NULL
+           )''',
+        'CREATE INDEX IF NOT EXISTS idx_vinculos_discord_rg ON vinculos_discord (rg_game)',
+    ]),
+    (8, "Índice parcial para a paginação das CNHs restritas", [
+        '''CREATE INDEX IF NOT EXISTS idx_players_cnhs_restritas
+           ON players (pontos_cnh DESC, rg_game)
+           WHERE cnh_status IN ('suspensa', 'revogada', 'cassada')''',
+    ]),
+]
+
+
+class ResultadoMulta(NamedTuple):
+    """Resultado da aplicação de uma multa"""
+    multa_id: int
+    valor: float
+    reincidencia: bool
+    pontos_cnh: Optional[int]
+    cnh_status: Optional[str]
+
+
+class Pagina(NamedTuple):
+    """Página de uma listagem paginada por cursor (keyset)"""
+    itens: list
+    tem_anterior: bool
+    tem_proxima: bool
+
+
+class ResultadoImportacao(NamedTuple):
+    """Resultado de uma importação em lote"""
+    inseridos: int
+    conflitos: List[Tuple[int, str]]  # (número do registro, motivo)
+    erro_leitura: Optional[Tuple[int, str]] = None  # (número do registro, motivo) se o arquivo não pôde ser lido até o fim
+
+
+# Quantidade de registros gravados por transação nas importações em lote
+TAMANHO_LOTE_IMPORTACAO = 1000
+
+
+def _texto(registro: Dict[str, Any], campo: str) -> Optional[str]:
+    """Lê um campo textual de um registro importado, tratando vazio como ausente"""
+    valor = registro.get(campo)
+    if valor is None:
+        return None
+    valor = str(valor).strip()
+    return valor or None
 
-DB_PATH = os.path.join(os.path.dirname(__file__), "detran.db")
 
 class DetranDatabase:
-    def __init__(self, db_path: str = DB_PATH):
+    def __init__(self, db_path: str = DB_PATH, cache_capacidade: int = 4096, cache_ttl: float = 60.0,
+                 limite_consulta_lenta: Optional[float] = None):
         self.db_path = db_path
+        if limite_consulta_lenta is None and LIMITE_CONSULTA_LENTA_MS:
+            limite_consulta_lenta = float(LIMITE_CONSULTA_LENTA_MS) / 1000
+        # Com um limite definido, todas as instruções passam pelo perfil (segundos)
+        self.perfil = PerfilSQL(limite_consulta_lenta) if limite_consulta_lenta is not None else None
+        self._local = threading.local()
+        self._conexoes: List[sqlite3.Connection] = []
+        self._conexoes_lock = threading.Lock()
+        # Caches de leitura de jogadores (por rg_game) e veículos (por placa)
+        self._cache_players = CacheLRU(cache_capacidade, cache_ttl)
+        self._cache_veiculos = CacheLRU(cache_capacidade, cache_ttl)
         self.init_database()
+
+    def _conexao(self) -> sqlite3.Connection:
+        """Retorna a conexão persistente da thread atual, abrindo-a na primeira chamada.
+
+        O objeto retornado pode ser usado como gerenciador de contexto: o bloco
+        ``with`` confirma a transação ao final (ou desfaz em caso de erro) sem
+        fechar a conexão.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                check_same_thread=False,
+                cached_statements=CACHE_INSTRUCOES,
+                factory=ConexaoPerfilada if self.perfil else sqlite3.Connection,
+            )
+            if self.perfil:
+                conn.perfil = self.perfil
+            conn.row_factory = sqlite3.Row
+            for pragma in PRAGMAS_CONEXAO:
+                conn.execute(pragma)
+            conn.set_trace_callback(contar_consulta)
+            self._local.conn = conn
+            with self._conexoes_lock:
+                self._conexoes.append(conn)
+        return conn
+
+    @contextmanager
+    def _transacao(self) -> Iterator[sqlite3.Cursor]:
+        """Executa o bloco em uma transação de escrita, confirmando ao final ou desfazendo em caso de erro"""
+        conn = self._conexao()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn.cursor()
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+    @staticmethod
+    def _montar_pagina(linhas: list, limite: int, voltando: bool, com_cursor: bool) -> Pagina:
+        """Monta a página a partir de até ``limite + 1`` linhas buscadas após (ou antes de) um cursor"""
+        excedeu = len(linhas) > limite
+        linhas = linhas[:limite]
+        if voltando:
+            linhas.reverse()
+            return Pagina(linhas, excedeu, True)
+        return Pagina(linhas, com_cursor, excedeu)
+
+    def _pagina_por_id(self, tipo, tabela: str, filtros: List[str], parametros: List[Any],
+                       apos_id: Optional[int], antes_id: Optional[int], limite: int) -> Pagina:
+        """Busca uma página ordenada por id, com ``WHERE id > ?`` (ou ``id < ?`` ao voltar)"""
+        filtros, parametros = list(filtros), list(parametros)
+        ordem = 'id'
+        if antes_id is not None:
+            filtros.append('id < ?')
+            parametros.append(antes_id)
+            ordem = 'id DESC'
+        elif apos_id is not None:
+            filtros.append('id > ?')
+            parametros.append(apos_id)
+        where = f"WHERE {' AND '.join(filtros)}" if filtros else ''
+        with self._conexao() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = tipo.da_linha
+            cursor.execute(
+                f'SELECT {tipo.colunas} FROM {tabela} {where} ORDER BY {ordem} LIMIT ?',
+                (*parametros, limite + 1),
+            )
+            return self._montar_pagina(cursor.fetchall(), limite, antes_id is not None,
+                                       apos_id is not None or antes_id is not None)
+
+    def estatisticas_cache(self) -> Dict[str, Dict[str, Any]]:
+        """Retorna os contadores de acertos e falhas dos caches de leitura"""
+        return {
+            "players": self._cache_players.estatisticas(),
+            "veiculos": self._cache_veiculos.estatisticas(),
+        }
+
+    def consultas_mais_caras(self, quantidade: int = 10) -> List[Dict[str, Any]]:
+        """Instruções com maior tempo acumulado (vazio se o perfil de consultas estiver desligado)"""
+        return self.perfil.mais_caras(quantidade) if self.perfil else []
+
+    def fechar(self):
+        """Fecha todas as conexões abertas pelo banco"""
+        with self._conexoes_lock:
+            conexoes, self._conexoes = self._conexoes, []
+        for conn in conexoes:
+            conn.close()
+        self._local = threading.local()
     
     def init_database(self):
         """Inicializa o banco de dados com as tabelas necessárias"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conexao() as conn:
             cursor = conn.cursor()
             
             # Tabela de jogadores
@@ -27,17 +390,7 @@ class DetranDatabase:
             ''')
             
             # Tabela de CNHs
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS cnhs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    jogador_id TEXT NOT NULL,
-                    numero_registro TEXT UNIQUE NOT NULL,
-                    data_emissao TEXT NOT NULL,
-                    data_validade TEXT NOT NULL,
-                    categoria TEXT NOT NULL,
-                    FOREIGN KEY (jogador_id) REFERENCES players(rg_game)
-                )
-            ''')
+            cursor.execute(DEFINICAO_CNHS.format(tabela='cnhs'))
             
             # Tabela de veículos
             cursor.execute('''
@@ -55,21 +408,7 @@ class DetranDatabase:
             ''')
             
             # Tabela de multas
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS multas (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    jogador_id TEXT NOT NULL,
-                    veiculo_id INTEGER,
-                    agente_id TEXT NOT NULL,
-                    tipo_infracao TEXT NOT NULL,
-                    valor REAL NOT NULL,
-                    pontos INTEGER NOT NULL,
-                    data_ocorrencia TEXT NOT NULL,
-                    status TEXT DEFAULT 'pendente',
-                    FOREIGN KEY (jogador_id) REFERENCES players(rg_game),
-                    FOREIGN KEY (veiculo_id) REFERENCES veiculos(id)
-                )
-            ''')
+            cursor.execute(DEFINICAO_MULTAS.format(tabela='multas'))
             
             # Tabela de pagamentos
             cursor.execute('''
@@ -85,33 +424,60 @@ class DetranDatabase:
             ''')
 
             # Tabela de tickets de suporte
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS tickets (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    autor_id TEXT NOT NULL,
-                    descricao TEXT NOT NULL,
-                    status TEXT DEFAULT 'aberto',
-                    data_criacao TEXT NOT NULL
-                )
-            ''')
+            cursor.execute(DEFINICAO_TICKETS.format(tabela='tickets'))
 
             # Tabela de sugestões
+            cursor.execute(DEFINICAO_SUGESTOES.format(tabela='sugestoes'))
+
+            # Controle de versão do esquema
             cursor.execute('''
-                CREATE TABLE IF NOT EXISTS sugestoes (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    autor_id TEXT NOT NULL,
-                    sugestao TEXT NOT NULL,
-                    data_criacao TEXT NOT NULL
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    versao INTEGER PRIMARY KEY,
+                    descricao TEXT NOT NULL,
+                    data_aplicacao TEXT NOT NULL
                 )
             ''')
             
             conn.commit()
 
+        self.aplicar_migracoes()
+
+    def versao_esquema(self) -> int:
+        """Retorna a versão atual do esquema do banco"""
+        cursor = self._conexao().execute('SELECT COALESCE(MAX(versao), 0) FROM schema_version')
+        return cursor.fetchone()[0]
+
+    def aplicar_migracoes(self) -> List[int]:
+        """Aplica as migrações pendentes e retorna as versões aplicadas"""
+        conn = self._conexao()
+        aplicadas = []
+        for versao, descricao, instrucoes in MIGRACOES:
+            if versao <= self.versao_esquema():
+                continue
+            # BEGIN IMMEDIATE impede que outro processo aplique a mesma migração em paralelo
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                if versao <= self.versao_esquema():
+                    conn.rollback()
+                    continue
+                for instrucao in instrucoes:
+                    conn.execute(instrucao)
+                conn.execute('''
+                    INSERT INTO schema_version (versao, descricao, data_aplicacao)
+                    VALUES (?, ?, ?)
+                ''', (versao, descricao, datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            aplicadas.append(versao)
+        return aplicadas
+
     # Métodos para Players
     def registrar_player(self, rg_game: str, nome_rp: str, telefone: str = None) -> bool:
         """Registra um novo jogador"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._conexao() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     INSERT INTO players (rg_game, nome_rp, telefone)
@@ -122,48 +488,46 @@ class DetranDatabase:
         except sqlite3.IntegrityError:
             return False
     
-    def get_player(self, rg_game: str) -> Optional[Dict[str, Any]]:
+    def get_player(self, rg_game: str) -> Optional[Player]:
         """Busca um jogador pelo RG"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        player = self._cache_players.obter(rg_game)
+        if player is not None:
+            return player
+        geracao = self._cache_players.geracao
+        with self._conexao() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM players WHERE rg_game = ?', (rg_game,))
-            row = cursor.fetchone()
-            return dict(row) if row else None
+            cursor.row_factory = Player.da_linha
+            cursor.execute(f'SELECT {Player.colunas} FROM players WHERE rg_game = ?', (rg_game,))
+            player = cursor.fetchone()
+            if player:
+                self._cache_players.guardar(rg_game, player, geracao)
+            return player
     
+    def _somar_pontos_cnh(self, cursor: sqlite3.Cursor, rg_game: str, pontos: int) -> Optional[sqlite3.Row]:
+        """Soma pontos à CNH e aplica suspensão/revogação, retornando pontos e status finais"""
+        cursor.execute('''
+            UPDATE players 
+            SET pontos_cnh = pontos_cnh + :pontos,
+                cnh_status = CASE
+                    WHEN pontos_cnh + :pontos >= 30 THEN 'revogada'  -- Limite para revogação
+                    WHEN pontos_cnh + :pontos >= 20 THEN 'suspensa'  -- Limite para suspensão
+                    ELSE cnh_status
+                END
+            WHERE rg_game = :rg_game
+            RETURNING pontos_cnh, cnh_status
+        ''', {"pontos": pontos, "rg_game": rg_game})
+        return cursor.fetchone()
+
     def atualizar_pontos_cnh(self, rg_game: str, pontos: int) -> bool:
         """Atualiza os pontos da CNH de um jogador"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                UPDATE players 
-                SET pontos_cnh = pontos_cnh + ?
-                WHERE rg_game = ?
-            ''', (pontos, rg_game))
-            
-            # Verificar se excedeu o limite de pontos
-            cursor.execute('SELECT pontos_cnh FROM players WHERE rg_game = ?', (rg_game,))
-            pontos_atuais = cursor.fetchone()[0]
-            
-            if pontos_atuais >= 30:  # Limite para revogação
-                cursor.execute('''
-                    UPDATE players 
-                    SET cnh_status = 'revogada'
-                    WHERE rg_game = ?
-                ''', (rg_game,))
-            elif pontos_atuais >= 20:  # Limite para suspensão
-                cursor.execute('''
-                    UPDATE players 
-                    SET cnh_status = 'suspensa'
-                    WHERE rg_game = ?
-                ''', (rg_game,))
-            
-            conn.commit()
-            return True
+        with self._transacao() as cursor:
+            atualizado = self._somar_pontos_cnh(cursor, rg_game, pontos) is not None
+        self._cache_players.invalidar(rg_game)
+        return atualizado
     
     def atualizar_status_cnh(self, rg_game: str, status: str) -> bool:
         """Atualiza o status da CNH de um jogador"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conexao() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 UPDATE players 
@@ -171,16 +535,17 @@ class DetranDatabase:
                 WHERE rg_game = ?
             ''', (status, rg_game))
             conn.commit()
+            self._cache_players.invalidar(rg_game)
             return cursor.rowcount > 0
     
     # Métodos para CNH
     def emitir_cnh(self, rg_game: str, categoria: str) -> str:
         """Emite uma nova CNH para um jogador"""
-        numero_registro = f"CNH{rg_game}{categoria}{datetime.now().strftime('%Y%m%d')}"
-        data_emissao = datetime.now().strftime('%Y-%m-%d')
-        data_validade = (datetime.now() + timedelta(days=15)).strftime('%Y-%m-%d')  # 15 dias
+        data_emissao = int(time.time())
+        data_validade = data_emissao + 15 * SEGUNDOS_DIA  # 15 dias
+        numero_registro = f"CNH{rg_game}{categoria}{datetime.fromtimestamp(data_emissao).strftime('%Y%m%d')}"
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conexao() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO cnhs (jogador_id, numero_registro, data_emissao, data_validade, categoria)
@@ -195,21 +560,22 @@ class DetranDatabase:
             ''', (rg_game,))
             
             conn.commit()
+            self._cache_players.invalidar(rg_game)
             return numero_registro
     
-    def get_cnhs_jogador(self, rg_game: str) -> List[Dict[str, Any]]:
+    def get_cnhs_jogador(self, rg_game: str) -> List[CNH]:
         """Busca todas as CNHs de um jogador"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._conexao() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM cnhs WHERE jogador_id = ?', (rg_game,))
-            return [dict(row) for row in cursor.fetchall()]
+            cursor.row_factory = CNH.da_linha
+            cursor.execute(f'SELECT {CNH.colunas} FROM cnhs WHERE jogador_id = ?', (rg_game,))
+            return cursor.fetchall()
     
     # Métodos para Veículos
     def registrar_veiculo(self, rg_game: str, placa: str, modelo: str, cor: str, ano: int, chassi: str) -> bool:
         """Registra um novo veículo"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._conexao() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     INSERT INTO veiculos (proprietario_id, placa, modelo, cor, ano, chassi)
@@ -220,18 +586,24 @@ class DetranDatabase:
         except sqlite3.IntegrityError:
             return False
     
-    def get_veiculo(self, placa: str) -> Optional[Dict[str, Any]]:
+    def get_veiculo(self, placa: str) -> Optional[Veiculo]:
         """Busca um veículo pela placa"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        veiculo = self._cache_veiculos.obter(placa)
+        if veiculo is not None:
+            return veiculo
+        geracao = self._cache_veiculos.geracao
+        with self._conexao() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM veiculos WHERE placa = ?', (placa,))
-            row = cursor.fetchone()
-            return dict(row) if row else None
+            cursor.row_factory = Veiculo.da_linha
+            cursor.execute(f'SELECT {Veiculo.colunas} FROM veiculos WHERE placa = ?', (placa,))
+            veiculo = cursor.fetchone()
+            if veiculo:
+                self._cache_veiculos.guardar(placa, veiculo, geracao)
+            return veiculo
     
     def transferir_veiculo(self, placa: str, novo_proprietario: str) -> bool:
         """Transfere a propriedade de um veículo"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conexao() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 UPDATE veiculos 
@@ -239,11 +611,12 @@ class DetranDatabase:
                 WHERE placa = ?
             ''', (novo_proprietario, placa))
             conn.commit()
+            self._cache_veiculos.invalidar(placa)
             return cursor.rowcount > 0
     
     def atualizar_status_veiculo(self, placa: str, status: str) -> bool:
         """Atualiza o status do CRLV de um veículo"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conexao() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 UPDATE veiculos 
@@ -251,87 +624,229 @@ class DetranDatabase:
                 WHERE placa = ?
             ''', (status, placa))
             conn.commit()
+            self._cache_veiculos.invalidar(placa)
             return cursor.rowcount > 0
     
     # Métodos para Multas
     def aplicar_multa(self, rg_game: str, tipo_infracao: str, valor: float, pontos: int, 
-                     agente_id: str, placa_veiculo: str = None) -> int:
-        """Aplica uma multa a um jogador"""
-        data_ocorrencia = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        veiculo_id = None
-        
-        if placa_veiculo:
-            veiculo = self.get_veiculo(placa_veiculo)
-            if veiculo:
-                veiculo_id = veiculo['id']
+                     agente_id: str, placa_veiculo: str = None) -> ResultadoMulta:
+        """Aplica uma multa a um jogador e atualiza sua CNH em uma única transação"""
+        data_ocorrencia = int(time.time())
+        data_limite = data_ocorrencia - 365 * SEGUNDOS_DIA
         
-        # Verificar reincidência (mesma infração nos últimos 12 meses)
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            data_limite = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
+        with self._transacao() as cursor:
+            veiculo_id = None
+            if placa_veiculo:
+                cursor.execute('SELECT id FROM veiculos WHERE placa = ?', (placa_veiculo,))
+                veiculo = cursor.fetchone()
+                if veiculo:
+                    veiculo_id = veiculo['id']
+
+            # Verificar reincidência (mesma infração nos últimos 12 meses)
             cursor.execute('''
-                SELECT COUNT(*) FROM multas 
-                WHERE jogador_id = ? AND tipo_infracao = ? AND data_ocorrencia >= ?
+                SELECT EXISTS (
+                    SELECT 1 FROM multas 
+                    WHERE jogador_id = ? AND tipo_infracao = ? AND data_ocorrencia >= ?
+                )
             ''', (rg_game, tipo_infracao, data_limite))
             
-            reincidencia = cursor.fetchone()[0] > 0
+            reincidencia = bool(cursor.fetchone()[0])
             valor_final = valor * 2 if reincidencia else valor
             
             cursor.execute('''
                 INSERT INTO multas (jogador_id, veiculo_id, agente_id, tipo_infracao, valor, pontos, data_ocorrencia)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
             ''', (rg_game, veiculo_id, agente_id, tipo_infracao, valor_final, pontos, data_ocorrencia))
-            
             multa_id = cursor.lastrowid
-            conn.commit()
+            self._registrar_resumos_multa(cursor, agente_id, tipo_infracao, valor_final,
+                                         datetime.fromtimestamp(data_ocorrencia).strftime('%Y-%m-%d'))
             
             # Atualizar pontos da CNH
-            self.atualizar_pontos_cnh(rg_game, pontos)
+            cnh = self._somar_pontos_cnh(cursor, rg_game, pontos)
+        self._cache_players.invalidar(rg_game)
             
-            return multa_id
+        return ResultadoMulta(
+            multa_id=multa_id,
+            valor=valor_final,
+            reincidencia=reincidencia,
+            pontos_cnh=cnh['pontos_cnh'] if cnh else None,
+            cnh_status=cnh['cnh_status'] if cnh else None,
+        )
     
-    def get_multas_jogador(self, rg_game: str, status: str = None) -> List[Dict[str, Any]]:
-        """Busca multas de um jogador"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+    def listar_multas_jogador_pagina(self, rg_game: str, status: str = None, apos_id: int = None,
+                                     antes_id: int = None, limite: int = 10) -> Pagina:
+        """Busca uma página das multas de um jogador, ordenadas por ID"""
+        filtros, parametros = ['jogador_id = ?'], [rg_game]
+        if status:
+            filtros.append('status = ?')
+            parametros.append(status)
+        return self._pagina_por_id(Multa, 'multas', filtros, parametros, apos_id, antes_id, limite)
+
+    def get_totais_multas_jogador(self, rg_game: str, status: str = None) -> Dict[str, Any]:
+        """Conta as multas de um jogador e soma o valor pendente"""
+        with self._conexao() as conn:
             cursor = conn.cursor()
             if status:
-                cursor.execute('SELECT * FROM multas WHERE jogador_id = ? AND status = ?', (rg_game, status))
+                cursor.execute('''
+                    SELECT COUNT(*) as total, SUM(CASE WHEN status = 'pendente' THEN valor ELSE 0 END) as total_pendente
+                    FROM multas WHERE jogador_id = ? AND status = ?
+                ''', (rg_game, status))
             else:
-                cursor.execute('SELECT * FROM multas WHERE jogador_id = ?', (rg_game,))
-            return [dict(row) for row in cursor.fetchall()]
-    
-    def pagar_multa(self, multa_id: int) -> bool:
-        """Registra o pagamento de uma multa"""
-        with sqlite3.connect(self.db_path) as conn:
+                cursor.execute('''
+                    SELECT COUNT(*) as total, SUM(CASE WHEN status = 'pendente' THEN valor ELSE 0 END) as total_pendente
+                    FROM multas WHERE jogador_id = ?
+                ''', (rg_game,))
+            resultado = cursor.fetchone()
+            return {"total": resultado['total'], "total_pendente": resultado['total_pendente'] or 0}
+
+    def get_multa(self, multa_id: int) -> Optional[Multa]:
+        """Busca uma multa pelo ID"""
+        with self._conexao() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = Multa.da_linha
+            cursor.execute(f'SELECT {Multa.colunas} FROM multas WHERE id = ?', (multa_id,))
+            return cursor.fetchone()
+    
+    def _registrar_resumos_multa(self, cursor: sqlite3.Cursor, agente_id: str, tipo_infracao: str,
+                                 valor: float, dia: str):
+        """Contabiliza uma nova multa (pendente) nas tabelas de resumo"""
+        cursor.execute('''
+            INSERT INTO resumo_multas_agente (agente_id, total, valor_total, pendentes)
+            VALUES (?, 1, ?, 1)
+            ON CONFLICT (agente_id) DO UPDATE SET
+                total = total + 1,
+                valor_total = valor_total + excluded.valor_total,
+                pendentes = pendentes + 1
+        ''', (agente_id, valor))
+        cursor.execute('''
+            INSERT INTO resumo_multas_agente_infracao (agente_id, tipo_infracao, quantidade)
+            VALUES (?, ?, 1)
+            ON CONFLICT (agente_id, tipo_infracao) DO UPDATE SET quantidade = quantidade + 1
+        ''', (agente_id, tipo_infracao))
+        cursor.execute('''
+            INSERT INTO resumo_multas_dia (dia, tipo_infracao, quantidade, valor_total)
+            VALUES (?, ?, 1, ?)
+            ON CONFLICT (dia, tipo_infracao) DO UPDATE SET
+                quantidade = quantidade + 1,
+                valor_total = valor_total + excluded.valor_total
+        ''', (dia, tipo_infracao, valor))
+
+    def _alterar_status_multa(self, multa_id: int, status: str) -> bool:
+        """Altera o status de uma multa e move a contagem no resumo do agente"""
+        with self._transacao() as cursor:
+            cursor.execute('SELECT agente_id, status FROM multas WHERE id = ?', (multa_id,))
+            multa = cursor.fetchone()
+            if not multa:
+                return False
             cursor.execute('''
                 UPDATE multas 
-                SET status = 'paga'
+                SET status = ?
                 WHERE id = ?
-            ''', (multa_id,))
-            conn.commit()
-            return cursor.rowcount > 0
+            ''', (status, multa_id))
+            anterior = COLUNAS_STATUS_MULTA.get(multa['status'])
+            novo = COLUNAS_STATUS_MULTA.get(status)
+            if anterior != novo:
+                ajustes = [f"{coluna} = {coluna} {sinal} 1"
+                           for coluna, sinal in ((anterior, '-'), (novo, '+')) if coluna]
+                cursor.execute(
+                    f'UPDATE resumo_multas_agente SET {", ".join(ajustes)} WHERE agente_id = ?',
+                    (multa['agente_id'],),
+                )
+            return True
+
+    def pagar_multa(self, multa_id: int) -> bool:
+        """Registra o pagamento de uma multa"""
+        return self._alterar_status_multa(multa_id, 'paga')
     
     def recorrer_multa(self, multa_id: int) -> bool:
         """Marca uma multa como em recurso"""
-        with sqlite3.connect(self.db_path) as conn:
+        return self._alterar_status_multa(multa_id, 'recorrida')
+
+    # Métodos para Relatórios
+    def get_relatorio_multas_agente(self, agente_id: str, limite_infracoes: int = 5) -> Dict[str, Any]:
+        """Resume as multas aplicadas por um agente a partir das tabelas de resumo"""
+        with self._conexao() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                UPDATE multas 
-                SET status = 'recorrida'
-                WHERE id = ?
-            ''', (multa_id,))
-            conn.commit()
-            return cursor.rowcount > 0
-    
+                SELECT total, valor_total, pendentes, pagas, recorridas
+                FROM resumo_multas_agente
+                WHERE agente_id = ?
+            ''', (agente_id,))
+            resultado = cursor.fetchone()
+
+            cursor.execute('''
+                SELECT tipo_infracao, quantidade
+                FROM resumo_multas_agente_infracao
+                WHERE agente_id = ?
+                ORDER BY quantidade DESC
+                LIMIT ?
+            ''', (agente_id, limite_infracoes))
+
+            relatorio = dict(resultado) if resultado else {
+                "total": 0, "valor_total": 0, "pendentes": 0, "pagas": 0, "recorridas": 0,
+            }
+            relatorio["infracoes_por_tipo"] = [dict(row) for row in cursor.fetchall()]
+            return relatorio
+
+    def get_relatorio_multas_dia(self, dia: str) -> Dict[str, Any]:
+        """Resume as multas aplicadas em um dia (formato AAAA-MM-DD)"""
+        with self._conexao() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT tipo_infracao, quantidade, valor_total
+                FROM resumo_multas_dia
+                WHERE dia = ?
+                ORDER BY quantidade DESC
+            ''', (dia,))
+            infracoes = [dict(row) for row in cursor.fetchall()]
+            return {
+                "total": sum(i["quantidade"] for i in infracoes),
+                "valor_total": sum(i["valor_total"] for i in infracoes),
+                "infracoes_por_tipo": infracoes,
+            }
+
+    def reconstruir_resumos(self):
+        """Recalcula as tabelas de resumo de multas a partir do histórico completo"""
+        with self._transacao() as cursor:
+            for instrucao in SQL_RECONSTRUIR_RESUMOS:
+                cursor.execute(instrucao)
+
+    def listar_cnhs_restritas_pagina(self, apos: Tuple[int, str] = None, antes: Tuple[int, str] = None,
+                                     limite: int = 15) -> Pagina:
+        """Busca uma página das CNHs restritas, ordenadas por pontos (desc.) e RG.
+
+        Os cursores ``apos``/``antes`` são pares (pontos_cnh, rg_game) do último/primeiro item exibido.
+        """
+        filtros = ["cnh_status IN ('suspensa', 'revogada', 'cassada')"]
+        parametros: List[Any] = []
+        ordem = 'pontos_cnh DESC, rg_game'
+        # O limite isolado em pontos_cnh permite começar a leitura do índice parcial no cursor
+        if antes is not None:
+            filtros.append('pontos_cnh >= ? AND (pontos_cnh > ? OR rg_game < ?)')
+            parametros += [antes[0], antes[0], antes[1]]
+            ordem = 'pontos_cnh, rg_game DESC'
+        elif apos is not None:
+            filtros.append('pontos_cnh <= ? AND (pontos_cnh < ? OR rg_game > ?)')
+            parametros += [apos[0], apos[0], apos[1]]
+        with self._conexao() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = Player.da_linha
+            cursor.execute(f'''
+                SELECT {Player.colunas}
+                FROM players
+                WHERE {' AND '.join(filtros)}
+                ORDER BY {ordem}
+                LIMIT ?
+            ''', (*parametros, limite + 1))
+            return self._montar_pagina(cursor.fetchall(), limite, antes is not None,
+                                       apos is not None or antes is not None)
 
     # Métodos para Tickets de Suporte
     def criar_ticket(self, autor_id: str, descricao: str) -> int:
         """Cria um novo ticket de suporte"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conexao() as conn:
             cursor = conn.cursor()
-            data_criacao = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            data_criacao = int(time.time())
             cursor.execute('''
                 INSERT INTO tickets (autor_id, descricao, data_criacao)
                 VALUES (?, ?, ?)
@@ -339,20 +854,15 @@ class DetranDatabase:
             conn.commit()
             return cursor.lastrowid
 
-    def listar_tickets(self, status: str = None) -> List[Dict[str, Any]]:
-        """Lista tickets de suporte, opcionalmente filtrados por status"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            if status:
-                cursor.execute('SELECT * FROM tickets WHERE status = ?', (status,))
-            else:
-                cursor.execute('SELECT * FROM tickets')
-            return [dict(row) for row in cursor.fetchall()]
+    def listar_tickets_pagina(self, status: str = None, apos_id: int = None, antes_id: int = None,
+                              limite: int = 10) -> Pagina:
+        """Busca uma página de tickets de suporte, ordenados por ID"""
+        filtros, parametros = ([], []) if not status else (['status = ?'], [status])
+        return self._pagina_por_id(Ticket, 'tickets', filtros, parametros, apos_id, antes_id, limite)
 
     def fechar_ticket(self, ticket_id: int) -> bool:
         """Fecha um ticket de suporte"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conexao() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 UPDATE tickets
@@ -365,9 +875,9 @@ class DetranDatabase:
     # Métodos para Sugestões
     def criar_sugestao(self, autor_id: str, sugestao: str) -> int:
         """Registra uma nova sugestão"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conexao() as conn:
             cursor = conn.cursor()
-            data_criacao = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            data_criacao = int(time.time())
             cursor.execute('''
                 INSERT INTO sugestoes (autor_id, sugestao, data_criacao)
                 VALUES (?, ?, ?)
@@ -375,3 +885,196 @@ class DetranDatabase:
             conn.commit()
             return cursor.lastrowid
 
+    # Métodos para Painéis
+    def get_painel(self, nome: str) -> Optional[Painel]:
+        """Busca a mensagem publicada de um painel"""
+        with self._conexao() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = Painel.da_linha
+            cursor.execute(f'SELECT {Painel.colunas} FROM paineis WHERE nome = ?', (nome,))
+            return cursor.fetchone()
+
+    def salvar_painel(self, nome: str, canal_id: int, mensagem_id: int, hash_conteudo: str):
+        """Registra a mensagem e o hash do conteúdo publicado de um painel"""
+        with self._conexao() as conn:
+            conn.execute('''
+                INSERT INTO paineis (nome, canal_id, mensagem_id, hash)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (nome) DO UPDATE SET
+                    canal_id = excluded.canal_id,
+                    mensagem_id = excluded.mensagem_id,
+                    hash = excluded.hash
+            ''', (nome, canal_id, mensagem_id, hash_conteudo))
+            conn.commit()
+
+    # Métodos para Configurações
+    def get_configuracao(self, chave: str) -> Optional[str]:
+        """Retorna o valor de uma configuração persistida"""
+        with self._conexao() as conn:
+            linha = conn.execute('SELECT valor FROM configuracoes WHERE chave = ?', (chave,)).fetchone()
+            return linha['valor'] if linha else None
+
+    def salvar_configuracao(self, chave: str, valor: str):
+        """Grava o valor de uma configuração"""
+        with self._conexao() as conn:
+            conn.execute('''
+                INSERT INTO configuracoes (chave, valor) VALUES (?, ?)
+                ON CONFLICT (chave) DO UPDATE SET valor = excluded.valor
+            ''', (chave, valor))
+            conn.commit()
+
+    # Métodos para Vínculos do Discord
+    def vincular_discord(self, discord_id: int, rg_game: str, nome: str):
+        """Grava (ou substitui) o RG e o nome informados por um membro no registro"""
+        with self._conexao() as conn:
+            conn.execute('''
+                INSERT INTO vinculos_discord (discord_id, rg_game, nome, data_registro)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (discord_id) DO UPDATE SET
+                    rg_game = excluded.rg_game,
+                    nome = excluded.nome,
+                    data_registro = excluded.data_registro
+            ''', (discord_id, rg_game, nome, int(time.time())))
+            conn.commit()
+
+    def get_vinculo_discord(self, discord_id: int) -> Optional[VinculoDiscord]:
+        """Busca o RG e o nome registrados por um membro do Discord"""
+        with self._conexao() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = VinculoDiscord.da_linha
+            cursor.execute(f'SELECT {VinculoDiscord.colunas} FROM vinculos_discord WHERE discord_id = ?',
+                           (discord_id,))
+            return cursor.fetchone()
+
+    # Métodos para Importação em Lote
+    def _importar(self, registros: Iterable[Dict[str, Any]], tamanho_lote: int,
+                  preparar: Callable[[Dict[str, Any]], tuple],
+                  gravar_lote: Callable[[sqlite3.Cursor, List[Tuple[int, tuple]]], List[Tuple[int, str]]]
+                  ) -> ResultadoImportacao:
+        """Percorre os registros em lotes, gravando cada lote em uma transação.
+
+        Um erro de leitura (ValueError vindo de ``registros``) interrompe a
+        importação: o lote em andamento é gravado e o erro vai no resultado.
+        """
+        inseridos = 0
+        conflitos: List[Tuple[int, str]] = []
+        lote: List[Tuple[int, tuple]] = []
+        erro_leitura = None
+
+        def gravar():
+            nonlocal inseridos
+            with self._transacao() as cursor:
+                conflitos_lote = gravar_lote(cursor, lote)
+            inseridos += len(lote) - len(conflitos_lote)
+            conflitos.extend(conflitos_lote)
+            lote.clear()
+
+        registros = iter(registros)
+        numero = 0
+        while True:
+            numero += 1
+            try:
+                registro = next(registros)
+            except StopIteration:
+                break
+            except ValueError as e:
+                erro_leitura = (numero, str(e))
+                break
+            try:
+                lote.append((numero, preparar(registro)))
+            except ValueError as e:
+                conflitos.append((numero, str(e)))
+                continue
+            if len(lote) >= tamanho_lote:
+                gravar()
+        if lote:
+            gravar()
+        return ResultadoImportacao(inseridos, sorted(conflitos), erro_leitura)
+
+    @staticmethod
+    def _separar_conflitos(lote: List[Tuple[int, tuple]], chaves: List[Tuple[int, str, set]]
+                           ) -> Tuple[List[tuple], List[Tuple[int, str]]]:
+        """Separa os registros que colidem com chaves já existentes ou repetidas no próprio lote.
+
+        ``chaves`` lista (posição do campo na tupla, nome do campo, valores já existentes).
+        """
+        validos, conflitos = [], []
+        for numero, valores in lote:
+            motivo = None
+            for posicao, campo, existentes in chaves:
+                valor = valores[posicao]
+                if valor is not None and valor in existentes:
+                    motivo = f"{campo} {valor} já registrado"
+                    break
+            if motivo:
+                conflitos.append((numero, motivo))
+                continue
+            for posicao, _, existentes in chaves:
+                if valores[posicao] is not None:
+                    existentes.add(valores[posicao])
+            validos.append(valores)
+        return validos, conflitos
+
+    @staticmethod
+    def _existentes(cursor: sqlite3.Cursor, tabela: str, coluna: str, valores: List[Any]) -> set:
+        """Retorna quais dos valores já existem na coluna informada"""
+        valores = [v for v in set(valores) if v is not None]
+        if not valores:
+            return set()
+        cursor.execute(
+            f'SELECT {coluna} FROM {tabela} WHERE {coluna} IN ({", ".join("?" * len(valores))})',
+            valores,
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+    def importar_players(self, registros: Iterable[Dict[str, Any]],
+                         tamanho_lote: int = TAMANHO_LOTE_IMPORTACAO) -> ResultadoImportacao:
+        """Importa jogadores em lote (campos rg_game, nome_rp e telefone)"""
+        def preparar(registro):
+            rg_game, nome_rp = _texto(registro, 'rg_game'), _texto(registro, 'nome_rp')
+            if not rg_game or not nome_rp:
+                raise ValueError("rg_game e nome_rp são obrigatórios")
+            return (rg_game, nome_rp, _texto(registro, 'telefone'))
+
+        def gravar_lote(cursor, lote):
+            rgs = self._existentes(cursor, 'players', 'rg_game', [v[0] for _, v in lote])
+            validos, conflitos = self._separar_conflitos(lote, [(0, 'RG', rgs)])
+            cursor.executemany('''
+                INSERT INTO players (rg_game, nome_rp, telefone)
+                VALUES (?, ?, ?)
+            ''', validos)
+            return conflitos
+
+        return self._importar(registros, tamanho_lote, preparar, gravar_lote)
+
+    def importar_veiculos(self, registros: Iterable[Dict[str, Any]],
+                          tamanho_lote: int = TAMANHO_LOTE_IMPORTACAO) -> ResultadoImportacao:
+        """Importa veículos em lote (campos rg_game, placa, modelo, cor, ano e chassi)"""
+        def preparar(registro):
+            rg_game = _texto(registro, 'rg_game') or _texto(registro, 'proprietario_id')
+            placa = _texto(registro, 'placa')
+            if not rg_game or not placa:
+                raise ValueError("rg_game e placa são obrigatórios")
+            ano = _texto(registro, 'ano')
+            try:
+                ano = int(ano) if ano else None
+            except ValueError:
+                raise ValueError(f"ano inválido: {ano}")
+            return (rg_game, placa.upper(), _texto(registro, 'modelo'), _texto(registro, 'cor'),
+                    ano, _texto(registro, 'chassi'))
+
+        def gravar_lote(cursor, lote):
+            proprietarios = self._existentes(cursor, 'players', 'rg_game', [v[0] for _, v in lote])
+            sem_proprietario = [(numero, f"proprietário {v[0]} não encontrado")
+                                for numero, v in lote if v[0] not in proprietarios]
+            lote = [(numero, v) for numero, v in lote if v[0] in proprietarios]
+            placas = self._existentes(cursor, 'veiculos', 'placa', [v[1] for _, v in lote])
+            chassis = self._existentes(cursor, 'veiculos', 'chassi', [v[5] for _, v in lote])
+            validos, conflitos = self._separar_conflitos(lote, [(1, 'Placa', placas), (5, 'Chassi', chassis)])
+            cursor.executemany('''
+                INSERT INTO veiculos (proprietario_id, placa, modelo, cor, ano, chassi)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', validos)
+            return sorted(sem_proprietario + conflitos)
+
+        return self._importar(registros, tamanho_lote, preparar, gravar_lote)
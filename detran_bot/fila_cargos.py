@@ -0,0 +1,208 @@
+"""Fila de atribuição de cargos com trabalhadores limitados, novas tentativas e reconciliação."""
+
+import asyncio
+import random
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+import discord
+
+from config import (
+    ROLE_INICIAL,
+    ROLE_REGISTRADO,
+    CARGOS_TRABALHADORES,
+    CARGOS_TENTATIVAS,
+    CARGOS_ESPERA_BASE,
+    CARGOS_LOTE_RECONCILIACAO,
+    CARGOS_PAUSA_LOTES,
+)
+
+
+class _Pendencia:
+    """Alterações de cargos ainda não aplicadas a um membro"""
+
+    __slots__ = ("guild", "membro_id", "adicionar", "remover", "motivo", "versao")
+
+    def __init__(self, guild: discord.Guild, membro_id: int, motivo: Optional[str]):
+        self.guild = guild
+        self.membro_id = membro_id
+        self.adicionar: Set[int] = set()
+        self.remover: Set[int] = set()
+        self.motivo = motivo
+        self.versao = 0
+
+    def mesclar(self, adicionar: Iterable[int], remover: Iterable[int]):
+        """Junta novas alterações às pendentes; a mais recente prevalece em conflitos"""
+        adicionar, remover = set(adicionar), set(remover)
+        self.adicionar = (self.adicionar - remover) | adicionar
+        self.remover = (self.remover - adicionar) | remover
+        self.versao += 1
+
+
+def _espera_retry_after(erro: discord.HTTPException) -> float:
+    """Segundos pedidos pelo Discord (corpo ou cabeçalho Retry-After) numa resposta 429"""
+    if isinstance(erro, discord.RateLimited):
+        return erro.retry_after
+    try:
+        return float(erro.response.headers.get("Retry-After", 0))
+    except (AttributeError, TypeError, ValueError):
+        return 0.0
+
+
+class FilaCargos:
+    """Aplica alterações de cargos em segundo plano, sem estourar os limites de taxa.
+
+    Cada membro tem no máximo uma pendência na fila: pedidos repetidos são
+    mesclados à pendência existente, inclusive enquanto ela está sendo
+    aplicada (um único trabalhador edita cada membro por vez). Cada
+    tentativa é uma única edição dos cargos. Um número fixo de trabalhadores
+    (iniciados no primeiro pedido) aplica as pendências; falhas temporárias
+    (429 e erros 5xx) são repetidas com espera exponencial, nunca menor que o
+    Retry-After informado pelo Discord.
+    """
+
+    def __init__(self, trabalhadores: int = CARGOS_TRABALHADORES, tentativas: int = CARGOS_TENTATIVAS,
+                 espera_base: float = CARGOS_ESPERA_BASE):
+        self.tentativas = tentativas
+        self.espera_base = espera_base
+        self.agendadas = 0
+        self.mescladas = 0
+        self.aplicadas = 0
+        self.sem_alteracao = 0
+        self.novas_tentativas = 0
+        self.falhas = 0
+        self._quantidade_trabalhadores = trabalhadores
+        self._pendencias: Dict[Tuple[int, int], _Pendencia] = {}
+        self._fila: Optional[asyncio.Queue] = None
+        self._trabalhadores: list = []
+
+    def agendar(self, membro: discord.Member, adicionar: Iterable[int] = (), remover: Iterable[int] = (),
+                motivo: Optional[str] = None):
+        """Agenda a adição/remoção de cargos (por ID) de um membro sem aguardar a chamada à API"""
+        if self._fila is None:
+            self._fila = asyncio.Queue()
+        self._iniciar_trabalhadores()
+        chave = (membro.guild.id, membro.id)
+        pendencia = self._pendencias.get(chave)
+        if pendencia is not None:
+            pendencia.mesclar(adicionar, remover)
+            self.mescladas += 1
+            return
+        pendencia = self._pendencias[chave] = _Pendencia(membro.guild, membro.id, motivo)
+        pendencia.mesclar(adicionar, remover)
+        self.agendadas += 1
+        self._fila.put_nowait(chave)
+
+    def _iniciar_trabalhadores(self):
+        self._trabalhadores = [tarefa for tarefa in self._trabalhadores if not tarefa.done()]
+        loop = asyncio.get_running_loop()
+        while len(self._trabalhadores) < self._quantidade_trabalhadores:
+            self._trabalhadores.append(loop.create_task(self._trabalhar()))
+
+    async def _trabalhar(self):
+        while True:
+            chave = await self._fila.get()
+            pendencia = self._pendencias.get(chave)
+            # Versão das alterações já enviadas; novos pedidos continuam sendo mesclados na pendência
+            aplicada = pendencia.versao if pendencia is not None else 0
+            try:
+                if pendencia is not None:
+                    aplicada = await self._aplicar(pendencia)
+            except Exception as e:
+                self.falhas += 1
+                print(f"Erro ao atualizar cargos do membro {chave[1]}: {e}")
+            finally:
+                if pendencia is not None and pendencia.versao != aplicada:
+                    self._fila.put_nowait(chave)  # Pedidos chegaram depois da última edição
+                else:
+                    self._pendencias.pop(chave, None)
+                self._fila.task_done()
+
+    async def _aplicar(self, pendencia: _Pendencia) -> int:
+        """Aplica a pendência; retorna a versão das alterações tratadas"""
+        for tentativa in range(self.tentativas):
+            versao = pendencia.versao
+            # Relê o membro a cada tentativa: os cargos podem ter mudado enquanto aguardava
+            membro = pendencia.guild.get_member(pendencia.membro_id)
+            if membro is None:
+                self.sem_alteracao += 1
+                return versao
+            atuais = {cargo.id for cargo in membro.roles}
+            adicionar = [c for c in map(pendencia.guild.get_role, pendencia.adicionar - atuais) if c]
+            remover = {c.id for c in map(pendencia.guild.get_role, pendencia.remover & atuais) if c}
+            if not adicionar and not remover:
+                self.sem_alteracao += 1
+                return versao
+            cargos = [c for c in membro.roles if not c.is_default() and c.id not in remover] + adicionar
+            try:
+                await membro.edit(roles=cargos, reason=pendencia.motivo)
+                self.aplicadas += 1
+                return versao
+            except (discord.Forbidden, discord.NotFound) as e:
+                self.falhas += 1
+                print(f"Não foi possível atualizar os cargos de {membro} ({membro.id}): {e}")
+                return versao
+            except (discord.RateLimited, discord.HTTPException) as e:
+                if isinstance(e, discord.HTTPException) and e.status != 429 and e.status < 500:
+                    self.falhas += 1
+                    print(f"Erro ao atualizar cargos de {membro} ({membro.id}): {e}")
+                    return versao
+                espera = max(_espera_retry_after(e), self.espera_base * 2 ** tentativa)
+                self.novas_tentativas += 1
+                await asyncio.sleep(espera * random.uniform(1.0, 1.2))
+        self.falhas += 1
+        print(f"Cargos do membro {pendencia.membro_id} não atualizados após {self.tentativas} tentativas")
+        return pendencia.versao
+
+    async def aguardar(self):
+        """Aguarda até não haver pendências na fila"""
+        if self._fila is not None:
+            await self._fila.join()
+
+    def estatisticas(self) -> Dict[str, int]:
+        """Retorna os contadores da fila de cargos"""
+        return {
+            "pendentes": len(self._pendencias),
+            "agendadas": self.agendadas,
+            "mescladas": self.mescladas,
+            "aplicadas": self.aplicadas,
+            "sem_alteracao": self.sem_alteracao,
+            "novas_tentativas": self.novas_tentativas,
+            "falhas": self.falhas,
+        }
+
+
+fila_cargos = FilaCargos()
+
+
+async def reconciliar_cargos(guild: discord.Guild, lote: int = CARGOS_LOTE_RECONCILIACAO,
+                             pausa: float = CARGOS_PAUSA_LOTES) -> int:
+    """Corrige os membros sem ROLE_INICIAL nem ROLE_REGISTRADO (ou com os dois) em lotes.
+
+    Carrega a lista completa de membros por chunking se ela ainda não estiver
+    em cache. Cada lote é agendado na fila de cargos e só depois de aplicado
+    o próximo é agendado. Retorna quantos membros foram agendados.
+    """
+    if not guild.chunked:
+        await guild.chunk(cache=True)
+    agendados = 0
+    em_lote = 0
+    for membro in list(guild.members):
+        if membro.bot:
+            continue
+        atuais = {cargo.id for cargo in membro.roles}
+        if ROLE_REGISTRADO in atuais:
+            if ROLE_INICIAL not in atuais:
+                continue
+            fila_cargos.agendar(membro, remover=(ROLE_INICIAL,), motivo="Reconciliação: membro já registrado")
+        elif ROLE_INICIAL not in atuais:
+            fila_cargos.agendar(membro, adicionar=(ROLE_INICIAL,), motivo="Reconciliação: cargo inicial ausente")
+        else:
+            continue
+        agendados += 1
+        em_lote += 1
+        if em_lote >= lote:
+            await fila_cargos.aguardar()
+            await asyncio.sleep(pausa)
+            em_lote = 0
+    await fila_cargos.aguardar()
+    return agendados
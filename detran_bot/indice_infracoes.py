@@ -0,0 +1,106 @@
+"""Índice de busca das infrações, usado no autocomplete do /multar."""
+
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, FrozenSet, List, Tuple
+
+from config import TABELA_INFRACOES
+
+# Similaridade mínima de trigramas para aceitar uma infração com erro de digitação
+SIMILARIDADE_MINIMA = 0.34
+_VAZIO: FrozenSet[int] = frozenset()
+
+
+def normalizar(texto: str) -> str:
+    """Remove acentos e pontuação e converte para minúsculas"""
+    decomposto = unicodedata.normalize("NFKD", texto)
+    sem_acentos = "".join(c for c in decomposto if not unicodedata.combining(c))
+    return " ".join(re.findall(r"[a-z0-9]+", sem_acentos.lower()))
+
+
+def _trigramas(tokens: List[str]) -> set:
+    trigramas = set()
+    for token in tokens:
+        marcado = f" {token} "
+        trigramas.update(marcado[i:i + 3] for i in range(len(marcado) - 2))
+    return trigramas
+
+
+class IndiceInfracoes:
+    """Índice pré-calculado por prefixo de palavra e por trigramas.
+
+    Cada infração é indexada pela descrição e pelo código, sem acentos. Uma
+    consulta casa quando cada palavra digitada é prefixo de alguma palavra da
+    infração; se nenhuma casar, os trigramas toleram erros de digitação.
+    """
+
+    def __init__(self, tabela: Dict[str, Dict]):
+        self._codigos: List[str] = []
+        self._descricoes: List[str] = []
+        self._textos: List[str] = []
+        self._palavras: List[FrozenSet[str]] = []
+        prefixos: Dict[str, set] = {}
+        trigramas: Dict[str, set] = {}
+
+        for posicao, (codigo, infracao) in enumerate(tabela.items()):
+            texto = normalizar(infracao["descricao"])
+            tokens = texto.split() + normalizar(codigo.replace("_", " ")).split()
+            self._codigos.append(codigo)
+            self._descricoes.append(infracao["descricao"])
+            self._textos.append(texto)
+            self._palavras.append(frozenset(tokens))
+            for token in tokens:
+                for fim in range(1, len(token) + 1):
+                    prefixos.setdefault(token[:fim], set()).add(posicao)
+            for trigrama in _trigramas(tokens):
+                trigramas.setdefault(trigrama, set()).add(posicao)
+
+        self._prefixos = {chave: frozenset(valor) for chave, valor in prefixos.items()}
+        self._trigramas = {chave: frozenset(valor) for chave, valor in trigramas.items()}
+        self._por_codigo = {codigo: posicao for posicao, codigo in enumerate(self._codigos)}
+
+    def _pontuar(self, posicao: int, consulta: str, tokens: List[str]) -> float:
+        """Pontuação de uma infração em que todas as palavras casaram por prefixo"""
+        palavras = self._palavras[posicao]
+        pontos = 100.0 + sum(3 if token in palavras else 2 for token in tokens)
+        texto = self._textos[posicao]
+        if texto.startswith(consulta):
+            pontos += 20
+        elif consulta in texto:
+            pontos += 10
+        return pontos
+
+    def buscar(self, consulta: str, limite: int = 25) -> List[Tuple[str, str]]:
+        """Retorna (código, descrição) das infrações mais relevantes para a consulta"""
+        normalizada = normalizar(consulta)
+        tokens = normalizada.split()
+        if not tokens:
+            return list(zip(self._codigos, self._descricoes))[:limite]
+
+        pontuacao: Dict[int, float] = {}
+        exato = self._por_codigo.get("_".join(tokens))
+        if exato is not None:
+            pontuacao[exato] = 1000.0
+
+        candidatos = self._prefixos.get(tokens[0], _VAZIO)
+        for token in tokens[1:]:
+            candidatos = candidatos & self._prefixos.get(token, _VAZIO)
+        for posicao in candidatos:
+            pontuacao.setdefault(posicao, self._pontuar(posicao, normalizada, tokens))
+
+        if not candidatos:
+            trigramas_consulta = _trigramas(tokens)
+            coincidencias = Counter()
+            for trigrama in trigramas_consulta:
+                coincidencias.update(self._trigramas.get(trigrama, _VAZIO))
+            for posicao, quantidade in coincidencias.items():
+                similaridade = quantidade / len(trigramas_consulta)
+                if similaridade >= SIMILARIDADE_MINIMA:
+                    pontuacao.setdefault(posicao, 50.0 * similaridade)
+
+        melhores = sorted(pontuacao, key=lambda p: (-pontuacao[p], len(self._descricoes[p]), p))[:limite]
+        return [(self._codigos[p], self._descricoes[p]) for p in melhores]
+
+
+indice_infracoes = IndiceInfracoes(TABELA_INFRACOES)
@@ -0,0 +1,118 @@
+"""Respostas de interação com adiamento automático antes do prazo do Discord."""
+
+import asyncio
+import functools
+import inspect
+from typing import Any, Callable, Dict, Optional
+
+import discord
+
+from config import PRAZO_ADIAMENTO_INTERACAO
+from metricas import medir_handler
+
+# Chave em ``interaction.extras`` da trava de resposta da interação
+CHAVE_TRAVA = "detran_trava_resposta"
+
+# Por handler: quantas interações tratou e quantas precisou adiar
+_contadores: Dict[str, Dict[str, int]] = {}
+
+
+def _trava(interaction: discord.Interaction) -> asyncio.Lock:
+    """Trava que impede o adiamento e a resposta do handler de serem enviados ao mesmo tempo"""
+    trava = interaction.extras.get(CHAVE_TRAVA)
+    if trava is None:
+        trava = interaction.extras[CHAVE_TRAVA] = asyncio.Lock()
+    return trava
+
+
+def _tempo_restante(interaction: discord.Interaction, prazo: float) -> float:
+    """Quanto do prazo ainda resta, descontando o tempo desde a criação da interação"""
+    decorrido = (discord.utils.utcnow() - interaction.created_at).total_seconds()
+    return min(max(prazo - decorrido, 0.0), prazo)
+
+
+async def _adiar_ao_esgotar(interaction: discord.Interaction, nome: str, prazo: float,
+                            efemero: bool, atualizar: bool):
+    await asyncio.sleep(_tempo_restante(interaction, prazo))
+    async with _trava(interaction):
+        if interaction.response.is_done():
+            return
+        if atualizar:
+            await interaction.response.defer()
+        else:
+            await interaction.response.defer(ephemeral=efemero, thinking=True)
+        _contadores[nome]["adiadas"] += 1
+
+
+def com_prazo(efemero: bool = False, atualizar: bool = False, prazo: Optional[float] = None):
+    """Adia a interação automaticamente se o handler não responder dentro do prazo.
+
+    ``efemero`` define a visibilidade da resposta adiada e ``atualizar`` indica
+    handlers de componentes que editam a própria mensagem. Os handlers devem
+    responder por ``responder``/``editar``, que passam a usar o followup quando
+    a interação já foi adiada. Handlers que abrem modais usam ``medido``.
+    """
+    def decorador(funcao: Callable) -> Callable:
+        nome = funcao.__qualname__
+        posicao = list(inspect.signature(funcao).parameters).index("interaction")
+        _contadores.setdefault(nome, {"chamadas": 0, "adiadas": 0})
+
+        @functools.wraps(funcao)
+        async def handler(*args, **kwargs):
+            interaction = args[posicao] if len(args) > posicao else kwargs["interaction"]
+            _contadores[nome]["chamadas"] += 1
+            tarefa = asyncio.create_task(_adiar_ao_esgotar(
+                interaction, nome, PRAZO_ADIAMENTO_INTERACAO if prazo is None else prazo, efemero, atualizar
+            ))
+            try:
+                with medir_handler(nome):
+                    return await funcao(*args, **kwargs)
+            finally:
+                tarefa.cancel()
+
+        return handler
+    return decorador
+
+
+def medido(funcao: Callable) -> Callable:
+    """Mede um handler que abre modal: ele não pode ser adiado, então não usa ``com_prazo``"""
+    nome = funcao.__qualname__
+    _contadores.setdefault(nome, {"chamadas": 0, "adiadas": 0})
+
+    @functools.wraps(funcao)
+    async def handler(*args, **kwargs):
+        _contadores[nome]["chamadas"] += 1
+        with medir_handler(nome):
+            return await funcao(*args, **kwargs)
+
+    return handler
+
+
+async def responder(interaction: discord.Interaction, content: Any = None, **kwargs):
+    """Envia a resposta da interação, ou um followup se ela já foi respondida/adiada"""
+    if content is not None:
+        kwargs["content"] = content
+    async with _trava(interaction):
+        if interaction.response.is_done():
+            return await interaction.followup.send(**kwargs)
+        return await interaction.response.send_message(**kwargs)
+
+
+async def editar(interaction: discord.Interaction, **kwargs):
+    """Edita a mensagem do componente, mesmo que a interação já tenha sido adiada"""
+    async with _trava(interaction):
+        if interaction.response.is_done():
+            return await interaction.edit_original_response(**kwargs)
+        return await interaction.response.edit_message(**kwargs)
+
+
+async def adiar(interaction: discord.Interaction, ephemeral: bool = False):
+    """Adia a interação explicitamente, se ainda não foi respondida"""
+    async with _trava(interaction):
+        if not interaction.response.is_done():
+            await interaction.response.defer(ephemeral=ephemeral, thinking=True)
+
+
+def estatisticas_interacoes() -> Dict[str, Dict[str, int]]:
+    """Retorna, por handler, o total de interações e quantas foram adiadas"""
+    return {nome: dict(contador) for nome, contador in _contadores.items()}
@@ -0,0 +1,243 @@
+"""Métricas em processo: histogramas de latência, tempo de banco e de REST por handler."""
+
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from aiohttp import web
+from discord.webhook.async_ import AsyncWebhookAdapter
+
+# Limites (em segundos) dos buckets dos histogramas de tempo
+BUCKETS_TEMPO = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Limites dos buckets do histograma de consultas por interação
+BUCKETS_CONSULTAS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histograma:
+    """Histograma cumulativo no formato do Prometheus, seguro entre threads."""
+
+    __slots__ = ("limites", "contagens", "soma", "total", "_lock")
+
+    def __init__(self, limites: Tuple[float, ...]):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)
+        self.soma = 0.0
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float):
+        with self._lock:
+            self.contagens[bisect_left(self.limites, valor)] += 1
+            self.soma += valor
+            self.total += 1
+
+    def quantil(self, q: float) -> float:
+        """Estima o quantil interpolando dentro do bucket, como histogram_quantile"""
+        with self._lock:
+            if not self.total:
+                return 0.0
+            alvo = q * self.total
+            acumulado = 0
+            for indice, contagem in enumerate(self.contagens):
+                if acumulado + contagem >= alvo and contagem:
+                    if indice == len(self.limites):
+                        return self.limites[-1]
+                    inferior = self.limites[indice - 1] if indice else 0.0
+                    return inferior + (self.limites[indice] - inferior) * (alvo - acumulado) / contagem
+                acumulado += contagem
+            return self.limites[-1]
+
+
+class _Familia:
+    """Histogramas de uma métrica, um por valor do rótulo"""
+
+    def __init__(self, nome: str, ajuda: str, rotulo: str, limites: Tuple[float, ...]):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulo = rotulo
+        self.limites = limites
+        self.histogramas: Dict[str, Histograma] = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor_rotulo: str, valor: float):
+        histograma = self.histogramas.get(valor_rotulo)
+        if histograma is None:
+            with self._lock:
+                histograma = self.histogramas.setdefault(valor_rotulo, Histograma(self.limites))
+        histograma.observar(valor)
+
+    def exportar(self) -> List[str]:
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} histogram"]
+        for valor_rotulo, histograma in sorted(self.histogramas.items()):
+            rotulo = f'{self.rotulo}="{_escapar(valor_rotulo)}"'
+            acumulado = 0
+            for limite, contagem in zip(self.limites + (float("inf"),), histograma.contagens):
+                acumulado += contagem
+                le = "+Inf" if limite == float("inf") else repr(limite)
+                linhas.append(f'{self.nome}_bucket{{{rotulo},le="{le}"}} {acumulado}')
+            linhas.append(f"{self.nome}_sum{{{rotulo}}} {histograma.soma}")
+            linhas.append(f"{self.nome}_count{{{rotulo}}} {histograma.total}")
+        return linhas
+
+
+def _escapar(texto: str) -> str:
+    return texto.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+duracao_handlers = _Familia("detran_handler_duracao_segundos", "Tempo total de cada handler", "handler", BUCKETS_TEMPO)
+banco_handlers = _Familia("detran_handler_banco_segundos", "Tempo gasto no banco por handler", "handler", BUCKETS_TEMPO)
+rest_handlers = _Familia("detran_handler_rest_segundos", "Tempo gasto na API REST do Discord por handler", "handler", BUCKETS_TEMPO)
+consultas_handlers = _Familia("detran_handler_consultas", "Instruções SQL executadas por handler", "handler", BUCKETS_CONSULTAS)
+duracao_banco = _Familia("detran_banco_metodo_segundos", "Tempo de execução de cada método do banco", "metodo", BUCKETS_TEMPO)
+duracao_rest = _Familia("detran_rest_rota_segundos", "Tempo de cada rota da API REST do Discord", "rota", BUCKETS_TEMPO)
+FAMILIAS = (duracao_handlers, banco_handlers, rest_handlers, consultas_handlers, duracao_banco, duracao_rest)
+
+
+class _Medicao:
+    """Tempos acumulados durante um handler (compartilhado com as threads do banco)"""
+
+    __slots__ = ("tempo_banco", "tempo_rest", "consultas")
+
+    def __init__(self):
+        self.tempo_banco = 0.0
+        self.tempo_rest = 0.0
+        self.consultas = 0
+
+
+_medicao_atual: contextvars.ContextVar[Optional[_Medicao]] = contextvars.ContextVar("detran_medicao", default=None)
+
+
+@contextmanager
+def medir_handler(nome: str):
+    """Mede o tempo total, de banco e de REST de um handler"""
+    medicao = _Medicao()
+    token = _medicao_atual.set(medicao)
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        duracao_handlers.observar(nome, time.perf_counter() - inicio)
+        _medicao_atual.reset(token)
+        banco_handlers.observar(nome, medicao.tempo_banco)
+        rest_handlers.observar(nome, medicao.tempo_rest)
+        consultas_handlers.observar(nome, medicao.consultas)
+
+
+@contextmanager
+def medir_banco(metodo: str):
+    """Mede um método do banco e soma o tempo ao handler em andamento"""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        duracao = time.perf_counter() - inicio
+        duracao_banco.observar(metodo, duracao)
+        medicao = _medicao_atual.get()
+        if medicao is not None:
+            medicao.tempo_banco += duracao
+
+
+def contar_consulta(sql: str):
+    """Trace callback do SQLite: conta as instruções executadas pelo handler em andamento"""
+    medicao = _medicao_atual.get()
+    if medicao is not None:
+        medicao.consultas += 1
+
+
+def _observar_rest(route, inicio: float):
+    duracao = time.perf_counter() - inicio
+    duracao_rest.observar(f"{route.method} {route.path}", duracao)
+    medicao = _medicao_atual.get()
+    if medicao is not None:
+        medicao.tempo_rest += duracao
+
+
+def instrumentar_http(http):
+    """Mede as chamadas REST do discord.py: as do HTTPClient e as de webhooks.
+
+    Respostas a interações (callback, followups, edição da resposta original)
+    não passam pelo HTTPClient, e sim pelo AsyncWebhookAdapter, que é
+    instrumentado na classe (uma única vez).
+    """
+    original = http.request
+
+    async def request(route, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return await original(route, **kwargs)
+        finally:
+            _observar_rest(route, inicio)
+
+    http.request = request
+
+    adaptador = AsyncWebhookAdapter
+    if getattr(adaptador.request, "instrumentado", False):
+        return
+    original_webhook = adaptador.request
+
+    async def request_webhook(self, route, *args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return await original_webhook(self, route, *args, **kwargs)
+        finally:
+            _observar_rest(route, inicio)
+
+    request_webhook.instrumentado = True
+    adaptador.request = request_webhook
+
+
+# Coletores extras: retornam (nome, rótulos, valor) de métricas instantâneas
+Coletor = Callable[[], Awaitable[List[Tuple[str, Dict[str, str], float]]]]
+_coletores: List[Coletor] = []
+
+
+def adicionar_coletor(coletor: Coletor):
+    """Registra uma função que fornece valores instantâneos (gauges) na exportação"""
+    _coletores.append(coletor)
+
+
+async def exportar() -> str:
+    """Retorna todas as métricas no formato de texto do Prometheus"""
+    linhas: List[str] = []
+    for familia in FAMILIAS:
+        linhas.extend(familia.exportar())
+    tipos_declarados = set()
+    for coletor in _coletores:
+        for nome, rotulos, valor in await coletor():
+            if nome not in tipos_declarados:
+                linhas.append(f"# TYPE {nome} gauge")
+                tipos_declarados.add(nome)
+            texto_rotulos = ",".join(f'{chave}="{_escapar(str(v))}"' for chave, v in rotulos.items())
+            linhas.append(f"{nome}{{{texto_rotulos}}} {valor}" if texto_rotulos else f"{nome} {valor}")
+    return "\n".join(linhas) + "\n"
+
+
+def resumo_handlers() -> List[Tuple[str, int, float, float, float]]:
+    """(handler, chamadas, p50, p95, p99) dos handlers, do mais chamado ao menos chamado"""
+    resumo = [
+        (nome, h.total, h.quantil(0.50), h.quantil(0.95), h.quantil(0.99))
+        for nome, h in list(duracao_handlers.histogramas.items())
+    ]
+    return sorted(resumo, key=lambda item: -item[1])
+
+
+_servidor: Optional[web.AppRunner] = None
+
+
+async def iniciar_servidor_metricas(host: str, porta: int):
+    """Publica as métricas em http://host:porta/metrics (uma única vez por processo)"""
+    global _servidor
+    if _servidor is not None:
+        return
+
+    async def metrics(request: web.Request) -> web.Response:
+        return web.Response(text=await exportar(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", metrics)
+    _servidor = web.AppRunner(app, access_log=None)
+    await _servidor.setup()
+    await web.TCPSite(_servidor, host, porta).start()
@@ -0,0 +1,76 @@
+"""Registros retornados pelo banco de dados do Detran.
+
+Cada classe declara suas colunas em ``__slots__``, na mesma ordem usada nos
+SELECTs, e é montada diretamente pela row factory do cursor, sem passar por
+``sqlite3.Row`` nem por um dicionário intermediário.
+"""
+
+import sqlite3
+from typing import Any, Dict
+
+
+class Registro:
+    """Base dos registros: atributos fixos e somente leitura."""
+
+    __slots__ = ()
+    # Lista de colunas pronta para uso em SELECT, preenchida por __init_subclass__
+    colunas = ""
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.colunas = ", ".join(cls.__slots__)
+
+    def __init__(self, *valores):
+        for campo, valor in zip(self.__slots__, valores):
+            object.__setattr__(self, campo, valor)
+
+    @classmethod
+    def da_linha(cls, cursor: sqlite3.Cursor, linha: tuple) -> "Registro":
+        """Row factory: monta o registro a partir de uma linha do SELECT"""
+        return cls(*linha)
+
+    def __setattr__(self, nome: str, valor: Any):
+        # Registros podem estar compartilhados pelo cache do banco
+        raise AttributeError(f"{type(self).__name__} é somente leitura")
+
+    def __eq__(self, outro: object) -> bool:
+        if type(outro) is not type(self):
+            return NotImplemented
+        return all(getattr(self, campo) == getattr(outro, campo) for campo in self.__slots__)
+
+    def __repr__(self) -> str:
+        campos = ", ".join(f"{campo}={getattr(self, campo)!r}" for campo in self.__slots__)
+        return f"{type(self).__name__}({campos})"
+
+    def como_dict(self) -> Dict[str, Any]:
+        """Converte o registro em dicionário"""
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+
+class Player(Registro):
+    __slots__ = ("rg_game", "nome_rp", "cnh_status", "pontos_cnh", "telefone")
+
+
+class CNH(Registro):
+    __slots__ = ("id", "jogador_id", "numero_registro", "data_emissao", "data_validade", "categoria")
+
+
+class Veiculo(Registro):
+    __slots__ = ("id", "proprietario_id", "placa", "modelo", "cor", "ano", "chassi", "crlv_status")
+
+
+class Multa(Registro):
+    __slots__ = ("id", "jogador_id", "veiculo_id", "agente_id", "tipo_infracao", "valor", "pontos",
+                 "data_ocorrencia", "status")
+
+
+class Ticket(Registro):
+    __slots__ = ("id", "autor_id", "descricao", "status", "data_criacao")
+
+
+class Painel(Registro):
+    __slots__ = ("nome", "canal_id", "mensagem_id", "hash")
+
+
+class VinculoDiscord(Registro):
+    __slots__ = ("discord_id", "rg_game", "nome", "data_registro")
@@ -0,0 +1,205 @@
+"""Perfil opcional das consultas SQL: log de consultas lentas, planos com SCAN e ranking de custo."""
+
+import logging
+import re
+import sqlite3
+import threading
+import time
+from itertools import groupby
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("detran.sql")
+
+# Instruções para as quais EXPLAIN QUERY PLAN faz sentido
+_EXPLICAVEIS = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+# Quantidade máxima de instruções distintas acompanhadas
+LIMITE_INSTRUCOES = 500
+# Linha de plano que percorre a tabela inteira (SCAN sem "USING ... INDEX")
+_SCAN_COMPLETO = re.compile(r"SCAN (?!CONSTANT ROW$)(?!.*\bUSING (?:COVERING )?INDEX\b)")
+
+
+def formato_parametros(parametros: Any) -> str:
+    """Descreve os parâmetros pelos tipos, sem expor os valores"""
+    if isinstance(parametros, dict):
+        return "{" + ", ".join(f"{chave}: {type(valor).__name__}" for chave, valor in parametros.items()) + "}"
+    # Tipos repetidos em sequência (listas de IN) aparecem como "str×1000"
+    grupos = ((tipo, len(list(repeticoes))) for tipo, repeticoes in groupby(type(v).__name__ for v in parametros))
+    return "(" + ", ".join(tipo if quantidade == 1 else f"{tipo}×{quantidade}" for tipo, quantidade in grupos) + ")"
+
+
+class EstatisticaSQL:
+    """Custo acumulado de uma instrução SQL"""
+
+    __slots__ = ("sql", "parametros", "chamadas", "tempo_total", "tempo_maximo", "plano")
+
+    def __init__(self, sql: str, parametros: str):
+        self.sql = sql
+        self.parametros = parametros
+        self.chamadas = 0
+        self.tempo_total = 0.0
+        self.tempo_maximo = 0.0
+        # None até o plano ser consultado; lista vazia para instruções sem plano
+        self.plano: Optional[List[str]] = None
+
+    def como_dict(self) -> Dict[str, Any]:
+        return {
+            "sql": self.sql,
+            "parametros": self.parametros,
+            "chamadas": self.chamadas,
+            "tempo_total": self.tempo_total,
+            "tempo_medio": self.tempo_total / self.chamadas if self.chamadas else 0.0,
+            "tempo_maximo": self.tempo_maximo,
+            "plano": self.plano or [],
+        }
+
+
+class PerfilSQL:
+    """Acumula o custo das instruções executadas pelas conexões perfiladas.
+
+    O tempo de cada execução inclui a leitura das linhas (fetch*/iteração),
+    não só o primeiro passo do SQLite em ``execute``. Execuções acima de
+    ``limite`` segundos são registradas no log com o formato dos parâmetros.
+    Na primeira execução de cada instrução o plano é obtido com EXPLAIN
+    QUERY PLAN e, se ele percorrer uma tabela inteira (SCAN sem índice),
+    também é registrado no log.
+    """
+
+    def __init__(self, limite: float):
+        self.limite = limite
+        self._estatisticas: Dict[str, EstatisticaSQL] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, conexao: sqlite3.Connection, sql: str, parametros: Any, duracao: float,
+                  lote: bool = False) -> Optional[EstatisticaSQL]:
+        """Conta uma execução; retorna a estatística para somar o tempo de leitura das linhas"""
+        formato = f"lote de {len(parametros)}" if lote and isinstance(parametros, list) else (
+            "lote" if lote else formato_parametros(parametros)
+        )
+        with self._lock:
+            estatistica = self._estatisticas.get(sql)
+            if estatistica is None:
+                if len(self._estatisticas) >= LIMITE_INSTRUCOES:
+                    return None
+                estatistica = self._estatisticas[sql] = EstatisticaSQL(sql, formato)
+            estatistica.chamadas += 1
+            estatistica.tempo_total += duracao
+            estatistica.tempo_maximo = max(estatistica.tempo_maximo, duracao)
+            explicar = estatistica.plano is None
+            if explicar:
+                estatistica.plano = []
+
+        if explicar and not lote and sql.lstrip().upper().startswith(_EXPLICAVEIS):
+            estatistica.plano = self._explicar(conexao, sql, parametros)
+            if any(_SCAN_COMPLETO.match(linha) for linha in estatistica.plano):
+                logger.warning("Consulta com SCAN completo: %s | plano: %s", _compactar(sql), "; ".join(estatistica.plano))
+
+        if duracao >= self.limite:
+            logger.warning("Consulta lenta (%.1f ms): %s | parâmetros %s", duracao * 1000, _compactar(sql), formato)
+        return estatistica
+
+    def acrescentar(self, estatistica: EstatisticaSQL, anterior: float, leitura: float):
+        """Soma à execução corrente (que já durava ``anterior`` segundos) o tempo de leitura de linhas"""
+        duracao = anterior + leitura
+        with self._lock:
+            estatistica.tempo_total += leitura
+            estatistica.tempo_maximo = max(estatistica.tempo_maximo, duracao)
+        # Registra uma única vez por execução, quando o tempo acumulado passa do limite
+        if anterior < self.limite <= duracao:
+            logger.warning("Consulta lenta (%.1f ms com a leitura das linhas): %s | parâmetros %s",
+                           duracao * 1000, _compactar(estatistica.sql), estatistica.parametros)
+
+    @staticmethod
+    def _explicar(conexao: sqlite3.Connection, sql: str, parametros: Any) -> List[str]:
+        # Cursor comum, para que o EXPLAIN não seja perfilado
+        cursor = sqlite3.Cursor(conexao)
+        cursor.row_factory = None
+        try:
+            return [linha[3] for linha in cursor.execute(f"EXPLAIN QUERY PLAN {sql}", parametros)]
+        except sqlite3.Error as e:
+            return [f"erro ao obter plano: {e}"]
+        finally:
+            cursor.close()
+
+    def mais_caras(self, quantidade: int = 10) -> List[Dict[str, Any]]:
+        """Retorna as instruções com maior tempo total acumulado"""
+        with self._lock:
+            estatisticas = sorted(self._estatisticas.values(), key=lambda e: -e.tempo_total)[:quantidade]
+            return [estatistica.como_dict() for estatistica in estatisticas]
+
+
+def _compactar(sql: str) -> str:
+    """SQL em uma linha, com listas longas de placeholders abreviadas"""
+    return re.sub(r"\?(?:, \?){3,}", "?, ?, …", " ".join(sql.split()))
+
+
+class CursorPerfilado(sqlite3.Cursor):
+    """Cursor que mede cada execute/executemany, e a leitura das linhas, no perfil da conexão"""
+
+    _estatistica: Optional[EstatisticaSQL] = None
+    _decorrido = 0.0
+
+    def execute(self, sql: str, parametros: Any = ()):
+        inicio = time.perf_counter()
+        try:
+            return super().execute(sql, parametros)
+        finally:
+            self._decorrido = time.perf_counter() - inicio
+            self._estatistica = self.connection.perfil.registrar(self.connection, sql, parametros, self._decorrido)
+
+    def _medir_leitura(self, inicio: float):
+        if self._estatistica is not None:
+            leitura = time.perf_counter() - inicio
+            self.connection.perfil.acrescentar(self._estatistica, self._decorrido, leitura)
+            self._decorrido += leitura
+
+    def fetchone(self):
+        inicio = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            self._medir_leitura(inicio)
+
+    def fetchmany(self, *args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return super().fetchmany(*args, **kwargs)
+        finally:
+            self._medir_leitura(inicio)
+
+    def fetchall(self):
+        inicio = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            self._medir_leitura(inicio)
+
+    def __next__(self):
+        inicio = time.perf_counter()
+        try:
+            return super().__next__()
+        finally:
+            self._medir_leitura(inicio)
+
+    def executemany(self, sql: str, parametros: Any):
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(sql, parametros)
+        finally:
+            self._estatistica = None
+            self.connection.perfil.registrar(self.connection, sql, parametros, time.perf_counter() - inicio,
+                                             lote=True)
+
+
+class ConexaoPerfilada(sqlite3.Connection):
+    """Conexão cujos cursores (inclusive os de execute) são perfilados"""
+
+    perfil: PerfilSQL
+
+    def cursor(self, factory=CursorPerfilado):
+        return super().cursor(factory)
+
+    def execute(self, sql: str, parametros: Any = ()):
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql: str, parametros: Any):
+        return self.cursor().executemany(sql, parametros)
@@ -0,0 +1,85 @@
+"""Permissões por cargo compiladas em máscaras de bits, com cache por membro."""
+
+from typing import Dict, Iterable
+
+import discord
+
+from config import (
+    CARGOS_PERMISSOES,
+    ROLES_CARGOS,
+    ROLE_GERENCIA,
+    ROLE_FUNCIONARIOS,
+    PERMISSOES_FUNCIONARIOS,
+)
+
+# Máscara com todos os bits ligados, inclusive de permissões não listadas
+TODAS_PERMISSOES = -1
+
+BITS_PERMISSOES: Dict[str, int] = {}
+MASCARAS_CARGOS: Dict[int, int] = {}
+MASCARA_FUNCIONARIOS = 0
+
+# Máscara efetiva de cada membro, pelo ID do usuário
+_mascaras_membros: Dict[int, int] = {}
+
+
+def _mascara(comandos: Iterable[str]) -> int:
+    mascara = 0
+    for comando in comandos:
+        mascara |= BITS_PERMISSOES[comando]
+    return mascara
+
+
+def compilar_permissoes():
+    """Atribui um bit a cada permissão e monta a máscara de cada cargo do Discord"""
+    global MASCARA_FUNCIONARIOS
+    comandos = sorted({comando for lista in CARGOS_PERMISSOES.values() for comando in lista})
+    BITS_PERMISSOES.clear()
+    BITS_PERMISSOES.update({comando: 1 << indice for indice, comando in enumerate(comandos)})
+
+    MASCARAS_CARGOS.clear()
+    for cargo, role_ids in ROLES_CARGOS.items():
+        for role_id in role_ids:
+            MASCARAS_CARGOS[role_id] = MASCARAS_CARGOS.get(role_id, 0) | _mascara(CARGOS_PERMISSOES[cargo])
+    MASCARAS_CARGOS[ROLE_GERENCIA] = TODAS_PERMISSOES
+    MASCARA_FUNCIONARIOS = _mascara(PERMISSOES_FUNCIONARIOS)
+    _mascaras_membros.clear()
+
+
+def mascara_membro(membro: discord.abc.User) -> int:
+    """Retorna as permissões efetivas do membro, calculadas uma vez por conjunto de cargos"""
+    mascara = _mascaras_membros.get(membro.id)
+    if mascara is not None:
+        return mascara
+
+    mascara = 0
+    funcionario = False
+    for role in getattr(membro, "roles", ()):
+        mascara |= MASCARAS_CARGOS.get(role.id, 0)
+        funcionario = funcionario or role.id == ROLE_FUNCIONARIOS
+    if mascara == 0 and funcionario:
+        mascara = MASCARA_FUNCIONARIOS
+    _mascaras_membros[membro.id] = mascara
+    return mascara
+
+
+def tem_permissao(membro: discord.abc.User, comando: str) -> bool:
+    """Verifica se o membro pode executar o comando"""
+    mascara = mascara_membro(membro)
+    bit = BITS_PERMISSOES.get(comando)
+    if bit is None:
+        return mascara == TODAS_PERMISSOES
+    return bool(mascara & bit)
+
+
+def invalidar_membro(membro_id: int):
+    """Descarta as permissões em cache de um membro"""
+    _mascaras_membros.pop(membro_id, None)
+
+
+def limpar_cache_permissoes():
+    """Descarta as permissões em cache de todos os membros"""
+    _mascaras_membros.clear()
+
+
+compilar_permissoes()
@@ -0,0 +1,110 @@
+"""Pool de canais de ticket criados com antecedência, ocultos, na categoria de tickets."""
+
+import asyncio
+from typing import Dict, List, Optional, Union
+
+import discord
+
+from config import (
+    ROLE_FUNCIONARIOS,
+    ROLE_GERENCIA,
+    TICKETS_POOL_TAMANHO,
+    TICKETS_NOME_RESERVA,
+)
+
+
+def permissoes_ticket(guild: discord.Guild, membro: Optional[discord.Member] = None
+                      ) -> Dict[Union[discord.Role, discord.Member], discord.PermissionOverwrite]:
+    """Permissões do canal de um ticket; sem ``membro``, as de um canal reserva (oculto para todos)"""
+    overwrites = {guild.default_role: discord.PermissionOverwrite(view_channel=False)}
+    if membro is None:
+        return overwrites
+    overwrites[membro] = discord.PermissionOverwrite(view_channel=True, send_messages=True)
+    for role_id in (ROLE_FUNCIONARIOS, ROLE_GERENCIA):
+        role = guild.get_role(role_id)
+        if role:
+            overwrites[role] = discord.PermissionOverwrite(view_channel=True, send_messages=True)
+    return overwrites
+
+
+class PoolCanaisTickets:
+    """Mantém canais reserva prontos para que abrir um ticket custe uma única edição de canal.
+
+    Abrir um ticket retira um canal reserva do pool e, numa só chamada,
+    renomeia o canal e aplica as permissões do ticket. O pool é completado
+    em segundo plano até ``tamanho`` canais; com o pool vazio o canal é
+    criado na hora, como antes. Canais reserva sobrevivem a reinícios: na
+    inicialização, os que já existem na categoria são reaproveitados.
+    """
+
+    def __init__(self, tamanho: int = TICKETS_POOL_TAMANHO, nome_reserva: str = TICKETS_NOME_RESERVA):
+        self.tamanho = tamanho
+        self.nome_reserva = nome_reserva
+        self.retirados = 0
+        self.criados = 0
+        self.sem_reserva = 0
+        self.falhas = 0
+        self._canais: List[discord.TextChannel] = []
+        self._categoria: Optional[discord.CategoryChannel] = None
+        self._reabastecimento: Optional[asyncio.Task] = None
+
+    def iniciar(self, categoria: discord.CategoryChannel):
+        """Adota os canais reserva já existentes na categoria e completa o pool em segundo plano"""
+        self._categoria = categoria
+        self._canais = [canal for canal in categoria.text_channels if canal.name == self.nome_reserva]
+        self.reabastecer()
+
+    def reabastecer(self):
+        """Agenda a criação dos canais que faltam (uma única tarefa por vez)"""
+        if self._categoria is None or not self.tamanho:
+            return
+        if self._reabastecimento is None or self._reabastecimento.done():
+            self._reabastecimento = asyncio.get_running_loop().create_task(self._reabastecer())
+
+    async def _reabastecer(self):
+        guild = self._categoria.guild
+        while len(self._canais) < self.tamanho:
+            try:
+                canal = await guild.create_text_channel(
+                    self.nome_reserva, category=self._categoria, overwrites=permissoes_ticket(guild),
+                    reason="Reserva de canais de ticket"
+                )
+            except discord.HTTPException as e:
+                self.falhas += 1
+                print(f"Erro ao criar canal reserva de ticket: {e}")
+                return
+            self.criados += 1
+            if canal not in self._canais:
+                self._canais.append(canal)
+
+    async def abrir(self, guild: discord.Guild, membro: discord.Member, ticket_id: int,
+                    categoria: Optional[discord.CategoryChannel] = None) -> discord.TextChannel:
+        """Entrega o canal do ticket: um reserva renomeado e liberado ao membro, ou um novo se não houver"""
+        nome = f"ticket-{ticket_id}"
+        overwrites = permissoes_ticket(guild, membro)
+        try:
+            while self._canais:
+                canal = self._canais.pop(0)
+                try:
+                    await canal.edit(name=nome, overwrites=overwrites, reason=f"Ticket #{ticket_id}")
+                except discord.NotFound:
+                    continue  # Canal reserva apagado manualmente
+                self.retirados += 1
+                return canal
+            self.sem_reserva += 1
+            return await guild.create_text_channel(nome, category=categoria, overwrites=overwrites)
+        finally:
+            self.reabastecer()
+
+    def estatisticas(self) -> Dict[str, int]:
+        """Retorna os contadores do pool de canais de ticket"""
+        return {
+            "disponiveis": len(self._canais),
+            "retirados": self.retirados,
+            "criados": self.criados,
+            "sem_reserva": self.sem_reserva,
+            "falhas": self.falhas,
+        }
+
+
+pool_tickets = PoolCanaisTickets()
@@ -0,0 +1,150 @@
+"""Embeds de referência (/taxas, /infracoes, /pop e /regulamento) montados uma única vez."""
+
+from typing import Dict, List
+
+import discord
+
+import config
+from interacoes import responder
+
+# Limites de embeds impostos pelo Discord
+LIMITE_DESCRICAO = 4096
+LIMITE_NOME_CAMPO = 256
+LIMITE_VALOR_CAMPO = 1024
+LIMITE_CAMPOS = 25
+LIMITE_TOTAL_EMBED = 6000
+LIMITE_EMBEDS_MENSAGEM = 10
+
+# Mensagens já montadas de cada referência: cada mensagem é uma lista de embeds
+_mensagens: Dict[str, List[List[discord.Embed]]] = {}
+
+
+def _dividir_linhas(linhas: List[str], limite: int) -> List[str]:
+    """Agrupa linhas em blocos de até ``limite`` caracteres, sem quebrar uma linha ao meio"""
+    blocos: List[str] = []
+    atual = ""
+    for linha in linhas:
+        linha = linha[:limite]
+        if atual and len(atual) + 1 + len(linha) > limite:
+            blocos.append(atual)
+            atual = ""
+        atual = f"{atual}\n{linha}" if atual else linha
+    if atual:
+        blocos.append(atual)
+    return blocos
+
+
+class _MontadorEmbeds:
+    """Distribui descrição e campos por quantos embeds forem necessários"""
+
+    def __init__(self, titulo: str, cor: int, rodape: str):
+        self.titulo = titulo
+        self.cor = cor
+        self.rodape = rodape
+        self.embeds: List[discord.Embed] = []
+        self._novo_embed()
+
+    def _novo_embed(self):
+        titulo = self.titulo if not self.embeds else f"{self.titulo} (continuação)"
+        self.embeds.append(discord.Embed(title=titulo, color=self.cor))
+
+    def _cabe(self, caracteres: int, campo: bool) -> bool:
+        embed = self.embeds[-1]
+        if campo and len(embed.fields) >= LIMITE_CAMPOS:
+            return False
+        # Reserva espaço para o rodapé, colocado no último embed
+        return len(embed) + caracteres + len(self.rodape) <= LIMITE_TOTAL_EMBED
+
+    def descricao(self, texto: str):
+        for bloco in _dividir_linhas(texto.strip("\n").split("\n"), LIMITE_DESCRICAO):
+            if self.embeds[-1].description or not self._cabe(len(bloco), campo=False):
+                self._novo_embed()
+            self.embeds[-1].description = bloco
+
+    def campo(self, nome: str, linhas: List[str], inline: bool = False):
+        nome = nome[:LIMITE_NOME_CAMPO]
+        for indice, valor in enumerate(_dividir_linhas(linhas, LIMITE_VALOR_CAMPO)):
+            nome_bloco = nome if indice == 0 else f"{nome} (continuação)"[:LIMITE_NOME_CAMPO]
+            if not self._cabe(len(nome_bloco) + len(valor), campo=True):
+                self._novo_embed()
+            self.embeds[-1].add_field(name=nome_bloco, value=valor, inline=inline)
+
+    def mensagens(self) -> List[List[discord.Embed]]:
+        """Agrupa os embeds em mensagens respeitando os limites por mensagem"""
+        self.embeds[-1].set_footer(text=self.rodape)
+        mensagens: List[List[discord.Embed]] = [[]]
+        total = 0
+        for embed in self.embeds:
+            atual = mensagens[-1]
+            if atual and (len(atual) >= LIMITE_EMBEDS_MENSAGEM or total + len(embed) > LIMITE_TOTAL_EMBED):
+                mensagens.append([])
+                total = 0
+            mensagens[-1].append(embed)
+            total += len(embed)
+        return mensagens
+
+
+def _montar_taxas() -> List[List[discord.Embed]]:
+    montador = _MontadorEmbeds("💰 Tabela Oficial de Taxas - Detran-SP", config.CORES["detran"],
+                               "Valores em dinheiro virtual do servidor")
+    for taxa in config.TABELA_TAXAS.values():
+        montador.campo(taxa['descricao'], [f"R$ {taxa['valor']:.2f}"], inline=True)
+    return montador.mensagens()
+
+
+def _montar_infracoes() -> List[List[discord.Embed]]:
+    montador = _MontadorEmbeds("🚨 Tabela Oficial de Infrações e Multas", config.CORES["aviso"],
+                               "Valores em dinheiro virtual do servidor")
+    categorias = {"Leves": [], "Médias": [], "Graves": [], "Gravíssimas": []}
+    for infracao in config.TABELA_INFRACOES.values():
+        valor_desconto = infracao['valor'] * 0.85
+        linha = (
+            f"• {infracao['descricao']}\n"
+            f"  Valor: R$ {infracao['valor']:.2f} (desc: R$ {valor_desconto:.2f})\n"
+            f"  Pontos: {infracao['pontos']} | Pátio: {infracao['patio']}h"
+        )
+        if infracao['pontos'] == 3:
+            categorias["Leves"].append(linha)
+        elif infracao['pontos'] == 4:
+            categorias["Médias"].append(linha)
+        elif infracao['pontos'] == 5:
+            categorias["Graves"].append(linha)
+        else:
+            categorias["Gravíssimas"].append(linha)
+
+    for nome, itens in categorias.items():
+        if itens:
+            montador.campo(nome, itens)
+    montador.campo("⚠️ Observações", [
+        "• Reincidência em 12 meses: multa em dobro",
+        f"• {config.LIMITE_SUSPENSAO_CNH} pontos: CNH suspensa",
+        f"• {config.LIMITE_REVOGACAO_CNH} pontos: CNH revogada",
+    ])
+    return montador.mensagens()
+
+
+def _montar_texto(titulo: str, texto: str) -> List[List[discord.Embed]]:
+    montador = _MontadorEmbeds(titulo, config.CORES["detran"], "Detran-SP - Cidade Salve RP")
+    montador.descricao(texto)
+    return montador.mensagens()
+
+
+def recarregar_referencias():
+    """Monta novamente todos os embeds de referência a partir das tabelas do config"""
+    _mensagens.update({
+        "taxas": _montar_taxas(),
+        "infracoes": _montar_infracoes(),
+        "pop": _montar_texto("📋 Protocolo Operacional Padrão (POP)", config.POP_RESUMO),
+        "regulamento": _montar_texto("📜 Regulamento Interno do Detran-SP", config.REGULAMENTO_RESUMO),
+    })
+
+
+async def enviar_referencia(interaction: discord.Interaction, nome: str):
+    """Responde com os embeds já montados da referência, em mais de uma mensagem se necessário"""
+    primeira, *demais = _mensagens[nome]
+    await responder(interaction, embeds=primeira)
+    for embeds in demais:
+        await interaction.followup.send(embeds=embeds)
+
+
+recarregar_referencias()
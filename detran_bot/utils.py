@@ -1,15 +1,23 @@
 """Funções utilitárias para o bot do Detran."""
 
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
 import discord
 from discord.ext import commands
 
 from config import (
     CORES,
-    ROLE_GERENCIA,
-    ROLE_FUNCIONARIOS,
-    PERMISSOES_FUNCIONARIOS,
     CANAL_LOGS,
+    LOG_LIMITE_FILA,
+    LOG_INTERVALO_ENVIO,
+    LOG_TAMANHO_MENSAGEM,
 )
+from permissoes import tem_permissao
 
 
 EMBED_ICONS = {
@@ -33,20 +41,171 @@ def criar_embed(tipo: str, titulo: str, descricao: str) -> discord.Embed:
 
 def verificar_permissao(interaction: discord.Interaction, comando: str) -> bool:
     """Verifica se o usuário possui permissão para executar o comando."""
-    role_ids = [role.id for role in interaction.user.roles]
+    return tem_permissao(interaction.user, comando)
+
+
+def formatar_data(timestamp: int, formato: str = "%d/%m/%Y") -> str:
+    """Formata uma data gravada em epoch UTC no horário local"""
+    return datetime.fromtimestamp(timestamp).strftime(formato)
+
+
+class FilaLogs:
+    """Fila limitada de linhas de log enviadas em lote ao canal de logs.
 
-    if ROLE_GERENCIA in role_ids:
+    Uma tarefa em segundo plano (iniciada na primeira linha) junta as linhas
+    pendentes no menor número possível de mensagens e as envia quando o lote
+    atinge o tamanho máximo de uma mensagem ou quando passa o intervalo de
+    envio. Com a fila cheia, novas linhas são descartadas e contabilizadas.
+    """
+
+    def __init__(self, limite: int = LOG_LIMITE_FILA, intervalo: float = LOG_INTERVALO_ENVIO,
+                 tamanho_mensagem: int = LOG_TAMANHO_MENSAGEM):
+        self.intervalo = intervalo
+        self.tamanho_mensagem = tamanho_mensagem
+        self.enfileiradas = 0
+        self.descartadas = 0
+        self.mensagens_enviadas = 0
+        self.falhas_envio = 0
+        self._limite = limite
+        self._fila: Optional[asyncio.Queue] = None
+        self._tarefa: Optional[asyncio.Task] = None
+        self._bot: Optional[commands.Bot] = None
+        self._descartadas_avisadas = 0
+
+    def adicionar(self, bot: commands.Bot, linha: str) -> bool:
+        """Enfileira uma linha de log sem aguardar o envio; retorna False se foi descartada"""
+        if self._fila is None:
+            self._fila = asyncio.Queue(maxsize=self._limite)
+        self._bot = bot
+        if self._tarefa is None or self._tarefa.done():
+            self._tarefa = asyncio.get_running_loop().create_task(self._enviar_continuamente())
+        try:
+            self._fila.put_nowait(linha)
+        except asyncio.QueueFull:
+            self.descartadas += 1
+            return False
+        self.enfileiradas += 1
         return True
 
-    if ROLE_FUNCIONARIOS in role_ids:
-        return comando in PERMISSOES_FUNCIONARIOS
+    async def _enviar_continuamente(self):
+        loop = asyncio.get_running_loop()
+        sobra = None
+        while True:
+            linha = sobra if sobra is not None else await self._fila.get()
+            sobra = None
+            linhas = [linha]
+            tamanho = len(linha)
+            prazo = loop.time() + self.intervalo
+            while tamanho < self.tamanho_mensagem:
+                restante = prazo - loop.time()
+                if restante <= 0:
+                    break
+                try:
+                    linha = await asyncio.wait_for(self._fila.get(), restante)
+                except asyncio.TimeoutError:
+                    break
+                if tamanho + 1 + len(linha) > self.tamanho_mensagem:
+                    # Não cabe nesta mensagem: abre o próximo lote
+                    sobra = linha
+                    break
+                linhas.append(linha)
+                tamanho += len(linha) + 1
+            await self._enviar_lote(linhas)
+
+    async def _enviar_lote(self, linhas: List[str]):
+        if self.descartadas > self._descartadas_avisadas:
+            linhas.append(f"⚠️ {self.descartadas - self._descartadas_avisadas} linhas de log descartadas (fila cheia)")
+            self._descartadas_avisadas = self.descartadas
+        canal = self._bot.get_channel(CANAL_LOGS) if self._bot else None
+        if canal is None:
+            return
+        for mensagem in self._agrupar(linhas):
+            try:
+                # O discord.py aguarda sozinho os limites de taxa; aqui só contamos falhas definitivas
+                await canal.send(mensagem, allowed_mentions=discord.AllowedMentions.none())
+                self.mensagens_enviadas += 1
+            except Exception as e:
+                # Inclui erros de conexão (aiohttp, timeout) em reconexões: a tarefa de envio não pode morrer
+                self.falhas_envio += 1
+                print(f"Erro ao enviar log: {e}")
+
+    def _agrupar(self, linhas: List[str]) -> Iterator[str]:
+        """Junta as linhas em mensagens de até ``tamanho_mensagem`` caracteres"""
+        atual: List[str] = []
+        tamanho = 0
+        for linha in linhas:
+            linha = linha[:self.tamanho_mensagem]
+            if atual and tamanho + 1 + len(linha) > self.tamanho_mensagem:
+                yield "\n".join(atual)
+                atual, tamanho = [], 0
+            tamanho += len(linha) + (1 if atual else 0)
+            atual.append(linha)
+        if atual:
+            yield "\n".join(atual)
 
-    return False
+    def estatisticas(self) -> Dict[str, int]:
+        """Retorna os contadores da fila de logs"""
+        return {
+            "pendentes": self._fila.qsize() if self._fila else 0,
+            "enfileiradas": self.enfileiradas,
+            "descartadas": self.descartadas,
+            "mensagens_enviadas": self.mensagens_enviadas,
+            "falhas_envio": self.falhas_envio,
+        }
+
+
+fila_logs = FilaLogs()
 
 
 async def enviar_log(bot: commands.Bot, mensagem: str) -> None:
-    """Envia uma mensagem de log para o canal configurado."""
-    canal = bot.get_channel(CANAL_LOGS)
-    if canal:
-        await canal.send(mensagem)
+    """Enfileira uma mensagem para o canal de logs; o envio é feito em lote."""
+    fila_logs.adicionar(bot, mensagem)
+
+
+def _ler_json(texto: str) -> Iterator[Dict[str, Any]]:
+    """Lê uma lista JSON (ou JSON Lines) objeto por objeto, sem montar a lista inteira."""
+    decoder = json.JSONDecoder()
+    posicao = 0
+    tamanho = len(texto)
+
+    def pular(pos: int, separadores: str = "") -> int:
+        while pos < tamanho and (texto[pos].isspace() or texto[pos] in separadores):
+            pos += 1
+        return pos
+
+    posicao = pular(posicao)
+    em_lista = posicao < tamanho and texto[posicao] == "["
+    if em_lista:
+        posicao += 1
+    while True:
+        posicao = pular(posicao, "," if em_lista else "")
+        if posicao >= tamanho or (em_lista and texto[posicao] == "]"):
+            return
+        objeto, posicao = decoder.raw_decode(texto, posicao)
+        if not isinstance(objeto, dict):
+            raise ValueError("cada registro do JSON deve ser um objeto")
+        yield objeto
+
+
+def ler_registros(conteudo: bytes, nome_arquivo: str) -> Iterator[Dict[str, Any]]:
+    """Lê registros de um arquivo CSV ou JSON enviado como anexo.
+
+    Os registros são produzidos um a um, para serem gravados em lotes conforme
+    a leitura avança. Arquivos CSV podem usar vírgula ou ponto e vírgula.
+    Qualquer erro de leitura (codificação, JSON ou CSV malformado) é levantado
+    como ValueError.
+    """
+    texto = conteudo.decode("utf-8-sig")
+    if nome_arquivo.lower().endswith((".json", ".jsonl")):
+        yield from _ler_json(texto)
+        return
 
+    try:
+        dialeto = csv.Sniffer().sniff(texto[:4096], delimiters=",;")
+    except csv.Error:
+        dialeto = csv.excel
+    try:
+        for linha in csv.DictReader(io.StringIO(texto, newline=""), dialect=dialeto):
+            yield {(campo or "").strip().lower(): valor for campo, valor in linha.items()}
+    except csv.Error as e:
+        raise ValueError(f"CSV inválido: {e}") from e